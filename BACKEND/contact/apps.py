@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class ContactConfig(AppConfig):
     name = 'contact'
+    
+    def ready(self):
+        from crud.versioning import track_versions
+        track_versions(self.get_model('SiteConfiguration'))
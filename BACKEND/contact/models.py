@@ -46,6 +46,12 @@ class ContactMessage(models.Model):
     
     class Meta:
         ordering = ['-submitted_at']
+        indexes = [
+            # Inbox: messages of one status, newest first, and new-message counts
+            models.Index(fields=['status', 'submitted_at'], name='contact_status_submitted_idx'),
+            # Recent messages and submitted_at range counts
+            models.Index(fields=['submitted_at'], name='contact_submitted_idx'),
+        ]
         verbose_name = _('Contact Message')
         verbose_name_plural = _('Contact Messages')
     
@@ -1,3 +1,51 @@
 from django.test import TestCase
 
 # Create your tests here.
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from crud.testing import QueryPlanMixin
+from .models import ContactMessage
+
+
+class ContactMessageQueryPlanTestCase(QueryPlanMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        statuses = ['new', 'read', 'replied', 'archived']
+        ContactMessage.objects.bulk_create([
+            ContactMessage(
+                name=f'Sender {i}', email=f'sender{i}@example.com', subject='Hello',
+                message='Hi there', status=statuses[i % 4]
+            )
+            for i in range(300)
+        ])
+        cls.staff = get_user_model().objects.create_user(username='staff', password='pass1234', is_staff=True)
+
+    def setUp(self):
+        self.client.force_authenticate(self.staff)
+
+    def get(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return queries
+
+    def test_new_message_count(self):
+        queries = self.get('/api/contact/summary/')
+        self.assertQueriesUseIndex(queries, ContactMessage, contains='WHERE')
+
+    def test_inbox_newest_first(self):
+        queries = self.get('/api/contact/messages/', status='new', ordering='-submitted_at')
+        self.assertQueriesUseIndex(queries, ContactMessage)
+
+    def test_recent_messages(self):
+        queries = self.get('/api/contact/summary/')
+        self.assertQueriesUseIndex(queries, ContactMessage, contains='LIMIT')
+
+    def test_submitted_since(self):
+        start = timezone.localdate() - timedelta(days=30)
+        queries = self.get('/api/contact/messages/', start_date=start.isoformat())
+        self.assertQueriesUseIndex(queries, ContactMessage)
@@ -14,6 +14,8 @@ from .serializers import (
     ContactSummarySerializer
 )
 from .filters import ContactMessageFilter
+from crud.conditional import versioned_etag
+from crud.routing import read_replica
 
 class ContactMessageListView(generics.ListCreateAPIView):
     # permission_classes = [permissions.IsAuthenticatedOrReadOnly] # ORIGINAL
@@ -135,6 +137,10 @@ class SiteConfigurationView(generics.RetrieveUpdateAPIView):
     serializer_class = SiteConfigurationSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     
+    @versioned_etag(SiteConfiguration)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+    
     def get_object(self):
         return SiteConfiguration.load()
     
@@ -146,6 +152,7 @@ class SiteConfigurationView(generics.RetrieveUpdateAPIView):
 class ContactSummaryView(APIView):
     permission_classes = [permissions.IsAdminUser]
     
+    @read_replica
     def get(self, request):
         # Total messages
         total_messages = ContactMessage.objects.count()
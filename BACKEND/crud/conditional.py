@@ -0,0 +1,75 @@
+"""
+Conditional GET for read endpoints, driven by the version counters in
+crud.versioning rather than by hashing rendered responses.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .versioning import get_versions, get_last_modified
+
+
+def versioned_etag(*models, refresh_every=None):
+    """
+    Decorate a DRF handler (get, list, retrieve) so its response carries an
+    ETag and Last-Modified derived from the versions of ``models``.
+
+    A request whose If-None-Match (or If-Modified-Since) still matches gets
+    a 304 before the handler runs, so no queries or serializers execute.
+    The ETag also covers the full URL and staff status, since those change
+    what the endpoints return. ``refresh_every`` (seconds) also changes the
+    ETag on that interval, for responses with figures that move without a
+    version bump, such as sharded campaign totals.
+
+    Responses read from a replica (see crud.routing.read_replica) go out
+    without validators: the versions describe the primary, and a lagging
+    replica's body must not be cached under them.
+    """
+    def validators(request):
+        versions = '.'.join(str(version) for version in get_versions(*models))
+        fingerprint = f'{request.build_absolute_uri()}|{request.user.is_staff}|{versions}'
+        last_modified = get_last_modified(*models)
+        if refresh_every:
+            window = int(time.time()) // refresh_every * refresh_every
+            fingerprint += f'|{window}'
+            last_modified = max(last_modified or 0, window)
+        return quote_etag(hashlib.md5(fingerprint.encode()).hexdigest()), last_modified
+
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(self, request, *args, **kwargs):
+            etag, last_modified = validators(request)
+
+            if_none_match = request.headers.get('If-None-Match')
+            if if_none_match:
+                not_modified = etag in parse_etags(if_none_match) or if_none_match.strip() == '*'
+            else:
+                since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+                not_modified = bool(since and last_modified and last_modified <= since)
+
+            if not_modified:
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                response = handler(self, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                if getattr(request, 'read_from_replica', False):
+                    patch_cache_control(response, no_cache=True)
+                    return response
+                # Handlers like SiteConfiguration.load() may write while reading
+                etag, last_modified = validators(request)
+
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified)
+            # Always revalidate; a matching ETag makes that a cheap 304
+            patch_cache_control(response, no_cache=True)
+            patch_vary_headers(response, ('Authorization', 'Cookie'))
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,250 @@
+"""
+Fast read path for large list responses.
+
+A normal list response builds a model instance per row and walks the
+serializer's fields over it. FastReader fetches only the columns the
+serializer reads with values() and runs each field's own to_representation
+on them, so the output is identical while instance construction and
+attribute lookups are skipped.
+
+Supported serializers are ModelSerializers made of model columns (also
+through foreign keys, e.g. source='program.title'), primary-key relations,
+file fields and single nested ModelSerializers over a foreign key.
+Read-only fields backed by a model property list the columns the property
+reads in the serializer's ``fast_read_sources``. Anything else raises
+ImproperlyConfigured when the reader is built, never a silent difference.
+"""
+import time
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models.fields.files import FileField as ModelFileField
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField, RelatedField
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+from .instrumentation import current_metrics
+
+
+def model_lookup(model, attrs):
+    """Resolve a serializer source to a values() lookup, or None."""
+    model_field = None
+    for position, attr in enumerate(attrs):
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None, None
+        if not model_field.concrete:
+            return None, None
+        if position < len(attrs) - 1:
+            if not model_field.is_relation:
+                return None, None
+            model = model_field.related_model
+    return '__'.join(attrs), model_field
+
+
+def unsupported(serializer, name):
+    return ImproperlyConfigured(
+        f'{type(serializer).__name__}.{name} cannot be read from values(); '
+        f'add it to fast_read_sources or use the regular serializer.'
+    )
+
+
+def representation(field):
+    """
+    ``field.to_representation``, reduced to a builtin where the stock DRF
+    method is equivalent for values a database column returns.
+    """
+    method = type(field).to_representation
+    if method is serializers.CharField.to_representation:
+        return str
+    if method is serializers.IntegerField.to_representation:
+        return int
+    if method is serializers.BooleanField.to_representation:
+        return bool
+    if method is serializers.JSONField.to_representation and not field.binary:
+        return None
+    if method is serializers.DateField.to_representation:
+        output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+        if output_format is not None and output_format.lower() == ISO_8601:
+            return date.isoformat
+    if method is serializers.DateTimeField.to_representation:
+        return iso_datetime(field)
+    return field.to_representation
+
+
+def iso_datetime(field):
+    """DateTimeField output with the field's timezone resolved once per reader."""
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        return field.to_representation
+
+    def convert(value):
+        if not isinstance(value, datetime) or value.utcoffset() is None:
+            return field.to_representation(value)
+        try:
+            value = value.astimezone(field_timezone).isoformat()
+        except OverflowError:
+            return field.to_representation(value)
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return convert
+
+
+def value_converter(field, key):
+    to_representation = representation(field)
+    if to_representation is None:
+        return lambda row: row[key]
+
+    def convert(row):
+        value = row[key]
+        return None if value is None else to_representation(value)
+    return convert
+
+
+def pk_converter(field, key):
+    pk_field = field.pk_field
+
+    def convert(row):
+        value = row[key]
+        if value is None or pk_field is None:
+            return value
+        return pk_field.to_representation(value)
+    return convert
+
+
+def file_converter(field, model_field, key):
+    # Wrap the stored name in the field's file class so URL building is unchanged
+    to_representation = field.to_representation
+    attr_class = model_field.attr_class
+
+    def convert(row):
+        name = row[key]
+        if not name:
+            return None
+        return to_representation(attr_class(None, model_field, name))
+    return convert
+
+
+def computed_converter(field, getter, keys):
+    to_representation = field.to_representation
+
+    def convert(row):
+        value = getter(SimpleNamespace(**{attr: row[key] for attr, key in keys}))
+        return None if value is None else to_representation(value)
+    return convert
+
+
+def nested_converter(key, converters):
+    def convert(row):
+        if row[key] is None:
+            return None
+        return {name: field_convert(row) for name, field_convert in converters}
+    return convert
+
+
+def compile_fields(serializer, prefix=''):
+    """Return the values() lookups and (name, converter) pairs for ``serializer``."""
+    model = serializer.Meta.model
+    computed = getattr(serializer, 'fast_read_sources', {})
+    lookups = []
+    converters = []
+
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+
+        if name in computed:
+            if len(field.source_attrs) != 1:
+                raise unsupported(serializer, name)
+            attribute = getattr(model, field.source)
+            getter = attribute.fget if isinstance(attribute, property) else attribute
+            keys = [(attr, prefix + attr) for attr in computed[name]]
+            lookups.extend(key for _, key in keys)
+            converters.append((name, computed_converter(field, getter, keys)))
+            continue
+
+        if (field.source == '*' or isinstance(field, (
+            serializers.ListSerializer, serializers.ManyRelatedField,
+            serializers.SerializerMethodField, serializers.ModelField
+        )) or (isinstance(field, RelatedField) and not isinstance(field, PrimaryKeyRelatedField))):
+            raise unsupported(serializer, name)
+
+        lookup, model_field = model_lookup(model, field.source_attrs)
+        if lookup is None:
+            raise unsupported(serializer, name)
+        key = prefix + lookup
+        lookups.append(key)
+
+        if isinstance(field, serializers.BaseSerializer):
+            if not model_field.is_relation:
+                raise unsupported(serializer, name)
+            nested_lookups, nested_converters = compile_fields(field, key + '__')
+            lookups.extend(nested_lookups)
+            converters.append((name, nested_converter(key, nested_converters)))
+        elif isinstance(field, PrimaryKeyRelatedField):
+            converters.append((name, pk_converter(field, key)))
+        elif isinstance(model_field, ModelFileField):
+            converters.append((name, file_converter(field, model_field, key)))
+        else:
+            converters.append((name, value_converter(field, key)))
+
+    return lookups, converters
+
+
+class FastReader:
+    """
+    Serializes values() rows exactly as ``serializer_class(many=True)`` would
+    serialize the matching instances.
+    """
+
+    def __init__(self, serializer_class, context=None):
+        serializer = serializer_class(context=context or {})
+        self.lookups, self.converters = compile_fields(serializer)
+
+    def values(self, queryset, extra=()):
+        """``queryset`` as dict rows holding every column the serializer reads."""
+        return queryset.values(*dict.fromkeys([*self.lookups, *extra]))
+
+    def serialize(self, rows):
+        started = time.perf_counter()
+        converters = self.converters
+        data = [{name: convert(row) for name, convert in converters} for row in rows]
+        metrics = current_metrics()
+        if metrics is not None:
+            metrics.serializer_time += time.perf_counter() - started
+        return data
+
+
+class FastListMixin:
+    """
+    Opt-in list action for generic views and viewsets that serializes rows
+    through FastReader when FAST_LIST_SERIALIZATION is on; otherwise the
+    regular serializer runs. Filtering, ordering and pagination are unchanged.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if not getattr(settings, 'FAST_LIST_SERIALIZATION', False):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        reader = FastReader(self.get_serializer_class(), self.get_serializer_context())
+        rows = reader.values(queryset, self.fast_list_ordering(queryset))
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(reader.serialize(page))
+        return Response(reader.serialize(rows))
+
+    def fast_list_ordering(self, queryset):
+        # Cursor pagination reads its ordering fields back from each row
+        ordering = getattr(self.paginator, 'ordering', None) or ()
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        names = [*queryset.query.order_by, *ordering]
+        return [name.lstrip('-') for name in names if isinstance(name, str) and name != '?']
@@ -0,0 +1,100 @@
+"""
+Idempotency-Key support for POST endpoints that clients retry.
+
+The first request with a key runs normally and a successful response is
+stored in the cache under that key as (fingerprint, status, content type,
+body bytes). A retry with the same key and payload gets those bytes back
+as-is, with no serializer, database write or outbound call. Failed
+responses are not stored, so a retry after an error runs again.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+# How long a request holds its key before a retry may take it over
+IN_PROGRESS_TIMEOUT = 60
+
+
+def request_fingerprint(request):
+    digest = hashlib.sha256(request.method.encode())
+    digest.update(request.get_full_path().encode())
+    digest.update(request.body)
+    return digest.hexdigest()[:32]
+
+
+def replay(entry):
+    _, status_code, content_type, body = entry
+    response = HttpResponse(body, status=status_code, content_type=content_type)
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(scope):
+    """
+    Decorate a DRF POST handler so requests carrying an Idempotency-Key
+    header run at most once per key within IDEMPOTENCY_KEY_TTL.
+
+    Keys are scoped per endpoint and per user. Reusing a key with a
+    different payload is a 422; a retry that arrives while the first
+    request is still running is a 409.
+    """
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(view, request, *args, **kwargs):
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not key:
+                return handler(view, request, *args, **kwargs)
+            if len(key) > MAX_KEY_LENGTH:
+                return Response(
+                    {'error': f'{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            owner = request.user.pk if request.user.is_authenticated else 'anon'
+            cache_key = f'idempotency:{scope}:{owner}:{hashlib.sha256(key.encode()).hexdigest()}'
+            fingerprint = request_fingerprint(request)
+
+            # cache.add only succeeds for the first request holding the key
+            if not cache.add(cache_key, (fingerprint, None, None, None), IN_PROGRESS_TIMEOUT):
+                entry = cache.get(cache_key)
+                if entry is not None:
+                    if entry[0] != fingerprint:
+                        return Response(
+                            {'error': f'{IDEMPOTENCY_HEADER} was already used for a different request'},
+                            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                        )
+                    if entry[1] is None:
+                        return Response(
+                            {'error': f'A request with this {IDEMPOTENCY_HEADER} is still in progress'},
+                            status=status.HTTP_409_CONFLICT
+                        )
+                    return replay(entry)
+                # The entry expired between add and get; take the key over
+                cache.set(cache_key, (fingerprint, None, None, None), IN_PROGRESS_TIMEOUT)
+
+            try:
+                response = handler(view, request, *args, **kwargs)
+            except Exception:
+                cache.delete(cache_key)
+                raise
+
+            if status.is_success(response.status_code) and isinstance(response, Response):
+                body = JSONRenderer().render(response.data)
+                cache.set(
+                    cache_key,
+                    (fingerprint, response.status_code, 'application/json', body),
+                    settings.IDEMPOTENCY_KEY_TTL
+                )
+            else:
+                cache.delete(cache_key)
+            return response
+        return wrapper
+    return decorator
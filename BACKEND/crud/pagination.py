@@ -0,0 +1,77 @@
+"""
+Cursor pagination for the unbounded list endpoints.
+
+Each page is fetched with a keyset filter on the first ordering field
+(created_at, or date_joined for users) and the id tiebreaker, served by a
+matching composite index, so later pages don't rescan the rows before
+them. Rows that tie on the first field are still skipped with a small
+OFFSET, and max_page_size caps how many rows a single response can
+serialize.
+"""
+from base64 import b64decode, b64encode
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class DateJoinedCursorPagination(CreatedAtCursorPagination):
+    ordering = ('-date_joined', '-id')
+
+
+class MergedCursorPagination(CreatedAtCursorPagination):
+    """
+    Newest-first keyset pagination across several querysets, for listings
+    that span a hot table and its archive. Each page reads at most
+    page_size + 1 rows from every queryset and merges them, so ids must be
+    unique across the querysets. Only next links are produced.
+    """
+
+    def paginate_querysets(self, querysets, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_position(request)
+
+        rows = []
+        for queryset in querysets:
+            queryset = queryset.order_by('-created_at', '-id')
+            if position is not None:
+                created_at, pk = position
+                queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+            rows.extend(queryset[:self.page_size + 1])
+        rows.sort(key=lambda row: (row.created_at, row.id), reverse=True)
+
+        page = rows[:self.page_size]
+        self.next_position = (page[-1].created_at, page[-1].id) if len(rows) > self.page_size else None
+        return page
+
+    def decode_position(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            created_at, pk = b64decode(encoded.encode('ascii')).decode('ascii').split('|')
+            position = (datetime.fromisoformat(created_at), int(pk))
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        created_at, pk = self.next_position
+        encoded = b64encode(f'{created_at.isoformat()}|{pk}'.encode('ascii')).decode('ascii')
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, encoded)
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'previous': None, 'results': data})
@@ -0,0 +1,96 @@
+"""
+Read-replica routing for reporting queries.
+
+Views decorated with read_replica run their reads against the database
+named by REPLICA_DATABASE_ALIAS; everything else, and every write, uses
+the default database. A client that has just written is pinned to the
+primary for REPLICA_STICKY_SECONDS so it never reads its own change back
+from a replica that has not caught up yet.
+"""
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_COOKIE = 'primary_pin'
+UNSAFE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def replica_alias():
+    """The configured replica alias, or None when reads should stay on the primary."""
+    alias = getattr(settings, 'REPLICA_DATABASE_ALIAS', None)
+    return alias if alias and alias in settings.DATABASES else None
+
+
+def pin_key(user_pk):
+    return f'replica_pin:{user_pk}'
+
+
+def pinned_to_primary(request):
+    """Whether this client wrote recently enough that a replica may not have its change yet."""
+    if request.COOKIES.get(PIN_COOKIE):
+        return True
+    user = getattr(request, 'user', None)
+    return bool(user and user.is_authenticated and cache.get(pin_key(user.pk)))
+
+
+class ReplicaRouter:
+    """Send reads to the replica inside read_replica views; all writes go to default."""
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get():
+            return replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Instances read from the replica must still be saved to the primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+def read_replica(handler):
+    """
+    Decorate a DRF handler (get, list, retrieve) so its queries read from
+    the replica, unless the client is pinned to the primary after a write.
+    Replica reads are flagged on the request so versioned_etag can leave
+    their responses untagged.
+    """
+    @wraps(handler)
+    def wrapper(self, request, *args, **kwargs):
+        if replica_alias() is None or pinned_to_primary(request):
+            return handler(self, request, *args, **kwargs)
+        request.read_from_replica = True
+        token = _replica_reads.set(True)
+        try:
+            return handler(self, request, *args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+    return wrapper
+
+
+class ReplicaPinMiddleware:
+    """Pin a client to the primary for a while after a successful write."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (request.method in UNSAFE_METHODS and response.status_code < 400
+                and replica_alias() is not None):
+            seconds = settings.REPLICA_STICKY_SECONDS
+            response.set_cookie(PIN_COOKIE, '1', max_age=seconds, httponly=True, samesite='Lax')
+            # DRF copies the authenticated user (JWT included) onto the Django request
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                cache.set(pin_key(user.pk), True, seconds)
+        return response
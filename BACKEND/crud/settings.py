@@ -13,6 +13,7 @@ import os
 from pathlib import Path
 from datetime import timedelta
 from decouple import config
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -67,6 +68,8 @@ INSTALLED_APPS = [
     'contact',
     'volunteers',
     'students',
+    'gallery',
+    'dashboard',
 ]
 
 SITE_ID = 1
@@ -80,8 +83,23 @@ AUTHENTICATION_BACKENDS = [
 CELERY_TASK_ALWAYS_EAGER = True
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
+CELERY_BEAT_SCHEDULE = {
+    'refresh-dashboard-snapshot': {
+        'task': 'dashboard.tasks.refresh_dashboard_snapshot',
+        'schedule': config('DASHBOARD_SNAPSHOT_INTERVAL', default=300, cast=int),
+    },
+    'charge-due-pledges': {
+        'task': 'donations.tasks.charge_due_pledges',
+        'schedule': config('PLEDGE_SCHEDULER_INTERVAL', default=300, cast=int),
+    },
+    'archive-old-records': {
+        'task': 'donations.tasks.archive_old_records',
+        'schedule': config('ARCHIVE_INTERVAL', default=24 * 60 * 60, cast=int),
+    },
+}
 
 MIDDLEWARE = [
+    'crud.instrumentation.RequestMetricsMiddleware',
      'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -92,6 +110,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
+    'crud.routing.ReplicaPinMiddleware',
 ]
 
 # CORS Settings
@@ -101,6 +120,8 @@ CORS_ALLOWED_ORIGINS = [
     "http://localhost:5500",
     "http://127.0.0.1:8000",
 ]
+# Browser clients send Idempotency-Key on donation and STK push POSTs
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
 
 # REST Framework
 REST_FRAMEWORK = {
@@ -153,6 +174,91 @@ DATABASES = {
     }
 }
 
+# PostgreSQL instead of SQLite when POSTGRES_DB is set (needs psycopg2)
+POSTGRES_DB = config('POSTGRES_DB', default='')
+
+if POSTGRES_DB:
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': POSTGRES_DB,
+        'USER': config('POSTGRES_USER', default='postgres'),
+        'PASSWORD': config('POSTGRES_PASSWORD', default=''),
+        'HOST': config('POSTGRES_HOST', default='localhost'),
+        'PORT': config('POSTGRES_PORT', default='5432'),
+    }
+
+# Optional read replica for reporting and dashboard queries. The alias is
+# always declared, pointing at the primary until REPLICA_DATABASE_NAME is
+# set, so test runs get a separate replica test database; routing only
+# switches on with REPLICA_DATABASE_ALIAS.
+REPLICA_DATABASE_NAME = config('REPLICA_DATABASE_NAME', default='')
+
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'NAME': REPLICA_DATABASE_NAME or DATABASES['default']['NAME'],
+    # SQLite test databases are in-memory per alias; PostgreSQL needs its own name
+    'TEST': {'NAME': f"test_{REPLICA_DATABASE_NAME or POSTGRES_DB}_replica"} if POSTGRES_DB else {},
+}
+
+REPLICA_DATABASE_ALIAS = 'replica' if REPLICA_DATABASE_NAME else None
+DATABASE_ROUTERS = ['crud.routing.ReplicaRouter']
+
+# Seconds a client's reads stay on the primary after its own write
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=10, cast=int)
+
+
+# Cache
+# Redis is shared across gunicorn workers; fall back to per-process memory locally.
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'crud.instrumentation.InstrumentedRedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'crud.instrumentation.InstrumentedLocMemCache',
+        }
+    }
+
+# Per-request query/cache/serializer timings as a Server-Timing response header
+SERVER_TIMING_HEADER = config('SERVER_TIMING_HEADER', default=DEBUG, cast=bool)
+
+# Seconds the admin dashboard stats are reused before being recomputed
+DASHBOARD_STATS_CACHE_TIMEOUT = config('DASHBOARD_STATS_CACHE_TIMEOUT', default=60, cast=int)
+
+# Seconds a sharded campaign's summed total is reused between donations
+CAMPAIGN_TOTAL_CACHE_SECONDS = config('CAMPAIGN_TOTAL_CACHE_SECONDS', default=5, cast=int)
+
+# Rows each daily donation rollup bucket is spread over. Raise it (e.g. to 8)
+# together with campaign counter_shards when many donations land at once
+DONATION_ROLLUP_SHARDS = config('DONATION_ROLLUP_SHARDS', default=1, cast=int)
+
+# Oldest summary snapshot served (or reused by the refresh task) before it is
+# rebuilt, and how many snapshots are kept. The refresh task only notices
+# writes from web workers when they share a cache (set REDIS_URL)
+DASHBOARD_SNAPSHOT_MAX_AGE = config('DASHBOARD_SNAPSHOT_MAX_AGE', default=900, cast=int)
+DASHBOARD_SNAPSHOT_HISTORY = config('DASHBOARD_SNAPSHOT_HISTORY', default=24, cast=int)
+
+# STK pushes a single send_pledge_stk_pushes task keeps in flight
+PLEDGE_STK_CONCURRENCY = config('PLEDGE_STK_CONCURRENCY', default=8, cast=int)
+
+# Seconds a response stays replayable for retries carrying the same Idempotency-Key
+IDEMPOTENCY_KEY_TTL = config('IDEMPOTENCY_KEY_TTL', default=24 * 60 * 60, cast=int)
+
+# Closed donations and payments older than this move to the archive tables,
+# in batches of ARCHIVE_BATCH_SIZE (one transaction each)
+ARCHIVE_AFTER_DAYS = config('ARCHIVE_AFTER_DAYS', default=548, cast=int)
+ARCHIVE_BATCH_SIZE = config('ARCHIVE_BATCH_SIZE', default=1000, cast=int)
+
+# Serve opted-in list endpoints from values() rows instead of model instances.
+# Opt in per deployment; the regular serializers stay the default
+FAST_LIST_SERIALIZATION = config('FAST_LIST_SERIALIZATION', default=False, cast=bool)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -223,6 +329,16 @@ MPESA_SANDBOX_STK_URL = 'https://sandbox.safaricom.co.ke/mpesa/stkpush/v1/proces
 MPESA_PRODUCTION_AUTH_URL = 'https://api.safaricom.co.ke/oauth/v1/generate?grant_type=client_credentials'
 MPESA_PRODUCTION_STK_URL = 'https://api.safaricom.co.ke/mpesa/stkpush/v1/processrequest'
 
+# Send Daraja calls elsewhere instead, e.g. to the fake_daraja command at http://127.0.0.1:8001
+MPESA_API_BASE = config('MPESA_API_BASE', default='').rstrip('/')
+if MPESA_API_BASE:
+    MPESA_SANDBOX_AUTH_URL = f'{MPESA_API_BASE}/oauth/v1/generate?grant_type=client_credentials'
+    MPESA_SANDBOX_STK_URL = f'{MPESA_API_BASE}/mpesa/stkpush/v1/processrequest'
+    MPESA_ENVIRONMENT = 'sandbox'
+
+# Seconds before expiry a cached access token is replaced
+MPESA_TOKEN_EXPIRY_MARGIN = config('MPESA_TOKEN_EXPIRY_MARGIN', default=60, cast=int)
+
 MPESA_CONFIG = {
     'CONSUMER_KEY': config('MPESA_CONSUMER_KEY', default='your_consumer_key'),
     'CONSUMER_SECRET': config('MPESA_CONSUMER_SECRET', default='your_consumer_secret'),
@@ -0,0 +1,97 @@
+"""Test helpers shared across apps."""
+import re
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    Mixin for API test cases that pins how many queries an endpoint may run.
+
+    Seed the table to a realistic row count first, then call
+    ``assertQueryBudget`` so N+1 regressions fail loudly.
+    """
+
+    def assertQueryBudget(self, url, budget, method='get', **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, **kwargs)
+        if len(queries) > budget:
+            statements = '\n'.join(
+                f'{i}. {query["sql"]}' for i, query in enumerate(queries.captured_queries, 1)
+            )
+            self.fail(
+                f'{method.upper()} {url} ran {len(queries)} queries, budget is {budget}:\n{statements}'
+            )
+        return response
+
+
+class FastListParityMixin:
+    """
+    Mixin that requests a FastListMixin endpoint with and without the
+    values() read path and fails unless both render the same bytes.
+    """
+
+    def assertFastListParity(self, url, **kwargs):
+        with override_settings(FAST_LIST_SERIALIZATION=False):
+            expected = self.client.get(url, **kwargs)
+        with override_settings(FAST_LIST_SERIALIZATION=True):
+            actual = self.client.get(url, **kwargs)
+        self.assertEqual(expected.status_code, 200)
+        self.assertEqual(actual.status_code, expected.status_code)
+        self.assertEqual(actual.content, expected.content)
+        return actual
+
+
+class QueryPlanMixin:
+    """
+    Mixin that EXPLAINs the SQL an endpoint actually ran and fails if a
+    plan reads every row of a table instead of seeking through an index.
+
+    Capture the request with CaptureQueriesContext, then pass the captured
+    queries to ``assertQueriesUseIndex`` with the model whose table should be
+    read through an index. On PostgreSQL sequential scans are disabled for
+    the check, so a small seeded table can't hide a missing index behind the
+    planner's cost model.
+    """
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute(f'EXPLAIN {sql}')
+                return '\n'.join(row[0] for row in cursor.fetchall())
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return '\n'.join(row[-1] for row in cursor.fetchall())
+
+    def assertQueriesUseIndex(self, queries, model, contains=''):
+        """
+        Check every captured statement that reads ``model``'s table (and
+        contains ``contains``, to single out one query). Returns the plans.
+        """
+        table = model._meta.db_table
+        statements = [
+            query['sql'] for query in queries
+            if f'"{table}"' in query['sql'] and contains in query['sql']
+            and query['sql'].startswith(('SELECT', 'UPDATE', 'DELETE'))
+        ]
+        if not statements:
+            self.fail(f'No captured query read {table}')
+        plans = []
+        for sql in statements:
+            plan = self.explain(sql)
+            # Subqueries read the table under an alias such as U0
+            names = '|'.join([table, *re.findall(rf'"{table}" (U\d+)', sql)])
+            # SQLite reports "SCAN <table>" ("SCAN TABLE <table>" before 3.36) for a
+            # full pass, with "USING INDEX" when it walks an index in ORDER BY
+            # order; that only stops early when the query has a LIMIT
+            scan = re.search(rf'\bSCAN (?:TABLE )?(?:{names})\b( USING (COVERING )?INDEX)?', plan)
+            full_scan = (
+                (scan and not (scan.group(1) and re.search(r'\bLIMIT\b', sql)))
+                or re.search(rf'Seq Scan on {table}\b', plan)
+            )
+            if full_scan:
+                self.fail(f'Full scan of {table}:\n{plan}\n\n{sql}')
+            plans.append(plan)
+        return plans
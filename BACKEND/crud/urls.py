@@ -48,7 +48,10 @@ def api_root(request):
                 'status': '/api/payments/status/<checkout_id>/',
             },
             'dashboard': '/api/dashboard/stats/',
+            'dashboard_summary': '/api/dashboard/summary/',
             'students': '/api/students/',
+            'programs': '/api/programs/',
+            'gallery': '/api/gallery/',
         }
     })
 
@@ -70,9 +73,12 @@ urlpatterns = [
     path('api/volunteers/', include('volunteers.urls')),
     path('api/users/', include('users.urls')),
     path('api/dashboard/stats/', DashboardStatsView.as_view(), name='dashboard-stats'),
+    path('api/dashboard/', include('dashboard.urls')),
     path('api/payments/callback/', mpesa_callback, name='mpesa-callback'),
     path('api/payments/stk-push/', PaymentViewSet.as_view({'post': 'initiate_stk_push'}), name='stk-push'),
     path('api/students/', include('students.urls')),
+    path('api/programs/', include('programs.urls')),
+    path('api/gallery/', include('gallery.urls')),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,61 @@
+"""
+Per-model data version counters kept in the cache.
+
+Cached values that depend on a table include that table's version in their
+key. Saving or deleting a tracked model bumps the version, which makes the
+old cache entries unreachable without having to know their keys.
+"""
+import time
+
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+
+
+def version_key(model):
+    return f'version:{model._meta.label_lower}'
+
+
+def modified_key(model):
+    return f'modified:{model._meta.label_lower}'
+
+
+def initial_version():
+    # Seed from the clock so a flushed cache never reissues an old version
+    return int(time.time() * 1000)
+
+
+def get_versions(*models):
+    """Return the current version of each model, in order, in a single cache round trip."""
+    keys = [version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, initial_version(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def get_last_modified(*models):
+    """Unix time of the most recent change to any of ``models``, or None if unknown."""
+    stamps = cache.get_many([modified_key(model) for model in models]).values()
+    return max(stamps) if stamps else None
+
+
+def bump_version(model):
+    try:
+        cache.incr(version_key(model))
+    except ValueError:
+        cache.set(version_key(model), initial_version(), None)
+    cache.set(modified_key(model), int(time.time()), None)
+
+
+def _bump_sender_version(sender, **kwargs):
+    bump_version(sender)
+
+
+def track_versions(*models):
+    """Bump a model's version whenever one of its rows is saved or deleted."""
+    for model in models:
+        uid = f'track_versions:{model._meta.label_lower}'
+        post_save.connect(_bump_sender_version, sender=model, dispatch_uid=uid)
+        post_delete.connect(_bump_sender_version, sender=model, dispatch_uid=uid)
@@ -0,0 +1,80 @@
+"""
+Builds ActivityEvent rows and reads the feed with keyset pagination.
+
+Events are written once, when the row is created, so payloads carry no
+status: it would go stale as payments settle and applications or messages
+are handled. Migrations 0002 and 0004 repeat these payloads.
+"""
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+from .models import ActivityEvent
+
+
+def donation_activity(donation):
+    return ActivityEvent(
+        event_type='donation',
+        object_id=donation.id,
+        occurred_at=donation.created_at,
+        payload={
+            'donor_name': 'Anonymous' if donation.is_anonymous else donation.donor_name,
+            'amount': float(donation.amount),
+            'payment_method': donation.payment_method,
+        },
+    )
+
+
+def volunteer_activity(volunteer):
+    return ActivityEvent(
+        event_type='volunteer',
+        object_id=volunteer.id,
+        occurred_at=volunteer.created_at,
+        payload={
+            'name': volunteer.name,
+            'email': volunteer.email,
+        },
+    )
+
+
+def message_activity(message):
+    return ActivityEvent(
+        event_type='message',
+        object_id=message.id,
+        occurred_at=message.submitted_at,
+        payload={
+            'name': message.name,
+            'email': message.email,
+            'subject': message.subject,
+        },
+    )
+
+
+def encode_cursor(event):
+    raw = f'{event.occurred_at.isoformat()}|{event.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Return (occurred_at, id) for a cursor, or None if it is malformed."""
+    try:
+        occurred_at, event_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(occurred_at), int(event_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def recent_activity(limit, before=None):
+    """
+    Newest events first, optionally strictly older than the ``before`` cursor.
+    Returns the feed entries and the cursor for the next page (or None).
+    """
+    events = ActivityEvent.objects.order_by('-occurred_at', '-id')
+    if before is not None:
+        occurred_at, event_id = before
+        events = events.filter(
+            Q(occurred_at__lt=occurred_at) | Q(occurred_at=occurred_at, id__lt=event_id)
+        )
+    page = list(events[:limit + 1])
+    next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+    return [event.as_activity() for event in page[:limit]], next_cursor
@@ -0,0 +1,140 @@
+"""
+Fan-out of dashboard events to Server-Sent Events subscribers.
+
+Signal handlers publish a delta (new donation, volunteer or message) once
+the surrounding transaction commits. The event is serialized a single time
+and handed to every connected stream, so N open dashboards cost one event
+computation rather than N stats recomputations.
+
+When the default cache is Redis, events go out on a Redis pub/sub channel
+and one relay thread per process hands them to that process's streams, so
+every web worker sees rows written by any other worker or by Celery.
+Without Redis each process delivers only its own events.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import threading
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from django.core.serializers.json import DjangoJSONEncoder
+
+CHANNEL = 'dashboard:events'
+RELAY_RETRY_SECONDS = 5
+
+logger = logging.getLogger(__name__)
+
+
+def redis_client():
+    """The default cache's Redis client and channel name, or None when the cache isn't Redis."""
+    cache = caches['default']
+    if isinstance(cache, RedisCache):
+        return cache._cache.get_client(write=True), cache.make_key(CHANNEL)
+    return None
+
+
+def format_event(event_id, event_type, data):
+    payload = json.dumps(data, cls=DjangoJSONEncoder)
+    return f'id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n'
+
+
+class Subscription:
+    def __init__(self, loop, max_queue):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.overflowed = False
+
+    def offer(self, message):
+        # Runs on the subscriber's event loop
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def drain(self):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.overflowed = False
+
+
+class Broadcaster:
+    def __init__(self, max_queue=100):
+        self.max_queue = max_queue
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._relay = None
+
+    def subscribe(self):
+        subscription = Subscription(asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            self._subscribers.add(subscription)
+        self.start_relay()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def publish(self, event_type, data):
+        """
+        Send an event to every subscriber: through Redis to every process
+        when the cache is Redis, otherwise to this process's subscribers.
+        Safe to call from any thread.
+        """
+        shared = redis_client()
+        if shared is None:
+            return self.deliver(event_type, data)
+        client, channel = shared
+        client.publish(channel, json.dumps({'type': event_type, 'data': data}, cls=DjangoJSONEncoder))
+
+    def deliver(self, event_type, data):
+        """Queue an event for every subscriber in this process."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if not subscribers:
+            return
+        message = format_event(next(self._ids), event_type, data)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, message)
+            except RuntimeError:
+                # The subscriber's loop has closed without unsubscribing
+                self.unsubscribe(subscription)
+
+    def relay(self, raw):
+        """Deliver an event received from the Redis channel."""
+        event = json.loads(raw)
+        self.deliver(event['type'], event['data'])
+
+    def start_relay(self):
+        """Start this process's Redis listener, once, if the cache is Redis."""
+        shared = redis_client()
+        with self._lock:
+            if shared is None or (self._relay is not None and self._relay.is_alive()):
+                return
+            self._relay = threading.Thread(target=self.listen, args=shared, daemon=True)
+            self._relay.start()
+
+    def listen(self, client, channel):
+        from redis.exceptions import RedisError
+
+        while True:
+            try:
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(channel)
+                for message in pubsub.listen():
+                    self.relay(message['data'])
+            except RedisError:
+                logger.warning('Dashboard event relay lost Redis; retrying', exc_info=True)
+                time.sleep(RELAY_RETRY_SECONDS)
+
+
+broadcaster = Broadcaster()
@@ -0,0 +1,88 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, setup_databases, teardown_databases
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark DashboardSummaryView against a throwaway test database seeded '
+        'with increasing numbers of donations. Every request passes ?fresh=1, so '
+        'each one times a full summary build. Reports query count and latency.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10000,100000,1000000',
+                            help='Comma separated donation counts to benchmark')
+        parser.add_argument('--requests', type=int, default=20,
+                            help='Requests to time at each size')
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        old_config = setup_databases(verbosity=0, interactive=False, keepdb=False)
+        try:
+            self.run(sizes, options['requests'], options['batch_size'])
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+    def run(self, sizes, request_count, batch_size):
+        from django.contrib.auth import get_user_model
+        from donations.models import Donation
+        from dashboard.views import DashboardSummaryView
+
+        staff = get_user_model().objects.create_user(username='bench', password='bench', is_staff=True)
+        view = DashboardSummaryView.as_view()
+        factory = APIRequestFactory()
+        methods = [choice for choice, _ in Donation.PAYMENT_METHODS]
+        statuses = ['completed', 'completed', 'completed', 'pending', 'failed']
+
+        seeded = 0
+        self.stdout.write(f"{'donations':>10} {'queries':>8} {'p50 ms':>9} {'p95 ms':>9}")
+        for size in sizes:
+            while seeded < size:
+                count = min(batch_size, size - seeded)
+                created = Donation.objects.bulk_create([
+                    Donation(
+                        donor_name='Bench Donor',
+                        donor_email=f'bench{(seeded + i) % 5000}@example.com',
+                        amount=Decimal(random.randint(100, 100000)) / 100,
+                        payment_method=random.choice(methods),
+                        status=random.choice(statuses),
+                    )
+                    for i in range(count)
+                ])
+                # Spread batches over the last two years so period filters do real work
+                last_id = Donation.objects.order_by('-id').values_list('id', flat=True).first()
+                Donation.objects.filter(id__gt=last_id - len(created)).update(
+                    created_at=timezone.now() - timedelta(days=(seeded // batch_size) % 730)
+                )
+                seeded += count
+            # bulk_create bypasses the rollup signals
+            call_command('rebuild_donation_rollup', stdout=StringIO())
+
+            timings = []
+            query_count = 0
+            for _ in range(request_count):
+                request = factory.get('/api/dashboard/summary/', {'fresh': '1'})
+                force_authenticate(request, user=staff)
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    view(request).render()
+                    timings.append((time.perf_counter() - started) * 1000)
+                query_count = len(queries)
+
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            self.stdout.write(
+                f'{size:>10} {query_count:>8} {statistics.median(timings):>9.1f} {p95:>9.1f}'
+            )
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('donation', 'Donation'), ('volunteer', 'Volunteer'), ('message', 'Message')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('occurred_at', models.DateTimeField()),
+                ('payload', models.JSONField(default=dict)),
+            ],
+            options={
+                'verbose_name': 'Activity Event',
+                'verbose_name_plural': 'Activity Events',
+                'ordering': ['-occurred_at', '-id'],
+                'indexes': [models.Index(fields=['occurred_at', 'id'], name='activity_occurred_id_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+from django.db import migrations
+
+
+def backfill_activity_events(apps, schema_editor):
+    ActivityEvent = apps.get_model('dashboard', 'ActivityEvent')
+    Donation = apps.get_model('donations', 'Donation')
+    Volunteer = apps.get_model('volunteers', 'Volunteer')
+    ContactMessage = apps.get_model('contact', 'ContactMessage')
+
+    def events():
+        for d in Donation.objects.order_by('id').iterator(chunk_size=2000):
+            yield ActivityEvent(
+                event_type='donation', object_id=d.id, occurred_at=d.created_at,
+                # Same payloads as dashboard.activity, which migrations can't import
+                payload={
+                    'donor_name': 'Anonymous' if d.is_anonymous else d.donor_name,
+                    'amount': float(d.amount),
+                    'payment_method': d.payment_method,
+                },
+            )
+        for v in Volunteer.objects.order_by('id').iterator(chunk_size=2000):
+            yield ActivityEvent(
+                event_type='volunteer', object_id=v.id, occurred_at=v.created_at,
+                payload={'name': v.name, 'email': v.email},
+            )
+        for m in ContactMessage.objects.order_by('id').iterator(chunk_size=2000):
+            yield ActivityEvent(
+                event_type='message', object_id=m.id, occurred_at=m.submitted_at,
+                payload={'name': m.name, 'email': m.email, 'subject': m.subject},
+            )
+
+    batch = []
+    for event in events():
+        batch.append(event)
+        if len(batch) == 2000:
+            ActivityEvent.objects.bulk_create(batch)
+            batch = []
+    ActivityEvent.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+        ('donations', '0002_donationdailyrollup'),
+        ('volunteers', '0001_initial'),
+        ('contact', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_activity_events, migrations.RunPython.noop),
+    ]
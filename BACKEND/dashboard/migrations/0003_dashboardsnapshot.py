@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:26
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0002_backfill_activity_events'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('generated_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('source_version', models.CharField(blank=True, max_length=255)),
+                ('payload', models.JSONField(default=dict)),
+            ],
+            options={
+                'verbose_name': 'Dashboard Snapshot',
+                'verbose_name_plural': 'Dashboard Snapshots',
+                'ordering': ['-generated_at', '-id'],
+                'get_latest_by': 'generated_at',
+            },
+        ),
+    ]
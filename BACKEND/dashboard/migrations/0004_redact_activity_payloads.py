@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+def redact_activity_payloads(apps, schema_editor):
+    """
+    Mask anonymous donors and drop the status from events an earlier
+    0002 backfill (or the event writer) stored before payloads changed.
+    """
+    ActivityEvent = apps.get_model('dashboard', 'ActivityEvent')
+    Donation = apps.get_model('donations', 'Donation')
+
+    anonymous = set(Donation.objects.filter(is_anonymous=True).values_list('id', flat=True))
+    batch = []
+    for event in ActivityEvent.objects.order_by('id').iterator(chunk_size=2000):
+        payload = dict(event.payload)
+        payload.pop('status', None)
+        if event.event_type == 'donation' and event.object_id in anonymous:
+            payload['donor_name'] = 'Anonymous'
+        if payload != event.payload:
+            event.payload = payload
+            batch.append(event)
+        if len(batch) == 2000:
+            ActivityEvent.objects.bulk_update(batch, ['payload'])
+            batch = []
+    ActivityEvent.objects.bulk_update(batch, ['payload'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0003_dashboardsnapshot'),
+        ('donations', '0002_donationdailyrollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(redact_activity_payloads, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,86 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 # Create your models here.
+
+
+class ActivityEvent(models.Model):
+    """
+    Append-only timeline of dashboard activity, written by signal handlers.
+
+    Feeds read it newest first with a keyset on (occurred_at, id), which the
+    composite index serves directly.
+    """
+    EVENT_TYPES = [
+        ('donation', 'Donation'),
+        ('volunteer', 'Volunteer'),
+        ('message', 'Message'),
+    ]
+    
+    event_type = models.CharField(max_length=20, choices=EVENT_TYPES)
+    object_id = models.PositiveBigIntegerField()
+    occurred_at = models.DateTimeField()
+    payload = models.JSONField(default=dict)
+    
+    class Meta:
+        ordering = ['-occurred_at', '-id']
+        indexes = [
+            models.Index(fields=['occurred_at', 'id'], name='activity_occurred_id_idx'),
+        ]
+        verbose_name = "Activity Event"
+        verbose_name_plural = "Activity Events"
+    
+    def __str__(self):
+        return f"{self.event_type} #{self.object_id} at {self.occurred_at}"
+    
+    def as_activity(self):
+        """Feed entry in the shape the dashboards have always returned."""
+        return {
+            'type': self.event_type,
+            'id': self.object_id,
+            **self.payload,
+            'date': self.occurred_at.strftime('%Y-%m-%d'),
+            'occurred_at': self.occurred_at,
+        }
+
+
+class DashboardSnapshotManager(models.Manager):
+    def latest_usable(self):
+        """The newest snapshot, unless it is older than DASHBOARD_SNAPSHOT_MAX_AGE."""
+        cutoff = timezone.now() - timedelta(seconds=settings.DASHBOARD_SNAPSHOT_MAX_AGE)
+        return self.filter(generated_at__gte=cutoff).first()
+
+
+class DashboardSnapshot(models.Model):
+    """
+    Precomputed DashboardSummaryView payload.
+
+    source_version records the day and the data versions of every model the
+    payload was built from, so the refresh task can tell when nothing has
+    changed since the last build.
+    """
+    generated_at = models.DateTimeField(default=timezone.now, db_index=True)
+    source_version = models.CharField(max_length=255, blank=True)
+    payload = models.JSONField(default=dict)
+    
+    objects = DashboardSnapshotManager()
+    
+    class Meta:
+        ordering = ['-generated_at', '-id']
+        get_latest_by = 'generated_at'
+        verbose_name = "Dashboard Snapshot"
+        verbose_name_plural = "Dashboard Snapshots"
+    
+    def __str__(self):
+        return f"Dashboard snapshot #{self.pk} at {self.generated_at}"
+    
+    @classmethod
+    def capture(cls, payload, source_version=''):
+        """Store ``payload`` as the newest snapshot and drop those beyond the history limit."""
+        snapshot = cls.objects.create(payload=payload, source_version=source_version)
+        stale = cls.objects.values_list('id', flat=True)[settings.DASHBOARD_SNAPSHOT_HISTORY:]
+        cls.objects.filter(id__in=list(stale)).delete()
+        return snapshot
@@ -0,0 +1,60 @@
+import logging
+from django.db import DatabaseError, transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from crud.versioning import track_versions
+from donations.models import Donation, DonationDailyRollup
+from volunteers.models import Volunteer
+from contact.models import ContactMessage, NewsletterSubscriber
+from gallery.models import GalleryItem
+from programs.models import Program
+from students.models import Student
+from .activity import donation_activity, volunteer_activity, message_activity
+from .events import broadcaster
+
+# Models whose changes invalidate the cached admin dashboard stats
+DASHBOARD_MODELS = (Donation, Volunteer, ContactMessage, Program, Student)
+
+# Models the summary snapshot reads; an unchanged set of versions means an
+# unchanged snapshot
+SNAPSHOT_MODELS = DASHBOARD_MODELS + (DonationDailyRollup, GalleryItem, NewsletterSubscriber)
+
+track_versions(*DASHBOARD_MODELS, NewsletterSubscriber)
+
+logger = logging.getLogger(__name__)
+
+
+def record_activity(event):
+    """
+    Append the event to the timeline and push it to live streams once the
+    write commits, keeping the insert out of busy write transactions. The
+    feed is best effort: a failed append is logged and never fails the
+    write that triggered it.
+    """
+    def append():
+        try:
+            event.save()
+        except DatabaseError:
+            logger.exception('Could not record %s activity for #%s', event.event_type, event.object_id)
+            return
+        broadcaster.publish(event.event_type, event.as_activity())
+    # robust: Django logs anything else the callback raises instead of re-raising it
+    transaction.on_commit(append, robust=True)
+
+
+@receiver(post_save, sender=Donation)
+def record_new_donation(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_activity(donation_activity(instance))
+
+
+@receiver(post_save, sender=Volunteer)
+def record_new_volunteer(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_activity(volunteer_activity(instance))
+
+
+@receiver(post_save, sender=ContactMessage)
+def record_new_message(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_activity(message_activity(instance))
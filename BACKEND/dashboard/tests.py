@@ -1,3 +1,253 @@
-from django.test import TestCase
+import asyncio
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from donations.models import Donation
+from volunteers.models import Volunteer
+from .context_processors import dashboard_stats
+from .models import ActivityEvent, DashboardSnapshot
+from .tasks import refresh_dashboard_snapshot
+from .events import Broadcaster, broadcaster
 
-# Create your tests here.
+User = get_user_model()
+
+
+class DashboardSummaryTestCase(APITestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(username='staff', password='pass1234', is_staff=True)
+        self.client.force_authenticate(self.staff)
+
+    def create_donations(self, count, **kwargs):
+        # Activity events are appended once the donation commits
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(count):
+                Donation.objects.create(
+                    donor_name=f'Donor {i}',
+                    donor_email=f'donor{i}@example.com',
+                    amount=Decimal('10.00'),
+                    status=kwargs.get('status', 'completed'),
+                    payment_method=kwargs.get('payment_method', 'mpesa'),
+                )
+
+    def get_summary(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/dashboard/summary/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(queries)
+
+    def test_summary_totals(self):
+        self.create_donations(3)
+        self.create_donations(2, status='pending')
+        Volunteer.objects.create(
+            name='Vol', email='vol@example.com', phone='0700000000', age=30,
+            skills='Teaching', commitment_level='weekly', motivation='Help', status='approved'
+        )
+
+        response, _ = self.get_summary()
+        overview = response.data['overview']
+        self.assertEqual(overview['total_donations'], 30.0)
+        self.assertEqual(overview['monthly_donations'], 30.0)
+        self.assertEqual(overview['active_volunteers'], 1)
+        self.assertEqual(response.data['monthly_trend'][-1]['total'], 30.0)
+        self.assertEqual(len(response.data['monthly_trend']), 6)
+
+    def test_query_count_does_not_grow_with_donations(self):
+        self.create_donations(2)
+        _, small = self.get_summary(fresh=1)
+        self.create_donations(50, payment_method='paypal')
+        _, large = self.get_summary(fresh=1)
+        self.assertEqual(small, large)
+    
+    def test_serves_latest_snapshot_until_refreshed(self):
+        self.create_donations(1)
+        first, _ = self.get_summary()
+        self.create_donations(1)
+        
+        cached, _ = self.get_summary()
+        self.assertEqual(cached.data['snapshot_version'], first.data['snapshot_version'])
+        self.assertEqual(cached.data['overview']['total_donations'], 10.0)
+        # The activity feed is read live on every request
+        self.assertEqual(len(cached.data['recent_activity']), 2)
+        
+        fresh, _ = self.get_summary(fresh=1)
+        self.assertEqual(fresh.data['overview']['total_donations'], 20.0)
+        self.assertIn('generated_at', fresh.data)
+    
+    def test_refresh_task_skips_unchanged_data(self):
+        first = refresh_dashboard_snapshot()
+        self.assertEqual(refresh_dashboard_snapshot(), first)
+        self.create_donations(1)
+        self.assertNotEqual(refresh_dashboard_snapshot(), first)
+        self.assertEqual(DashboardSnapshot.objects.latest().payload['overview']['total_donations'], 10.0)
+    
+    def test_refresh_task_rebuilds_snapshots_past_max_age(self):
+        first = refresh_dashboard_snapshot()
+        DashboardSnapshot.objects.update(generated_at=timezone.now() - timedelta(seconds=1000))
+        with override_settings(DASHBOARD_SNAPSHOT_MAX_AGE=900):
+            self.assertNotEqual(refresh_dashboard_snapshot(), first)
+
+    def test_non_staff_forbidden(self):
+        user = User.objects.create_user(username='donor', password='pass1234')
+        self.client.force_authenticate(user)
+        response = self.client.get('/api/dashboard/summary/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class DashboardStatsContextProcessorTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().get('/admin/')
+
+    def monthly_donations(self):
+        return dashboard_stats(self.request)['dashboard_stats']['monthly_donations']
+
+    def test_non_admin_paths_get_nothing(self):
+        self.assertEqual(dashboard_stats(RequestFactory().get('/api/donations/')), {})
+
+    def test_stats_are_lazy(self):
+        with self.assertNumQueries(0):
+            dashboard_stats(self.request)
+
+    def test_stats_cached_until_a_tracked_model_changes(self):
+        self.assertEqual(self.monthly_donations(), 0)
+        with self.assertNumQueries(0):
+            self.monthly_donations()
+
+        Donation.objects.create(
+            donor_name='Donor', donor_email='donor@example.com',
+            amount=Decimal('12.50'), status='completed'
+        )
+        self.assertEqual(self.monthly_donations(), Decimal('12.50'))
+
+
+class BroadcasterTestCase(SimpleTestCase):
+    def test_publish_fans_out_to_all_subscribers(self):
+        async def scenario():
+            hub = Broadcaster()
+            first, second = hub.subscribe(), hub.subscribe()
+            hub.publish('donation', {'id': 1})
+            return await first.queue.get(), await second.queue.get()
+
+        first, second = asyncio.run(scenario())
+        self.assertEqual(first, second)
+        self.assertIn('event: donation', first)
+
+    def test_slow_subscriber_is_flagged_for_resync(self):
+        async def scenario():
+            hub = Broadcaster(max_queue=1)
+            subscription = hub.subscribe()
+            hub.publish('message', {'id': 1})
+            hub.publish('message', {'id': 2})
+            await asyncio.sleep(0)
+            return subscription
+
+        self.assertTrue(asyncio.run(scenario()).overflowed)
+
+    def test_events_go_through_redis_when_it_is_the_cache(self):
+        client = mock.Mock()
+        hub = Broadcaster()
+        with mock.patch('dashboard.events.redis_client', return_value=(client, 'dashboard:events')), \
+                mock.patch.object(hub, 'deliver') as deliver:
+            hub.publish('donation', {'id': 1})
+        deliver.assert_not_called()
+        channel, raw = client.publish.call_args.args
+        self.assertEqual(channel, 'dashboard:events')
+
+        # Every process's relay thread hands the message to its own streams
+        async def scenario():
+            subscription = hub.subscribe()
+            hub.relay(raw)
+            return await subscription.queue.get()
+
+        self.assertIn('data: {"id": 1}', asyncio.run(scenario()))
+
+
+class DashboardStreamTestCase(TestCase):
+    def test_new_donation_published_after_commit(self):
+        with mock.patch.object(broadcaster, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                Donation.objects.create(
+                    donor_name='Live', donor_email='live@example.com', amount=Decimal('7.00')
+                )
+        event_type, data = publish.call_args.args
+        self.assertEqual(event_type, 'donation')
+        self.assertEqual(data['amount'], 7.0)
+
+    def test_stream_requires_staff(self):
+        response = self.client.get('/api/dashboard/stream/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_stream_opens_for_staff(self):
+        staff = User.objects.create_user(username='staff', password='pass1234', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get('/api/dashboard/stream/')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertTrue(response.streaming)
+
+
+class ActivityFeedTestCase(APITestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(username='staff', password='pass1234', is_staff=True)
+        self.client.force_authenticate(self.staff)
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(5):
+                Donation.objects.create(
+                    donor_name=f'Donor {i}', donor_email=f'donor{i}@example.com', amount=Decimal('1.00')
+                )
+
+    def test_signal_appends_events(self):
+        self.assertEqual(ActivityEvent.objects.filter(event_type='donation').count(), 5)
+
+    def test_failed_append_does_not_fail_the_donation(self):
+        with mock.patch.object(ActivityEvent, 'save', side_effect=DatabaseError('disk full')):
+            with self.assertLogs('dashboard.signals', 'ERROR'), self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post('/api/donations/', {
+                    'donor_name': 'Ann', 'donor_email': 'ann@example.com', 'amount': '5.00',
+                }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Donation.objects.filter(pk=response.data['id']).exists())
+
+    def test_events_hide_anonymous_donors(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            donation = Donation.objects.create(
+                donor_name='Hidden Donor', donor_email='hidden@example.com',
+                amount=Decimal('1.00'), is_anonymous=True
+            )
+        event = ActivityEvent.objects.get(event_type='donation', object_id=donation.id)
+        self.assertEqual(event.payload['donor_name'], 'Anonymous')
+        self.assertNotIn('status', event.payload)
+
+    def test_volunteer_events_carry_no_status(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            volunteer = Volunteer.objects.create(
+                name='Vol', email='vol@example.com', phone='0700000000', age=30,
+                skills='Teaching', commitment_level='weekly', motivation='Help'
+            )
+        event = ActivityEvent.objects.get(event_type='volunteer', object_id=volunteer.id)
+        self.assertEqual(event.payload, {'name': 'Vol', 'email': 'vol@example.com'})
+
+    def test_keyset_pages_walk_the_whole_timeline(self):
+        seen = []
+        cursor = None
+        while True:
+            params = {'limit': 2}
+            if cursor:
+                params['before'] = cursor
+            response = self.client.get('/api/dashboard/activity/', params)
+            seen += [item['donor_name'] for item in response.data['results']]
+            cursor = response.data['next']
+            if cursor is None:
+                break
+        self.assertEqual(seen, [f'Donor {i}' for i in range(4, -1, -1)])
+
+    def test_invalid_cursor_rejected(self):
+        response = self.client.get('/api/dashboard/activity/', {'before': 'nope'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
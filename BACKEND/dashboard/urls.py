@@ -4,5 +4,7 @@ from . import views
 urlpatterns = [
     path('summary/', views.DashboardSummaryView.as_view(), name='dashboard_summary'),
     path('stats/', views.DashboardStatsView.as_view(), name='dashboard_stats'),
+    path('activity/', views.ActivityFeedView.as_view(), name='dashboard_activity'),
+    path('stream/', views.dashboard_stream, name='dashboard_stream'),
     path('', views.DashboardSummaryView.as_view(), name='dashboard_index'),
 ]
\ No newline at end of file
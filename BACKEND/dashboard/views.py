@@ -1,3 +1,9 @@
+import asyncio
+from time import monotonic
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
 
 # Create your views here.
@@ -6,16 +12,46 @@ from rest_framework.response import Response
 from rest_framework import permissions, status
 from django.db.models import Sum, Count, Q
 from django.utils import timezone
-from datetime import timedelta
-from donations.models import Donation
+from datetime import date, datetime, time, timedelta
+from donations.models import Donation, DonationDailyRollup
+from donations.timeseries import donation_timeseries
 from volunteers.models import Volunteer
 from programs.models import Program
-from payments.models import GalleryItem
+from gallery.models import GalleryItem
 from contact.models import ContactMessage, NewsletterSubscriber
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from crud.routing import read_replica
+from .activity import recent_activity, decode_cursor
+from .models import DashboardSnapshot
+from .tasks import build_snapshot
+from .events import broadcaster
+
+
+def month_start(day, months_back=0):
+    """Return the first day of the month ``months_back`` months before ``day``."""
+    month_index = day.year * 12 + (day.month - 1) - months_back
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def start_of_day(day):
+    """Aware datetime for midnight of ``day`` so date filters can use created_at indexes."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
 
 class DashboardSummaryView(APIView):
+    """
+    Staff dashboard overview.
+
+    Every figure is produced by a grouped or conditionally aggregated query,
+    so a build costs roughly one query per model regardless of how many
+    periods are reported. Builds normally run in the refresh_dashboard_snapshot
+    task; requests serve the latest snapshot, and ?fresh=1 rebuilds it inline.
+    """
     permission_classes = [permissions.IsAuthenticated]
+    TREND_MONTHS = 6
     
+    @read_replica
     def get(self, request):
         if not request.user.is_staff:
             return Response(
@@ -23,152 +59,112 @@ class DashboardSummaryView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
         
+        # Charts and totals come from the latest precomputed snapshot
+        fresh = request.query_params.get('fresh') in ('1', 'true')
+        snapshot = None if fresh else DashboardSnapshot.objects.latest_usable()
+        if snapshot is None:
+            snapshot = build_snapshot(force=fresh)
+        
+        # Recent activity: one indexed read of the activity timeline
+        recent, _ = recent_activity(10)
+        
+        return Response({
+            **snapshot.payload,
+            'recent_activity': recent,
+            'generated_at': snapshot.generated_at,
+            'snapshot_version': snapshot.id,
+        })
+    
+    def build_summary(self):
+        """Everything on the dashboard except the live activity feed."""
         # Time periods
         today = timezone.now().date()
-        this_month_start = today.replace(day=1)
-        last_month_start = (this_month_start - timedelta(days=1)).replace(day=1)
+        this_month_start = month_start(today)
+        last_month_start = month_start(today, 1)
         this_year_start = today.replace(month=1, day=1)
         
-        # Donations summary
-        total_donations = Donation.objects.filter(payment_status='completed').aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-        
-        monthly_donations = Donation.objects.filter(
-            payment_status='completed',
-            created_at__date__gte=this_month_start
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        last_month_donations = Donation.objects.filter(
-            payment_status='completed',
-            created_at__date__gte=last_month_start,
-            created_at__date__lt=this_month_start
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        yearly_donations = Donation.objects.filter(
-            payment_status='completed',
-            created_at__date__gte=this_year_start
-        ).aggregate(total=Sum('amount'))['total'] or 0
+        # Donations summary: one rollup query, one filtered Sum per period
+        completed = DonationDailyRollup.objects.filter(status='completed')
+        donation_totals = completed.aggregate(
+            total=Sum('total_amount'),
+            monthly=Sum('total_amount', filter=Q(date__gte=this_month_start)),
+            last_month=Sum('total_amount', filter=Q(
+                date__gte=last_month_start,
+                date__lt=this_month_start
+            )),
+            yearly=Sum('total_amount', filter=Q(date__gte=this_year_start)),
+        )
         
-        # Volunteers summary
-        total_volunteers = Volunteer.objects.count()
-        active_volunteers = Volunteer.objects.filter(status__in=['active', 'approved']).count()
-        pending_volunteers = Volunteer.objects.filter(status='pending').count()
+        # Volunteers summary: the status breakdown doubles as the chart data
+        volunteer_status_counts = dict(
+            Volunteer.objects.values_list('status').annotate(count=Count('id')).order_by()
+        )
         
         # Programs summary
-        total_programs = Program.objects.count()
-        active_programs = Program.objects.filter(status='active').count()
-        total_beneficiaries = Program.objects.aggregate(
-            total=Sum('beneficiaries_count')
-        )['total'] or 0
+        program_totals = Program.objects.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(status='active')),
+            beneficiaries=Sum('beneficiaries_count'),
+        )
         
         # Gallery summary
         total_gallery_items = GalleryItem.objects.filter(is_published=True).count()
         
         # Contact summary
-        total_messages = ContactMessage.objects.count()
-        new_messages = ContactMessage.objects.filter(status='new').count()
+        message_totals = ContactMessage.objects.aggregate(
+            total=Count('id'),
+            new=Count('id', filter=Q(status='new')),
+        )
         total_subscribers = NewsletterSubscriber.objects.filter(is_active=True).count()
         
-        # Recent activity
-        recent_donations = Donation.objects.filter(payment_status='completed').order_by('-created_at')[:5]
-        recent_volunteers = Volunteer.objects.filter(status__in=['active', 'approved']).order_by('-application_date')[:5]
-        recent_messages = ContactMessage.objects.all().order_by('-submitted_at')[:5]
-        
-        # Format recent data
-        recent_donations_data = [
-            {
-                'id': d.id,
-                'donor_name': d.donor_name,
-                'amount': float(d.amount),
-                'date': d.created_at.strftime('%Y-%m-%d'),
-                'type': 'donation'
-            }
-            for d in recent_donations
-        ]
-        
-        recent_volunteers_data = [
-            {
-                'id': v.id,
-                'name': v.name,
-                'email': v.email,
-                'status': v.get_status_display(),
-                'date': v.application_date.strftime('%Y-%m-%d'),
-                'type': 'volunteer'
-            }
-            for v in recent_volunteers
-        ]
-        
-        recent_messages_data = [
-            {
-                'id': m.id,
-                'name': m.name,
-                'email': m.email,
-                'subject': m.subject,
-                'status': m.get_status_display(),
-                'date': m.submitted_at.strftime('%Y-%m-%d'),
-                'type': 'message'
-            }
-            for m in recent_messages
-        ]
-        
-        # Combine recent activity
-        recent_activity = recent_donations_data + recent_volunteers_data + recent_messages_data
-        recent_activity.sort(key=lambda x: x['date'], reverse=True)
-        recent_activity = recent_activity[:10]
-        
-        # Monthly donation trend (last 6 months)
-        monthly_trend = []
-        for i in range(5, -1, -1):
-            month_start = (this_month_start - timedelta(days=30*i)).replace(day=1)
-            month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-            
-            monthly_total = Donation.objects.filter(
-                payment_status='completed',
-                created_at__date__gte=month_start,
-                created_at__date__lte=month_end
-            ).aggregate(total=Sum('amount'))['total'] or 0
-            
-            monthly_trend.append({
-                'month': month_start.strftime('%b %Y'),
-                'total': float(monthly_total)
-            })
-        
-        data = {
+        return {
             'overview': {
-                'total_donations': float(total_donations),
-                'monthly_donations': float(monthly_donations),
-                'last_month_donations': float(last_month_donations),
-                'yearly_donations': float(yearly_donations),
-                'total_volunteers': total_volunteers,
-                'active_volunteers': active_volunteers,
-                'pending_volunteers': pending_volunteers,
-                'total_programs': total_programs,
-                'active_programs': active_programs,
-                'total_beneficiaries': total_beneficiaries,
+                'total_donations': float(donation_totals['total'] or 0),
+                'monthly_donations': float(donation_totals['monthly'] or 0),
+                'last_month_donations': float(donation_totals['last_month'] or 0),
+                'yearly_donations': float(donation_totals['yearly'] or 0),
+                'total_volunteers': sum(volunteer_status_counts.values()),
+                'active_volunteers': (
+                    volunteer_status_counts.get('active', 0) +
+                    volunteer_status_counts.get('approved', 0)
+                ),
+                'pending_volunteers': volunteer_status_counts.get('pending', 0),
+                'total_programs': program_totals['total'],
+                'active_programs': program_totals['active'],
+                'total_beneficiaries': program_totals['beneficiaries'] or 0,
                 'total_gallery_items': total_gallery_items,
-                'total_messages': total_messages,
-                'new_messages': new_messages,
+                'total_messages': message_totals['total'],
+                'new_messages': message_totals['new'],
                 'total_subscribers': total_subscribers,
             },
-            'recent_activity': recent_activity,
-            'monthly_trend': monthly_trend,
+            'monthly_trend': self.get_monthly_trend(today),
             'charts': {
                 'donation_distribution': self.get_donation_distribution(),
                 'program_funding': self.get_program_funding_data(),
-                'volunteer_status': self.get_volunteer_status_data(),
+                'volunteer_status': self.get_volunteer_status_data(volunteer_status_counts),
             }
         }
-        
-        return Response(data)
+    
+    def get_monthly_trend(self, today):
+        # Closed months come from the time-series cache; only the current month is queried
+        buckets = donation_timeseries(
+            month_start(today, self.TREND_MONTHS - 1), today, 'month', status='completed'
+        )
+        return [
+            {
+                'month': bucket['period'].strftime('%b %Y'),
+                'total': bucket['total']
+            }
+            for bucket in buckets
+        ]
     
     def get_donation_distribution(self):
         # Get donations by payment method
-        distribution = Donation.objects.filter(payment_status='completed').values(
+        distribution = DonationDailyRollup.objects.filter(status='completed').values(
             'payment_method'
         ).annotate(
-            total=Sum('amount'),
-            count=Count('id')
+            total=Sum('total_amount'),
+            count=Sum('count')
         ).order_by('-total')
         
         return [
@@ -178,41 +174,65 @@ class DashboardSummaryView(APIView):
                 'count': item['count']
             }
             for item in distribution
+            if item['count']
         ]
     
     def get_program_funding_data(self):
-        programs = Program.objects.filter(status='active').annotate(
-            progress_percentage=(
-                (Sum('current_amount') / Sum('target_amount')) * 100 
-                if Sum('target_amount') > 0 else 0
-            )
-        ).values('title', 'target_amount', 'current_amount')[:10]
+        programs = Program.objects.filter(status='active').values(
+            'title', 'target_amount', 'current_amount', 'progress'
+        )[:10]
         
         return [
             {
                 'program': item['title'],
                 'target': float(item['target_amount'] or 0),
                 'current': float(item['current_amount'] or 0),
-                'progress': float(item['progress_percentage'] or 0)
+                'progress': float(item['progress'])
             }
             for item in programs
         ]
     
-    def get_volunteer_status_data(self):
-        status_counts = Volunteer.objects.values('status').annotate(
-            count=Count('id')
-        )
+    def get_volunteer_status_data(self, status_counts=None):
+        if status_counts is None:
+            status_counts = dict(
+                Volunteer.objects.values_list('status').annotate(count=Count('id')).order_by()
+            )
         
         status_map = dict(Volunteer.STATUS_CHOICES)
         
         return [
             {
-                'status': status_map.get(item['status'], item['status']),
-                'count': item['count']
+                'status': status_map.get(volunteer_status, volunteer_status),
+                'count': count
             }
-            for item in status_counts
+            for volunteer_status, count in status_counts.items()
         ]
 
+class ActivityFeedView(APIView):
+    """
+    Activity timeline, newest first, paged with an opaque keyset cursor.
+    GET /api/dashboard/activity/?before=<cursor>&limit=20
+    """
+    permission_classes = [permissions.IsAdminUser]
+    DEFAULT_LIMIT = 20
+    MAX_LIMIT = 100
+    
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', self.DEFAULT_LIMIT)), self.MAX_LIMIT)
+        except ValueError:
+            limit = self.DEFAULT_LIMIT
+        limit = max(limit, 1)
+        
+        before = None
+        if request.query_params.get('before'):
+            before = decode_cursor(request.query_params['before'])
+            if before is None:
+                return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        results, next_cursor = recent_activity(limit, before)
+        return Response({'results': results, 'next': next_cursor})
+
 class DashboardStatsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
@@ -228,37 +248,40 @@ class DashboardStatsView(APIView):
         last_week = today - timedelta(days=7)
         last_month = today - timedelta(days=30)
         
+        # Donations come from the daily rollup: cost scales with days, not donations
+        donations = DonationDailyRollup.objects.filter(
+            status='completed',
+            date__gte=last_month
+        ).aggregate(
+            today=Sum('total_amount', filter=Q(date=today)),
+            yesterday=Sum('total_amount', filter=Q(date=yesterday)),
+            last_week=Sum('total_amount', filter=Q(date__gte=last_week)),
+            last_month=Sum('total_amount'),
+        )
+        
+        volunteers = Volunteer.objects.filter(application_date__gte=last_month).aggregate(
+            today=Count('id', filter=Q(application_date=today)),
+            yesterday=Count('id', filter=Q(application_date=yesterday)),
+            last_week=Count('id', filter=Q(application_date__gte=last_week)),
+            last_month=Count('id'),
+        )
+        
+        messages = ContactMessage.objects.filter(
+            submitted_at__gte=start_of_day(last_month)
+        ).aggregate(
+            today=Count('id', filter=Q(submitted_at__gte=start_of_day(today))),
+            yesterday=Count('id', filter=Q(
+                submitted_at__gte=start_of_day(yesterday),
+                submitted_at__lt=start_of_day(today)
+            )),
+            last_week=Count('id', filter=Q(submitted_at__gte=start_of_day(last_week))),
+            last_month=Count('id'),
+        )
+        
         stats = {
-            'donations': {
-                'today': Donation.objects.filter(
-                    payment_status='completed',
-                    created_at__date=today
-                ).aggregate(total=Sum('amount'))['total'] or 0,
-                'yesterday': Donation.objects.filter(
-                    payment_status='completed',
-                    created_at__date=yesterday
-                ).aggregate(total=Sum('amount'))['total'] or 0,
-                'last_week': Donation.objects.filter(
-                    payment_status='completed',
-                    created_at__date__gte=last_week
-                ).aggregate(total=Sum('amount'))['total'] or 0,
-                'last_month': Donation.objects.filter(
-                    payment_status='completed',
-                    created_at__date__gte=last_month
-                ).aggregate(total=Sum('amount'))['total'] or 0,
-            },
-            'volunteers': {
-                'today': Volunteer.objects.filter(application_date=today).count(),
-                'yesterday': Volunteer.objects.filter(application_date=yesterday).count(),
-                'last_week': Volunteer.objects.filter(application_date__gte=last_week).count(),
-                'last_month': Volunteer.objects.filter(application_date__gte=last_month).count(),
-            },
-            'messages': {
-                'today': ContactMessage.objects.filter(submitted_at__date=today).count(),
-                'yesterday': ContactMessage.objects.filter(submitted_at__date=yesterday).count(),
-                'last_week': ContactMessage.objects.filter(submitted_at__date__gte=last_week).count(),
-                'last_month': ContactMessage.objects.filter(submitted_at__date__gte=last_month).count(),
-            }
+            'donations': {period: total or 0 for period, total in donations.items()},
+            'volunteers': volunteers,
+            'messages': messages,
         }
         
         # Convert Decimal to float for JSON serialization
@@ -268,4 +291,69 @@ class DashboardStatsView(APIView):
                     if hasattr(stats[category][period], '__float__'):
                         stats[category][period] = float(stats[category][period])
         
-        return Response(stats)
\ No newline at end of file
+        return Response(stats)
+
+
+STREAM_HEARTBEAT_SECONDS = 15
+# EventSource reconnects on its own; capping stream length bounds the cost of
+# connections whose disconnect the server never noticed.
+STREAM_MAX_SECONDS = 300
+
+
+def get_stream_user(request):
+    """
+    EventSource cannot send an Authorization header, so accept the admin
+    session or the dj-rest-auth JWT cookie.
+    """
+    if request.user.is_authenticated:
+        return request.user
+    raw_token = request.COOKIES.get(settings.REST_AUTH['JWT_AUTH_COOKIE'])
+    if raw_token:
+        authentication = JWTAuthentication()
+        try:
+            return authentication.get_user(authentication.get_validated_token(raw_token))
+        except (InvalidToken, TokenError):
+            pass
+    return None
+
+
+async def event_stream():
+    subscription = broadcaster.subscribe()
+    try:
+        yield 'retry: 5000\n\n'
+        deadline = monotonic() + STREAM_MAX_SECONDS
+        while monotonic() < deadline:
+            try:
+                message = await asyncio.wait_for(subscription.queue.get(), STREAM_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            if subscription.overflowed:
+                # Too far behind to replay deltas; tell the client to refetch the stats
+                subscription.drain()
+                yield 'event: resync\ndata: {}\n\n'
+                continue
+            yield message
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+async def dashboard_stream(request):
+    """
+    Server-Sent Events feed of new donations, volunteers and messages.
+    GET /api/dashboard/stream/
+    """
+    user = await sync_to_async(get_stream_user)(request)
+    if user is None or not user.is_staff:
+        return JsonResponse(
+            {"detail": "You do not have permission to access this resource."},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    response = StreamingHttpResponse(
+        event_stream(),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
\ No newline at end of file
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Donation, Donor, Campaign
+from .models import ArchivedDonation, Donation, Donor, Campaign, RecurringPledge
 
 @admin.register(Donation)
 class DonationAdmin(admin.ModelAdmin):
@@ -74,7 +74,7 @@ class CampaignAdmin(admin.ModelAdmin):
             'fields': ('title', 'description', 'image')
         }),
         ('Financial Goals', {
-            'fields': ('goal_amount', 'current_amount')
+            'fields': ('goal_amount', 'current_amount', 'counter_shards')
         }),
         ('Timeline', {
             'fields': ('start_date', 'end_date', 'is_active')
@@ -103,6 +103,33 @@ class CampaignAdmin(admin.ModelAdmin):
     
     def progress_display(self, obj):
         progress = obj.progress_percentage()
-        return f"{progress:.1f}% ({obj.current_amount}/{obj.goal_amount})"
+        return f"{progress:.1f}% ({obj.raised_amount}/{obj.goal_amount})"
     
-    progress_display.short_description = 'Current Progress'
\ No newline at end of file
+    progress_display.short_description = 'Current Progress'
+
+
+@admin.register(RecurringPledge)
+class RecurringPledgeAdmin(admin.ModelAdmin):
+    list_display = ('donor_name', 'amount', 'frequency', 'payment_method', 'status', 'next_due_at', 'charge_count')
+    list_filter = ('status', 'frequency', 'payment_method')
+    search_fields = ('donor_name', 'donor_email', 'donor_phone')
+    readonly_fields = ('last_charged_at', 'charge_count', 'created_at', 'updated_at')
+
+
+@admin.register(ArchivedDonation)
+class ArchivedDonationAdmin(admin.ModelAdmin):
+    list_display = ('donor_name', 'amount', 'payment_method', 'status', 'created_at', 'archived_at')
+    list_filter = ('status', 'payment_method', 'donation_type')
+    search_fields = ('donor_name', 'donor_email', 'donor_phone')
+    date_hierarchy = 'created_at'
+    list_per_page = 20
+    
+    # Archived rows are a read-only record; the archiver is the only writer
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
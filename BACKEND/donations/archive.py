@@ -0,0 +1,128 @@
+"""
+Hot/cold archival of donations and M-Pesa payments.
+
+Closed donations older than ARCHIVE_AFTER_DAYS move, with their payments,
+into ArchivedDonation and ArchivedMpesaPayment one batch per transaction:
+the rows are copied with a bulk INSERT and removed from the hot tables
+with a single DELETE that skips the delete signals, so rollups, donor
+totals and leaderboards keep counting them. A run that stops part way
+leaves every finished batch archived and the next run carries on with
+what is left. Payments that never had a donation are archived on their
+own once they are closed and old enough.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from crud.versioning import bump_version
+from .models import ArchivedDonation, Donation
+
+CLOSED_STATUSES = ('completed', 'failed', 'cancelled')
+# Year leaderboards and last year's receipts read hot donations only
+MIN_ARCHIVE_DAYS = 366
+
+
+def include_archived(request):
+    """Whether a listing or export asked for archived rows too (?include_archived=1)."""
+    return request.query_params.get('include_archived') in ('1', 'true')
+
+
+def archive_cutoff(days=None, now=None):
+    days = settings.ARCHIVE_AFTER_DAYS if days is None else days
+    if days < MIN_ARCHIVE_DAYS:
+        raise ValueError(f'Records younger than {MIN_ARCHIVE_DAYS} days cannot be archived')
+    return (now or timezone.now()) - timedelta(days=days)
+
+
+def claim_ids(queryset, batch_size):
+    """Ids of the next ``batch_size`` rows, skipping rows another archiver holds where possible."""
+    queryset = queryset.order_by('id')
+    if connection.features.has_select_for_update_skip_locked:
+        queryset = queryset.select_for_update(skip_locked=True)
+    return list(queryset.values_list('id', flat=True)[:batch_size])
+
+
+def move(queryset, archive_model):
+    """Copy ``queryset`` into ``archive_model`` and delete it from the hot table."""
+    fields = [field.attname for field in queryset.model._meta.concrete_fields]
+    archive_model.objects.bulk_create(
+        [archive_model(**row) for row in queryset.values(*fields)],
+        ignore_conflicts=True,
+    )
+    # A plain DELETE: the post_delete handlers would take the rows out of the aggregates
+    return queryset._raw_delete(queryset.db)
+
+
+def archive_batch(cutoff, batch_size):
+    """Archive one batch of donations and their payments; returns ``(donations, payments)``."""
+    from payments.models import ArchivedMpesaPayment, MpesaPayment
+
+    with transaction.atomic():
+        ids = claim_ids(
+            Donation.objects.filter(status__in=CLOSED_STATUSES, created_at__lt=cutoff), batch_size
+        )
+        if not ids:
+            return 0, 0
+        # Payments first; they reference the donations
+        payments = move(MpesaPayment.objects.filter(donation_id__in=ids), ArchivedMpesaPayment)
+        donations = move(Donation.objects.filter(id__in=ids), ArchivedDonation)
+    return donations, payments
+
+
+def archive_payment_batch(cutoff, batch_size):
+    """Archive one batch of closed payments that have no donation; returns the count."""
+    from payments.models import ArchivedMpesaPayment, MpesaPayment
+
+    with transaction.atomic():
+        ids = claim_ids(
+            MpesaPayment.objects.filter(
+                donation__isnull=True, status__in=CLOSED_STATUSES, created_at__lt=cutoff
+            ),
+            batch_size
+        )
+        if not ids:
+            return 0
+        return move(MpesaPayment.objects.filter(id__in=ids), ArchivedMpesaPayment)
+
+
+def archive_records(days=None, batch_size=None, max_batches=None, now=None, progress=None):
+    """Archive everything older than ``days`` in batches and return a summary."""
+    from payments.models import MpesaPayment
+
+    cutoff = archive_cutoff(days, now)
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    summary = {'cutoff': cutoff, 'donations': 0, 'payments': 0, 'batches': 0}
+    started = time.perf_counter()
+
+    def more():
+        return max_batches is None or summary['batches'] < max_batches
+
+    while more():
+        donations, payments = archive_batch(cutoff, batch_size)
+        if not donations:
+            break
+        summary['donations'] += donations
+        summary['payments'] += payments
+        summary['batches'] += 1
+        if progress:
+            progress(summary)
+
+    while more():
+        payments = archive_payment_batch(cutoff, batch_size)
+        if not payments:
+            break
+        summary['payments'] += payments
+        summary['batches'] += 1
+        if progress:
+            progress(summary)
+
+    # Listings and ETags cached against the hot tables are out of date
+    if summary['donations']:
+        bump_version(Donation)
+    if summary['payments']:
+        bump_version(MpesaPayment)
+    summary['seconds'] = round(time.perf_counter() - started, 2)
+    return summary
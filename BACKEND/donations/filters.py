@@ -1,14 +1,29 @@
+from datetime import datetime, time, timedelta
 import django_filters
+from django.utils import timezone
 from .models import Donation
 
+
+# Date bounds compare the raw (indexed) timestamp against local midnight,
+# and the end date is included in full
+
+def start_of_day_filter(queryset, name, value):
+    return queryset.filter(**{f'{name}__gte': timezone.make_aware(datetime.combine(value, time.min))})
+
+
+def end_of_day_filter(queryset, name, value):
+    next_day = timezone.make_aware(datetime.combine(value + timedelta(days=1), time.min))
+    return queryset.filter(**{f'{name}__lt': next_day})
+
+
 class DonationFilter(django_filters.FilterSet):
     min_amount = django_filters.NumberFilter(field_name="amount", lookup_expr='gte')
     max_amount = django_filters.NumberFilter(field_name="amount", lookup_expr='lte')
-    start_date = django_filters.DateFilter(field_name="created_at", lookup_expr='gte')
-    end_date = django_filters.DateFilter(field_name="created_at", lookup_expr='lte')
+    start_date = django_filters.DateFilter(field_name="created_at", method=start_of_day_filter)
+    end_date = django_filters.DateFilter(field_name="created_at", method=end_of_day_filter)
     payment_method = django_filters.CharFilter(field_name="payment_method", lookup_expr='iexact')
     donation_type = django_filters.CharFilter(field_name="donation_type", lookup_expr='iexact')
     
     class Meta:
         model = Donation
-        fields = ['payment_status', 'is_anonymous', 'program']
\ No newline at end of file
+        fields = ['status', 'is_anonymous']
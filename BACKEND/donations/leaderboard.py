@@ -0,0 +1,270 @@
+"""
+Top-donor leaderboards kept as sorted sets.
+
+Each board maps a donor email to the completed amount they gave, in whole
+cents: all time, this month or this year. Boards live in a Redis sorted set
+when the default cache is Redis, and in a per-process sorted list otherwise
+(the same scope as the local-memory cache, so only a single-process
+deployment should rely on it). Donation signals adjust a donor's score as
+their completed total changes, so top-N and rank reads never sort the
+Donor table.
+
+A board is built from the database only when it is missing, or after
+reset() (called following bulk writes that bypass the signals) bumps the
+leaderboard version.
+"""
+import threading
+from bisect import bisect_left, insort
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from crud.versioning import bump_version, get_versions
+
+PERIODS = ('all', 'month', 'year')
+CENTS = Decimal('0.01')
+# Period boards outlive their period long enough for late refund corrections
+PERIOD_BOARD_TIMEOUT = 400 * 24 * 60 * 60
+
+
+def period_start(period, day):
+    if period == 'month':
+        return day.replace(day=1)
+    if period == 'year':
+        return day.replace(month=1, day=1)
+    return None
+
+
+def period_end(period, start):
+    if period == 'month':
+        return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return date(start.year + 1, 1, 1)
+
+
+def board_name(period, day=None):
+    """Key of the ``period`` board containing ``day`` (today by default)."""
+    if period == 'all':
+        return 'all'
+    start = period_start(period, day or timezone.localdate())
+    return f'{period}:{start:%Y-%m}' if period == 'month' else f'{period}:{start:%Y}'
+
+
+def board_scores(period, day=None):
+    """Scores for a board computed from the database."""
+    from .models import Donation, Donor
+
+    if period == 'all':
+        rows = Donor.objects.filter(total_donated__gt=0).values_list('email', 'total_donated')
+    else:
+        start = period_start(period, day or timezone.localdate())
+        rows = Donation.objects.filter(
+            status='completed',
+            created_at__gte=timezone.make_aware(datetime.combine(start, time.min)),
+            created_at__lt=timezone.make_aware(datetime.combine(period_end(period, start), time.min)),
+        ).values_list('donor_email').annotate(total=Sum('amount')).order_by()
+    return {email: as_cents(total) for email, total in rows if total > 0}
+
+
+class MemoryStore:
+    """
+    Sorted sets in process memory: a score dict plus a list of
+    (-score, email) kept sorted by bisect. Finding a position takes
+    O(log n) comparisons; inserting or removing an entry shifts the list,
+    O(n) but a single memmove, which is cheap at leaderboard sizes.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.boards = {}
+
+    def is_ready(self, board, version):
+        with self.lock:
+            return board in self.boards and self.boards[board][2] == version
+
+    def replace(self, board, scores, version):
+        entries = sorted((-score, member) for member, score in scores.items())
+        with self.lock:
+            self.boards[board] = (dict(scores), entries, version)
+
+    def increment(self, board, member, delta):
+        self.update(board, member, lambda old: old + delta)
+
+    def set(self, board, member, score):
+        self.update(board, member, lambda old: score)
+
+    def update(self, board, member, new_score):
+        with self.lock:
+            if board not in self.boards:
+                # Never built; the first read loads it from the database
+                return
+            scores, entries, _ = self.boards[board]
+            old = scores.pop(member, None)
+            if old is not None:
+                del entries[bisect_left(entries, (-old, member))]
+            new = new_score(old or 0)
+            if new > 0:
+                scores[member] = new
+                insort(entries, (-new, member))
+
+    def top(self, board, limit):
+        with self.lock:
+            entries = self.boards[board][1] if board in self.boards else []
+            return [(member, -score) for score, member in entries[:limit]]
+
+    def rank(self, board, member):
+        with self.lock:
+            scores = self.boards[board][0] if board in self.boards else {}
+            if member not in scores:
+                return None, None
+            return bisect_left(self.boards[board][1], (-scores[member], member)), scores[member]
+
+
+class RedisStore:
+    """Sorted sets in Redis: ZINCRBY, ZREVRANGE and ZREVRANK, all O(log n)."""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    @property
+    def client(self):
+        return self.cache._cache.get_client(write=True)
+
+    def key(self, board):
+        return self.cache.make_key(f'leaderboard:{board}')
+
+    def timeout(self, board):
+        return None if board == 'all' else PERIOD_BOARD_TIMEOUT
+
+    def is_ready(self, board, version):
+        ready = self.client.get(self.key(f'{board}:ready'))
+        return ready is not None and int(ready) == version
+
+    def replace(self, board, scores, version):
+        # Build beside the live board and swap it in with one RENAME, so
+        # readers never see a half-built board
+        key, timeout = self.key(board), self.timeout(board)
+        building = self.key(f'{board}:building:{version}')
+        pipe = self.client.pipeline()
+        pipe.delete(building)
+        if scores:
+            pipe.zadd(building, scores)
+            pipe.rename(building, key)
+        else:
+            pipe.delete(key)
+        pipe.set(self.key(f'{board}:ready'), version, ex=timeout)
+        if timeout:
+            pipe.expire(key, timeout)
+        pipe.execute()
+
+    def increment(self, board, member, delta):
+        key = self.key(board)
+        pipe = self.client.pipeline()
+        pipe.zincrby(key, delta, member)
+        # Drop donors whose completed total fell back to zero
+        pipe.zremrangebyscore(key, '-inf', 0)
+        if self.timeout(board):
+            pipe.expire(key, self.timeout(board))
+        pipe.execute()
+
+    def set(self, board, member, score):
+        key = self.key(board)
+        if score > 0:
+            self.client.zadd(key, {member: score})
+        else:
+            self.client.zrem(key, member)
+
+    def top(self, board, limit):
+        if limit <= 0:
+            return []
+        rows = self.client.zrevrange(self.key(board), 0, limit - 1, withscores=True)
+        return [(member.decode(), int(score)) for member, score in rows]
+
+    def rank(self, board, member):
+        pipe = self.client.pipeline()
+        pipe.zrevrank(self.key(board), member)
+        pipe.zscore(self.key(board), member)
+        rank, score = pipe.execute()
+        return rank, None if score is None else int(score)
+
+
+_memory_store = MemoryStore()
+
+
+def get_store():
+    cache = caches['default']
+    if isinstance(cache, RedisCache):
+        return RedisStore(cache)
+    return _memory_store
+
+
+def as_cents(amount):
+    return int((Decimal(amount) / CENTS).to_integral_value())
+
+
+def as_amount(score):
+    return (Decimal(score) * CENTS).quantize(CENTS)
+
+
+def board_version():
+    from .models import Donor
+
+    # Donor totals change wholesale only through bulk writes, which call reset()
+    return get_versions(Donor)[0]
+
+
+def ensure_board(store, period):
+    board = board_name(period)
+    version = board_version()
+    if not store.is_ready(board, version):
+        store.replace(board, board_scores(period), version)
+    return board
+
+
+def top(period='all', limit=10):
+    """``[(email, amount), ...]`` for the ``limit`` highest scores on a board."""
+    store = get_store()
+    return [(email, as_amount(score)) for email, score in store.top(ensure_board(store, period), limit)]
+
+
+def rank(email, period='all'):
+    """``(rank, amount)`` for a donor, rank starting at 1, or ``(None, None)``."""
+    store = get_store()
+    position, score = store.rank(ensure_board(store, period), email)
+    if position is None:
+        return None, None
+    return position + 1, as_amount(score)
+
+
+def record(email, delta, donated_at, all_time=True):
+    """
+    Move ``email`` by ``delta`` on the month and year boards containing
+    ``donated_at``, and on the all-time board unless ``all_time`` is False,
+    once the transaction commits.
+    """
+    day = timezone.localdate(donated_at)
+    boards = [board_name('month', day), board_name('year', day)]
+    if all_time:
+        boards.insert(0, 'all')
+
+    def apply():
+        store = get_store()
+        for board in boards:
+            store.increment(board, email, as_cents(delta))
+    transaction.on_commit(apply)
+
+
+def set_total(email, total):
+    """Set a donor's all-time score after their row was saved directly."""
+    transaction.on_commit(lambda: get_store().set('all', email, as_cents(total)))
+
+
+def reset():
+    """Rebuild every board on its next read, after bulk writes."""
+    from .models import Donor
+
+    bump_version(Donor)
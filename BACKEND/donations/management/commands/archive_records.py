@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from donations.archive import archive_records
+
+
+class Command(BaseCommand):
+    help = (
+        'Move closed donations and M-Pesa payments older than ARCHIVE_AFTER_DAYS '
+        'into the archive tables, one transaction per batch. Stopping part way '
+        'is safe; the next run carries on with what is left.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.ARCHIVE_AFTER_DAYS,
+                            help='Archive records created more than this many days ago')
+        parser.add_argument('--batch-size', type=int, default=settings.ARCHIVE_BATCH_SIZE,
+                            help='Donations (or payments) moved per transaction')
+        parser.add_argument('--max-batches', type=int, default=None,
+                            help='Stop after this many batches')
+
+    def handle(self, *args, **options):
+        def progress(summary):
+            self.stdout.write(
+                f"Batch {summary['batches']}: {summary['donations']} donations, "
+                f"{summary['payments']} payments archived"
+            )
+
+        try:
+            summary = archive_records(
+                days=options['days'], batch_size=options['batch_size'],
+                max_batches=options['max_batches'], progress=progress,
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {summary['donations']} donations and {summary['payments']} payments "
+            f"created before {summary['cutoff']:%Y-%m-%d} in {summary['seconds']}s"
+        ))
@@ -0,0 +1,122 @@
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test.utils import override_settings, setup_databases, teardown_databases
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+
+class Command(BaseCommand):
+    help = (
+        'Fire concurrent donate calls at a single campaign in a throwaway test '
+        'database, then report throughput and check the final total. Pass several '
+        '--workers and --shards values to see how writes scale with sharded counters. '
+        'Run it against PostgreSQL (set POSTGRES_DB); SQLite serializes every '
+        'writer, so it only checks correctness there.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--donations', type=int, default=500,
+                            help='Total donate calls')
+        parser.add_argument('--workers', default='16',
+                            help='Comma separated numbers of concurrent threads')
+        parser.add_argument('--shards', default='0',
+                            help='Comma separated counter shard counts (0 = unsharded)')
+        parser.add_argument('--rollup-shards', type=int, default=None,
+                            help='DONATION_ROLLUP_SHARDS for the run (defaults to the largest --shards)')
+        parser.add_argument('--allow-sqlite', action='store_true',
+                            help='Run on SQLite anyway, to check totals rather than scaling')
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite' and not options['allow_sqlite']:
+            raise CommandError(
+                'SQLite allows one writer at a time; set POSTGRES_DB to benchmark concurrent '
+                'writers, or pass --allow-sqlite to only check the totals'
+            )
+        shard_counts = [int(value) for value in options['shards'].split(',')]
+        rollup_shards = options['rollup_shards'] or max(max(shard_counts), 1)
+        scratch = None
+        if connection.vendor == 'sqlite':
+            # Threads can't share the in-memory test database; use a file that waits for locks
+            scratch = tempfile.mkdtemp()
+            connection.settings_dict['TEST']['NAME'] = os.path.join(scratch, 'benchmark.sqlite3')
+            connection.settings_dict['OPTIONS'].setdefault('timeout', 60)
+        old_config = setup_databases(verbosity=0, interactive=False, keepdb=False)
+        try:
+            ok = True
+            # Today's rollup row would otherwise be the one row every donation updates
+            with override_settings(DONATION_ROLLUP_SHARDS=rollup_shards):
+                for shards in shard_counts:
+                    for workers in [int(value) for value in options['workers'].split(',')]:
+                        ok = self.run(options['donations'], workers, shards) and ok
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            if scratch:
+                shutil.rmtree(scratch, ignore_errors=True)
+        if not ok:
+            raise CommandError('Some runs lost or failed donations')
+        self.stdout.write(self.style.SUCCESS('Every final total is correct'))
+
+    def run(self, donation_count, worker_count, shard_count):
+        from donations.models import Campaign
+        from donations.views import CampaignViewSet
+
+        today = timezone.localdate()
+        campaign = Campaign.objects.create(
+            title='Benchmark', description='Concurrent donations',
+            goal_amount=Decimal('1000000.00'), start_date=today, end_date=today,
+            counter_shards=shard_count
+        )
+        amounts = [Decimal(random.randint(1, 100000)) / 100 for _ in range(donation_count)]
+        view = CampaignViewSet.as_view({'post': 'donate'})
+        factory = APIRequestFactory()
+        failures = []
+
+        def worker(batch):
+            try:
+                for amount in batch:
+                    request = factory.post(f'/api/campaigns/{campaign.pk}/donate/', {
+                        'amount': str(amount),
+                        'donor_name': 'Bench Donor',
+                        'donor_email': 'bench@example.com',
+                    }, format='json')
+                    try:
+                        response = view(request, pk=campaign.pk)
+                    except Exception as exc:
+                        failures.append(repr(exc))
+                        continue
+                    if response.status_code != 200:
+                        failures.append(response.status_code)
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=worker, args=(amounts[index::worker_count],))
+            for index in range(worker_count)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        campaign.refresh_from_db()
+        campaign.fold_counter_shards()
+        expected = sum(amounts, Decimal('0'))
+        correct = not failures and campaign.current_amount == expected
+        self.stdout.write(
+            f'shards={shard_count:<3} workers={worker_count:<3} {donation_count} donations in {elapsed:.2f}s '
+            f'({donation_count / elapsed:.0f}/s), {len(failures)} failed, '
+            f'total {campaign.current_amount} (expected {expected})'
+        )
+        if failures:
+            self.stderr.write(f'First failures: {failures[:5]}')
+        return correct
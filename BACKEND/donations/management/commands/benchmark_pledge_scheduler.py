@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.models import Count
+from django.test.utils import setup_databases, teardown_databases
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed due recurring pledges in a throwaway test database, run the pledge '
+        'scheduler from several concurrent workers and report throughput. Checks '
+        'that every pledge was charged exactly once. Pledges are card payments so '
+        'no STK push leaves the machine.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pledges', type=int, default=20000)
+        parser.add_argument('--workers', default='1,4',
+                            help='Comma separated numbers of concurrent scheduler workers')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        scratch = None
+        if connection.vendor == 'sqlite':
+            # Threads can't share the in-memory test database; use a file that waits for locks
+            scratch = tempfile.mkdtemp()
+            connection.settings_dict['TEST']['NAME'] = os.path.join(scratch, 'benchmark.sqlite3')
+            connection.settings_dict['OPTIONS'].setdefault('timeout', 60)
+        old_config = setup_databases(verbosity=0, interactive=False, keepdb=False)
+        try:
+            ok = True
+            for workers in [int(value) for value in options['workers'].split(',')]:
+                ok = self.run(options['pledges'], workers, options['batch_size']) and ok
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            if scratch:
+                shutil.rmtree(scratch, ignore_errors=True)
+        if not ok:
+            raise CommandError('Some pledges were charged more than once or not at all')
+        self.stdout.write(self.style.SUCCESS('Every pledge was charged exactly once'))
+
+    def run(self, pledge_count, worker_count, batch_size):
+        from donations.models import Donation, RecurringPledge
+        from donations.pledges import process_due_pledges
+
+        Donation.objects.all().delete()
+        RecurringPledge.objects.all().delete()
+        now = timezone.now()
+        RecurringPledge.objects.bulk_create([
+            RecurringPledge(
+                donor_name=f'Pledger {i}', donor_email=f'pledger{i}@example.com',
+                amount=Decimal(100 + i % 900), payment_method='credit_card', billing_day=1,
+                next_due_at=now - timedelta(minutes=i % 600),
+            )
+            for i in range(pledge_count)
+        ], batch_size=5000)
+
+        failures = []
+
+        def worker():
+            try:
+                process_due_pledges(batch_size=batch_size, now=now)
+            except Exception as exc:
+                failures.append(repr(exc))
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker) for _ in range(worker_count)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        charges = Donation.objects.values('pledge').annotate(count=Count('id'))
+        duplicates = charges.filter(count__gt=1).count()
+        charged = charges.count()
+        self.stdout.write(
+            f'{worker_count:>3} workers: {charged} of {pledge_count} pledges charged in {elapsed:.1f}s '
+            f'({charged / elapsed:,.0f} pledges/s), {duplicates} duplicates, {len(failures)} errors'
+        )
+        for failure in failures[:5]:
+            self.stderr.write(failure)
+        return not failures and not duplicates and charged == pledge_count
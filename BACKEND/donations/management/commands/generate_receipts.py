@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from donations.receipts import FORMATS, OUTPUTS, generate_receipts
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate year-end donation receipts for every donor with completed '
+        'donations in the year. Donors are read in chunks, rendered in a '
+        'process pool and written to default storage; rerunning resumes after '
+        'the last complete chunk.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, default=timezone.localdate().year - 1,
+                            help='Receipt year (defaults to last year)')
+        parser.add_argument('--formats', default=','.join(FORMATS),
+                            help='Comma separated formats: html, pdf')
+        parser.add_argument('--output', choices=OUTPUTS, default='zip',
+                            help='One zip per chunk, or one file per donor and format')
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='Donors read, rendered and written per batch')
+        parser.add_argument('--processes', type=int, default=None,
+                            help='Render workers (defaults to one per CPU; 1 renders inline)')
+        parser.add_argument('--directory', default=None,
+                            help='Storage directory (defaults to receipts/<year>)')
+        parser.add_argument('--restart', action='store_true',
+                            help='Ignore saved progress and start from the first donor')
+
+    def handle(self, *args, **options):
+        formats = [name.strip() for name in options['formats'].split(',') if name.strip()]
+        unknown = set(formats) - set(FORMATS)
+        if not formats or unknown:
+            raise CommandError(f'--formats must be a comma separated subset of {", ".join(FORMATS)}')
+
+        def progress(number, donors, files, seconds):
+            rate = donors / seconds if seconds else donors
+            self.stdout.write(f'Batch {number}: {donors} donors, {files} files, {rate:,.0f} donors/s')
+
+        summary = generate_receipts(
+            options['year'], formats=formats, output=options['output'],
+            chunk_size=options['chunk_size'], processes=options['processes'],
+            directory=options['directory'], restart=options['restart'], progress=progress,
+        )
+        if summary['already_complete']:
+            self.stdout.write('Receipts for this year are already complete; pass --restart to regenerate')
+            return
+        if summary['resumed_after']:
+            self.stdout.write(f"Resumed after {summary['resumed_after']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {summary['files']} files for {summary['donors']} donors in {summary['batches']} batches, "
+            f"{summary['seconds']}s ({summary['donors_per_second']} donors/s)"
+        ))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from donations.importer import FORMATS, detect_format, import_donations
+from donations.models import Donation
+
+
+class Command(BaseCommand):
+    help = 'Import donations from a CSV or NDJSON file in chunks, then report rows per second.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV (.csv) or NDJSON (.ndjson/.jsonl) file')
+        parser.add_argument('--format', dest='file_format', choices=FORMATS,
+                            help='File format, if it cannot be told from the extension')
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Rows validated and inserted per transaction')
+        parser.add_argument('--default-status', default='completed',
+                            choices=[choice for choice, _ in Donation.STATUS_CHOICES],
+                            help='Status for rows that do not specify one')
+
+    def handle(self, *args, **options):
+        file_format = options['file_format'] or detect_format(options['path'])
+        if file_format is None:
+            raise CommandError('Cannot tell the file format from its name; pass --format')
+
+        def progress(summary):
+            self.stdout.write(f"{summary['rows']} rows read, {summary['imported']} imported, {summary['failed']} failed")
+
+        try:
+            stream = open(options['path'], 'rb')
+        except OSError as exc:
+            raise CommandError(exc)
+        with stream:
+            summary = import_donations(
+                stream, file_format,
+                chunk_size=options['chunk_size'],
+                default_status=options['default_status'],
+                progress=progress,
+            )
+
+        for error in summary['errors']:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {summary['imported']} of {summary['rows']} rows in {summary['seconds']}s "
+            f"({summary['rows_per_second']} rows/s)"
+        ))
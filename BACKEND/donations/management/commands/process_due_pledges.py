@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from donations.pledges import process_due_pledges
+
+
+class Command(BaseCommand):
+    help = (
+        'Charge every recurring pledge that is due: claim pledges in batches, '
+        'bulk-create their donations and queue M-Pesa STK pushes. Safe to run '
+        'in several workers at once.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Pledges claimed and charged per transaction')
+        parser.add_argument('--max-batches', type=int, default=None,
+                            help='Stop after this many batches')
+
+    def handle(self, *args, **options):
+        def progress(summary):
+            self.stdout.write(f"Batch {summary['batches']}: {summary['pledges']} pledges charged")
+
+        summary = process_due_pledges(
+            batch_size=options['batch_size'], max_batches=options['max_batches'], progress=progress
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Charged {summary['pledges']} pledges and queued {summary['stk_pushes']} STK pushes "
+            f"in {summary['seconds']}s ({summary['pledges_per_second']} pledges/s)"
+        ))
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0003_donation_email_status_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaign',
+            name='counter_shards',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Number of counter shards for very busy campaigns (0 disables sharding)'),
+        ),
+        migrations.CreateModel(
+            name='CampaignCounterShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='counter_shard_rows', to='donations.campaign')),
+            ],
+            options={
+                'verbose_name': 'Campaign Counter Shard',
+                'verbose_name_plural': 'Campaign Counter Shards',
+                'unique_together': {('campaign', 'shard')},
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0004_campaign_counter_shards'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='campaign',
+            index=models.Index(fields=['created_at', 'id'], name='campaign_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='donation',
+            index=models.Index(fields=['created_at', 'id'], name='donation_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='donor',
+            index=models.Index(fields=['created_at', 'id'], name='donor_created_id_idx'),
+        ),
+    ]
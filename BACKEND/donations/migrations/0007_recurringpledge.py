@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:50
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0006_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecurringPledge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('donor_name', models.CharField(max_length=200)),
+                ('donor_email', models.EmailField(max_length=254)),
+                ('donor_phone', models.CharField(blank=True, max_length=20, null=True)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10, validators=[django.core.validators.MinValueValidator(0.01)])),
+                ('payment_method', models.CharField(choices=[('credit_card', 'Credit Card'), ('mpesa', 'M-Pesa'), ('paypal', 'PayPal'), ('bank_transfer', 'Bank Transfer')], default='mpesa', max_length=50)),
+                ('frequency', models.CharField(choices=[('monthly', 'Monthly'), ('annual', 'Annual')], default='monthly', max_length=20)),
+                ('billing_day', models.PositiveSmallIntegerField()),
+                ('status', models.CharField(choices=[('active', 'Active'), ('paused', 'Paused'), ('cancelled', 'Cancelled')], default='active', max_length=20)),
+                ('next_due_at', models.DateTimeField()),
+                ('last_charged_at', models.DateTimeField(blank=True, null=True)),
+                ('charge_count', models.PositiveIntegerField(default=0)),
+                ('claim_token', models.CharField(blank=True, db_index=True, editable=False, max_length=32, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Recurring Pledge',
+                'verbose_name_plural': 'Recurring Pledges',
+                'ordering': ['next_due_at'],
+                'indexes': [models.Index(fields=['status', 'next_due_at'], name='pledge_status_due_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='donation',
+            name='pledge',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='donations', to='donations.recurringpledge'),
+        ),
+    ]
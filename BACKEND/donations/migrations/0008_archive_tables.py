@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0007_recurringpledge'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedDonation',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('donor_name', models.CharField(max_length=200)),
+                ('donor_email', models.EmailField(max_length=254)),
+                ('donor_phone', models.CharField(blank=True, max_length=20, null=True)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('payment_method', models.CharField(choices=[('credit_card', 'Credit Card'), ('mpesa', 'M-Pesa'), ('paypal', 'PayPal'), ('bank_transfer', 'Bank Transfer')], max_length=50)),
+                ('donation_type', models.CharField(choices=[('one_time', 'One-time'), ('monthly', 'Monthly'), ('annual', 'Annual')], max_length=20)),
+                ('is_anonymous', models.BooleanField(default=False)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('completed', 'Completed'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('notes', models.TextField(blank=True, null=True)),
+                ('pledge_id', models.BigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Archived Donation',
+                'verbose_name_plural': 'Archived Donations',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['created_at', 'id'], name='archived_donation_created_idx'), models.Index(fields=['donor_email', 'status'], name='archived_donation_email_idx')],
+            },
+        ),
+    ]
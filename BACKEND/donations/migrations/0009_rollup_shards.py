@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0008_archive_tables'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='donationdailyrollup',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='donationdailyrollup',
+            name='shard',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterUniqueTogether(
+            name='donationdailyrollup',
+            unique_together={('date', 'status', 'payment_method', 'shard')},
+        ),
+    ]
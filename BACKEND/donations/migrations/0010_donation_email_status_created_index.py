@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0009_rollup_shards'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='donation',
+            index=models.Index(fields=['donor_email', 'status', 'created_at'], name='donation_email_status_at_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='donation',
+            name='donation_email_status_idx',
+        ),
+    ]
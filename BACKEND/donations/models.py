@@ -1,5 +1,14 @@
-from django.db import models
+import random
+from calendar import monthrange
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction, IntegrityError
+from django.db.models import Case, DateTimeField, F, Q, Sum, Value, When
+from django.utils import timezone
 from django.core.validators import MinValueValidator
+from crud.versioning import bump_version
 
 class Donation(models.Model):
     PAYMENT_METHODS = [
@@ -31,18 +40,83 @@ class Donation(models.Model):
     is_anonymous = models.BooleanField(default=False)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     notes = models.TextField(blank=True, null=True)
+    # Monthly and annual donations start a pledge; its later charges link back to it
+    pledge = models.ForeignKey(
+        'RecurringPledge', on_delete=models.SET_NULL, null=True, blank=True, related_name='donations'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.donor_name} - ${self.amount} ({self.status})"
     
+    def save(self, *args, **kwargs):
+        # Keep post_save handlers (rollups, aggregates) in the same transaction as the write
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+    
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Dashboards and reports: completed donations by date
+            models.Index(fields=['status', 'created_at'], name='donation_status_created_idx'),
+            # Donor totals are recomputed per email; receipts also bound the date
+            models.Index(fields=['donor_email', 'status', 'created_at'], name='donation_email_status_at_idx'),
+            # Cursor pagination keyset
+            models.Index(fields=['created_at', 'id'], name='donation_created_id_idx'),
+        ]
         verbose_name = "Donation"
         verbose_name_plural = "Donations"
 
 
+class DonationDailyRollup(models.Model):
+    """
+    Donation count and amount per day, status and payment method.
+
+    Maintained incrementally from Donation saves and deletes (see signals.py),
+    so dashboards aggregate over days rather than individual donations.
+    With DONATION_ROLLUP_SHARDS above 1 each bucket is split over that many
+    rows and writers pick one at random, so concurrent donations don't all
+    wait on today's row; readers always Sum() over the rows.
+    """
+    date = models.DateField()
+    status = models.CharField(max_length=20, choices=Donation.STATUS_CHOICES)
+    payment_method = models.CharField(max_length=50, choices=Donation.PAYMENT_METHODS)
+    shard = models.PositiveSmallIntegerField(default=0)
+    count = models.IntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    
+    def __str__(self):
+        return f"{self.date} {self.status}/{self.payment_method}: {self.count} (${self.total_amount})"
+    
+    @classmethod
+    def record(cls, date, status, payment_method, count, amount):
+        """Add ``count`` donations totalling ``amount`` to a bucket, creating it if needed."""
+        if date < timezone.localdate() - timedelta(days=1):
+            # The time series caches days before yesterday for good; retire them
+            transaction.on_commit(lambda: bump_version(cls))
+        shard = random.randrange(settings.DONATION_ROLLUP_SHARDS) if settings.DONATION_ROLLUP_SHARDS > 1 else 0
+        bucket = cls.objects.filter(date=date, status=status, payment_method=payment_method, shard=shard)
+        changes = {'count': F('count') + count, 'total_amount': F('total_amount') + amount}
+        if bucket.update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    date=date, status=status, payment_method=payment_method, shard=shard,
+                    count=count, total_amount=amount
+                )
+        except IntegrityError:
+            # Another writer created the bucket first
+            bucket.update(**changes)
+    
+    class Meta:
+        ordering = ['-date']
+        unique_together = ['date', 'status', 'payment_method', 'shard']
+        verbose_name = "Donation Daily Rollup"
+        verbose_name_plural = "Donation Daily Rollups"
+
+
 class Donor(models.Model):
     name = models.CharField(max_length=200)
     email = models.EmailField(unique=True)
@@ -57,8 +131,51 @@ class Donor(models.Model):
     def __str__(self):
         return f"{self.name} (${self.total_donated})"
     
+    @classmethod
+    def record(cls, email, amount, count=1, donated_at=None, name='', phone=None):
+        """
+        Add ``count`` completed donations totalling ``amount`` to the donor with
+        ``email`` in one UPDATE, creating the donor if needed. Negative values
+        remove donations; first/last dates only move when ``donated_at`` is given.
+        Returns True when the donor row was created.
+        """
+        changes = {
+            'total_donated': F('total_donated') + amount,
+            'donation_count': F('donation_count') + count,
+            'updated_at': timezone.now(),
+        }
+        if donated_at is not None:
+            donated = Value(donated_at, output_field=DateTimeField())
+            changes['first_donation_date'] = Case(
+                When(Q(first_donation_date__isnull=True) | Q(first_donation_date__gt=donated_at), then=donated),
+                default=F('first_donation_date'),
+            )
+            changes['last_donation_date'] = Case(
+                When(Q(last_donation_date__isnull=True) | Q(last_donation_date__lt=donated_at), then=donated),
+                default=F('last_donation_date'),
+            )
+        
+        donor = cls.objects.filter(email=email)
+        if donor.update(**changes) or count <= 0:
+            return False
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    name=name, email=email, phone=phone,
+                    total_donated=amount, donation_count=count,
+                    first_donation_date=donated_at, last_donation_date=donated_at
+                )
+            return True
+        except IntegrityError:
+            # Another writer created the donor first
+            donor.update(**changes)
+            return False
+    
     class Meta:
         ordering = ['-total_donated']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='donor_created_id_idx'),
+        ]
         verbose_name = "Donor"
         verbose_name_plural = "Donors"
 
@@ -72,17 +189,247 @@ class Campaign(models.Model):
     end_date = models.DateField()
     is_active = models.BooleanField(default=True)
     image = models.ImageField(upload_to='campaigns/', blank=True, null=True)
+    # 0 updates current_amount directly; N spreads donations over N counter shards
+    counter_shards = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Number of counter shards for very busy campaigns (0 disables sharding)"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
         return self.title
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        campaign = super().from_db(db, field_names, values)
+        campaign._stored_counter_shards = campaign.__dict__.get('counter_shards')
+        return campaign
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        # Only a save that turns sharding off has shards to fold
+        unsharding = (
+            self.counter_shards == 0 and getattr(self, '_stored_counter_shards', 0)
+            and (update_fields is None or 'counter_shards' in update_fields)
+        )
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if unsharding:
+                self.fold_counter_shards()
+        self._stored_counter_shards = self.counter_shards
+    
+    def add_amount(self, amount):
+        """
+        Atomically add ``amount`` to the campaign total. The increment happens
+        in the database, so concurrent donations can't overwrite each other.
+
+        Unsharded campaigns write only current_amount. Sharded campaigns
+        increment a random shard row instead, so concurrent donations
+        rarely wait on the same row lock.
+        """
+        if self.counter_shards:
+            CampaignCounterShard.add(self, random.randrange(self.counter_shards), amount)
+            return
+        self.current_amount = F('current_amount') + amount
+        self.save(update_fields=['current_amount'])
+        self.refresh_from_db(fields=['current_amount'])
+    
+    def fold_counter_shards(self):
+        """Move everything held in counter shards into current_amount."""
+        shards = dict(self.counter_shard_rows.select_for_update().values_list('id', 'amount'))
+        if not shards:
+            return
+        Campaign.objects.filter(pk=self.pk).update(current_amount=F('current_amount') + sum(shards.values()))
+        CampaignCounterShard.objects.filter(id__in=shards).delete()
+        self.refresh_from_db(fields=['current_amount'])
+    
+    @property
+    def raised_amount(self):
+        """
+        current_amount plus any counter shards. The sharded total is cached
+        for CAMPAIGN_TOTAL_CACHE_SECONDS, so during a busy hour reads lag
+        donations by at most that long and cost no query in between.
+        """
+        if not self.counter_shards:
+            return self.current_amount
+        key = f'campaign_total:{self.pk}'
+        total = cache.get(key)
+        if total is None:
+            total = Campaign.objects.filter(pk=self.pk).annotate(
+                held=Sum('counter_shard_rows__amount')
+            ).values_list('current_amount', 'held').first()
+            total = total[0] + (total[1] or 0) if total else self.current_amount
+            cache.set(key, total, settings.CAMPAIGN_TOTAL_CACHE_SECONDS)
+        return total
+    
     def progress_percentage(self):
         if self.goal_amount > 0:
-            return (self.current_amount / self.goal_amount) * 100
+            return (self.raised_amount / self.goal_amount) * 100
         return 0
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='campaign_created_id_idx'),
+        ]
         verbose_name = "Campaign"
-        verbose_name_plural = "Campaigns"
\ No newline at end of file
+        verbose_name_plural = "Campaigns"
+
+class CampaignCounterShard(models.Model):
+    """
+    One slice of a sharded campaign's running total. The campaign total is
+    current_amount plus the sum of its shards.
+    """
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='counter_shard_rows')
+    shard = models.PositiveSmallIntegerField()
+    amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    
+    def __str__(self):
+        return f"{self.campaign} shard {self.shard}: ${self.amount}"
+    
+    @classmethod
+    def add(cls, campaign, shard, amount):
+        """Add ``amount`` to a shard row, creating it if needed."""
+        row = cls.objects.filter(campaign=campaign, shard=shard)
+        if row.update(amount=F('amount') + amount):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(campaign=campaign, shard=shard, amount=amount)
+        except IntegrityError:
+            # Another writer created the shard first
+            row.update(amount=F('amount') + amount)
+    
+    class Meta:
+        unique_together = ['campaign', 'shard']
+        verbose_name = "Campaign Counter Shard"
+        verbose_name_plural = "Campaign Counter Shards"
+
+
+def add_months(moment, months, day):
+    """``moment`` moved ``months`` ahead, on ``day`` or the last day of a shorter month."""
+    moment = timezone.localtime(moment)
+    year, month = divmod(moment.year * 12 + moment.month - 1 + months, 12)
+    return moment.replace(year=year, month=month + 1, day=min(day, monthrange(year, month + 1)[1]))
+
+
+class RecurringPledge(models.Model):
+    """
+    A monthly or annual donation commitment. The pledge scheduler (see
+    pledges.py) creates a pending Donation each time next_due_at passes.
+    Pledges start paused and become active once the donation that started
+    them completes, so a failed first payment never leads to later charges.
+    """
+    FREQUENCIES = [
+        ('monthly', 'Monthly'),
+        ('annual', 'Annual'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('active', 'Active'),
+        ('paused', 'Paused'),
+        ('cancelled', 'Cancelled'),
+    ]
+    
+    donor_name = models.CharField(max_length=200)
+    donor_email = models.EmailField()
+    donor_phone = models.CharField(max_length=20, blank=True, null=True)
+    amount = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0.01)])
+    payment_method = models.CharField(max_length=50, choices=Donation.PAYMENT_METHODS, default='mpesa')
+    frequency = models.CharField(max_length=20, choices=FREQUENCIES, default='monthly')
+    # Charges fall on this day of the month, or the month's last day if it is shorter
+    billing_day = models.PositiveSmallIntegerField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
+    next_due_at = models.DateTimeField()
+    last_charged_at = models.DateTimeField(null=True, blank=True)
+    charge_count = models.PositiveIntegerField(default=0)
+    # Marks the batch a SQLite scheduler run claimed; unused where SKIP LOCKED exists
+    claim_token = models.CharField(max_length=32, null=True, blank=True, db_index=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.donor_name} - ${self.amount} {self.frequency} ({self.status})"
+    
+    @classmethod
+    def start_from(cls, donation):
+        """
+        Create the pledge a monthly or annual donation commits to, due one
+        period later; it stays paused until that donation completes.
+        """
+        started = timezone.localtime(donation.created_at)
+        pledge = cls(
+            donor_name=donation.donor_name, donor_email=donation.donor_email,
+            donor_phone=donation.donor_phone, amount=donation.amount,
+            payment_method=donation.payment_method, frequency=donation.donation_type,
+            billing_day=started.day, status='active' if donation.status == 'completed' else 'paused',
+        )
+        pledge.next_due_at = pledge.following_due(started)
+        pledge.save()
+        donation.pledge = pledge
+        Donation.objects.filter(pk=donation.pk).update(pledge=pledge)
+        return pledge
+    
+    def following_due(self, moment):
+        return add_months(moment, 12 if self.frequency == 'annual' else 1, self.billing_day)
+    
+    def next_donation(self):
+        return Donation(
+            donor_name=self.donor_name, donor_email=self.donor_email, donor_phone=self.donor_phone,
+            amount=self.amount, payment_method=self.payment_method, donation_type=self.frequency,
+            status='pending', pledge=self,
+        )
+    
+    def advance(self, now):
+        """Record a charge and move next_due_at past ``now``; missed periods are not back-charged."""
+        self.last_charged_at = now
+        self.updated_at = now
+        self.charge_count += 1
+        self.claim_token = None
+        due = self.following_due(self.next_due_at)
+        while due <= now:
+            due = self.following_due(due)
+        self.next_due_at = due
+    
+    class Meta:
+        ordering = ['next_due_at']
+        indexes = [
+            # The scheduler reads active pledges in due order
+            models.Index(fields=['status', 'next_due_at'], name='pledge_status_due_idx'),
+        ]
+        verbose_name = "Recurring Pledge"
+        verbose_name_plural = "Recurring Pledges"
+
+
+class ArchivedDonation(models.Model):
+    """
+    A closed Donation moved out of the hot table by the archiver (see
+    archive.py). Rows keep their original id and timestamps; rollups and
+    donor totals already count them, so archiving changes no aggregate.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    donor_name = models.CharField(max_length=200)
+    donor_email = models.EmailField()
+    donor_phone = models.CharField(max_length=20, blank=True, null=True)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    payment_method = models.CharField(max_length=50, choices=Donation.PAYMENT_METHODS)
+    donation_type = models.CharField(max_length=20, choices=Donation.DONATION_TYPES)
+    is_anonymous = models.BooleanField(default=False)
+    status = models.CharField(max_length=20, choices=Donation.STATUS_CHOICES)
+    notes = models.TextField(blank=True, null=True)
+    pledge_id = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.donor_name} - ${self.amount} ({self.status}, archived)"
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='archived_donation_created_idx'),
+            models.Index(fields=['donor_email', 'status'], name='archived_donation_email_idx'),
+        ]
+        verbose_name = "Archived Donation"
+        verbose_name_plural = "Archived Donations"
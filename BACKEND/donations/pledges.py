@@ -0,0 +1,89 @@
+"""
+Recurring pledge charging.
+
+process_due_pledges claims due pledges a batch at a time. It creates each
+batch's donations with one bulk INSERT and advances the pledges in the
+same transaction, so every pledge is charged once per period however many
+workers run and wherever one of them stops. M-Pesa charges are queued
+after commit as send_pledge_stk_pushes tasks of STK_PUSH_CHUNK donations.
+Each task keeps at most PLEDGE_STK_CONCURRENCY pushes in flight.
+"""
+import time
+import uuid
+
+from django.db import connection, transaction
+from django.db.models import Subquery
+from django.utils import timezone
+
+from crud.versioning import bump_version
+from .importer import bulk_create_donations
+from .models import Donation, RecurringPledge
+
+STK_PUSH_CHUNK = 50
+
+
+def claim_due_pledges(now, batch_size):
+    """Up to ``batch_size`` due pledges no other worker holds. Call inside transaction.atomic()."""
+    due = RecurringPledge.objects.filter(status='active', next_due_at__lte=now).order_by('next_due_at', 'id')
+    if connection.features.has_select_for_update_skip_locked:
+        # Rows locked by another worker's batch are skipped, not waited on
+        return list(due.select_for_update(skip_locked=True)[:batch_size])
+    # SQLite has one writer at a time. Claiming with an UPDATE before reading
+    # takes the write lock first, so a second worker waits and then finds
+    # these pledges already advanced.
+    token = uuid.uuid4().hex
+    RecurringPledge.objects.filter(pk__in=Subquery(due.values('pk')[:batch_size])).update(claim_token=token)
+    return list(RecurringPledge.objects.filter(claim_token=token))
+
+
+def queue_stk_pushes(donation_ids):
+    from .tasks import send_pledge_stk_pushes
+
+    for start in range(0, len(donation_ids), STK_PUSH_CHUNK):
+        send_pledge_stk_pushes.delay(donation_ids[start:start + STK_PUSH_CHUNK])
+
+
+def charge_batch(now, batch_size):
+    """Charge one batch of due pledges; returns ``(pledges, stk_pushes)`` charged."""
+    with transaction.atomic():
+        pledges = claim_due_pledges(now, batch_size)
+        if not pledges:
+            return 0, 0
+        created = bulk_create_donations([pledge.next_donation() for pledge in pledges])
+        for pledge in pledges:
+            pledge.advance(now)
+        RecurringPledge.objects.bulk_update(
+            pledges, ['next_due_at', 'last_charged_at', 'charge_count', 'claim_token', 'updated_at']
+        )
+        stk_ids = [
+            donation.id for donation in created
+            if donation.payment_method == 'mpesa' and donation.donor_phone
+        ]
+        if stk_ids:
+            transaction.on_commit(lambda: queue_stk_pushes(stk_ids))
+    return len(pledges), len(stk_ids)
+
+
+def process_due_pledges(batch_size=500, max_batches=None, now=None, progress=None):
+    """Charge every pledge due at ``now`` (default: the current time) and return a summary."""
+    now = now or timezone.now()
+    summary = {'pledges': 0, 'stk_pushes': 0, 'batches': 0}
+    started = time.perf_counter()
+
+    while max_batches is None or summary['batches'] < max_batches:
+        charged, pushes = charge_batch(now, batch_size)
+        if not charged:
+            break
+        summary['pledges'] += charged
+        summary['stk_pushes'] += pushes
+        summary['batches'] += 1
+        if progress:
+            progress(summary)
+
+    if summary['pledges']:
+        # bulk_create skipped the signals that retire cached donation figures
+        bump_version(Donation)
+    elapsed = time.perf_counter() - started
+    summary['seconds'] = round(elapsed, 2)
+    summary['pledges_per_second'] = round(summary['pledges'] / elapsed) if elapsed else summary['pledges']
+    return summary
@@ -0,0 +1,241 @@
+"""
+Year-end donation receipts, generated in batches.
+
+Donors with completed donations in the year are read in chunks by walking
+the Donor table's unique email index, so each chunk is an index seek
+rather than a fresh scan and sort of the year's donations, and memory
+holds one chunk at a time however many donors there are.
+Each chunk is turned into plain receipt payloads, rendered to HTML and/or
+PDF in a process pool (workers never touch the database) and written to
+default storage, either as one zip per chunk or one file per donor and
+format. A progress file next to the output records the last donor written,
+so an interrupted run resumes after the last complete chunk.
+"""
+import io
+import json
+import multiprocessing
+import os
+import textwrap
+import time
+import zipfile
+from datetime import date, datetime, time as day_start
+from functools import partial
+
+import django
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Exists, OuterRef
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Donation, Donor
+
+FORMATS = ('html', 'pdf')
+OUTPUTS = ('zip', 'files')
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+LINES_PER_PAGE = 54
+LINE_WIDTH = 90
+
+
+def year_bounds(year):
+    return (
+        timezone.make_aware(datetime.combine(date(year, 1, 1), day_start.min)),
+        timezone.make_aware(datetime.combine(date(year + 1, 1, 1), day_start.min)),
+    )
+
+
+def receipt_batches(year, chunk_size, after=''):
+    """
+    Yield ``(last_email, receipts)`` for ``chunk_size`` donors at a time,
+    starting after the donor email ``after``.
+    """
+    start, end = year_bounds(year)
+    completed = Donation.objects.filter(status='completed', created_at__gte=start, created_at__lt=end)
+    methods = dict(Donation.PAYMENT_METHODS)
+
+    while True:
+        # Every completed donation has a Donor row, kept by the donation signals
+        names = dict(
+            Donor.objects.filter(email__gt=after)
+            .filter(Exists(completed.filter(donor_email=OuterRef('email'))))
+            .order_by('email').values_list('email', 'name')[:chunk_size]
+        )
+        if not names:
+            return
+        emails = list(names)
+        rows = completed.filter(donor_email__in=emails).order_by('donor_email', 'created_at', 'id').values_list(
+            'donor_email', 'donor_name', 'id', 'created_at', 'amount', 'payment_method'
+        )
+
+        receipts = {}
+        for email, donor_name, donation_id, created_at, amount, method in rows.iterator(chunk_size=2000):
+            receipt = receipts.get(email)
+            if receipt is None:
+                receipt = receipts[email] = {
+                    # The donor's first donation of the year keeps receipt numbers stable across runs
+                    'number': f'{year}-{donation_id:06d}',
+                    'year': year,
+                    'email': email,
+                    'name': names.get(email) or donor_name,
+                    'donations': [],
+                    'total': 0,
+                }
+            receipt['donations'].append({
+                'date': timezone.localdate(created_at).isoformat(),
+                'amount': f'{amount:.2f}',
+                'method': methods.get(method, method),
+            })
+            receipt['total'] += amount
+        for receipt in receipts.values():
+            receipt['total'] = f"{receipt['total']:.2f}"
+
+        after = emails[-1]
+        yield after, [receipts[email] for email in emails if email in receipts]
+
+
+def pdf_text(line):
+    encoded = line.encode('cp1252', 'replace')
+    return encoded.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def text_pdf(text):
+    """A minimal PDF of ``text`` set in Helvetica, wrapped and paginated."""
+    lines = []
+    for line in text.splitlines():
+        lines.extend(textwrap.wrap(line, LINE_WIDTH) or [''])
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        None,
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+    ]
+    kids = []
+    for page in pages:
+        stream = b'BT /F1 11 Tf 14 TL 50 %d Td ' % (PAGE_HEIGHT - 60)
+        stream += b''.join(b'(%s) Tj T* ' % pdf_text(line) for line in page) + b'ET'
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream))
+        objects.append(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] '
+            b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>'
+            % (PAGE_WIDTH, PAGE_HEIGHT, len(objects))
+        )
+        kids.append(len(objects))
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+        b' '.join(b'%d 0 R' % kid for kid in kids), len(kids)
+    )
+
+    output = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(output)
+    output += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    output += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    output += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(output)
+
+
+def render_receipt(receipt, formats=FORMATS):
+    """``[(filename, bytes), ...]`` for one receipt payload. Runs in pool workers."""
+    files = []
+    name = f"receipt-{receipt['number']}"
+    if 'html' in formats:
+        html = render_to_string('receipts/donation_receipt.html', {'receipt': receipt})
+        files.append((f'{name}.html', html.encode()))
+    if 'pdf' in formats:
+        text = render_to_string('receipts/donation_receipt.txt', {'receipt': receipt})
+        files.append((f'{name}.pdf', text_pdf(text)))
+    return files
+
+
+def save(path, content):
+    # Overwrite files a previous, interrupted run left behind
+    if default_storage.exists(path):
+        default_storage.delete(path)
+    default_storage.save(path, ContentFile(content))
+
+
+def load_progress(path):
+    if not default_storage.exists(path):
+        return None
+    with default_storage.open(path) as stored:
+        return json.loads(stored.read())
+
+
+def generate_receipts(year, formats=FORMATS, output='zip', chunk_size=500, processes=None,
+                      directory=None, restart=False, progress=None):
+    """
+    Write receipts for every donor with completed donations in ``year`` and
+    return a summary. ``processes`` defaults to one worker per CPU; 1 renders
+    in this process.
+    """
+    directory = directory or f'receipts/{year}'
+    progress_path = f'{directory}/progress.json'
+    state = None if restart else load_progress(progress_path)
+    if state is None or state.get('formats') != list(formats) or state.get('output') != output:
+        state = {'year': year, 'formats': list(formats), 'output': output,
+                 'after': '', 'batches': 0, 'donors': 0, 'files': 0, 'complete': False}
+    summary = {'donors': 0, 'files': 0, 'batches': 0, 'resumed_after': state['after'],
+               'already_complete': state['complete'], 'seconds': 0, 'donors_per_second': 0}
+    if state['complete']:
+        return summary
+
+    render = partial(render_receipt, formats=tuple(formats))
+    workers = processes or os.cpu_count() or 1
+    pool = None
+    if workers > 1:
+        # Spawned rather than forked, so no worker inherits this process's open
+        # database connections and the caller's transaction is left alone.
+        # Workers configure Django before the first task imports this module
+        pool = multiprocessing.get_context('spawn').Pool(workers, initializer=django.setup)
+
+    started = time.perf_counter()
+    try:
+        for after, receipts in receipt_batches(year, chunk_size, after=state['after']):
+            batch_started = time.perf_counter()
+            if pool is not None:
+                rendered = pool.map(render, receipts, chunksize=max(1, len(receipts) // (workers * 4)))
+            else:
+                rendered = [render(receipt) for receipt in receipts]
+
+            number = state['batches'] + 1
+            files = [item for receipt_files in rendered for item in receipt_files]
+            if output == 'zip':
+                buffer = io.BytesIO()
+                with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+                    for filename, content in files:
+                        archive.writestr(filename, content)
+                save(f'{directory}/batch-{number:05d}.zip', buffer.getvalue())
+            else:
+                for filename, content in files:
+                    save(f'{directory}/{filename}', content)
+
+            state.update(
+                after=after, batches=number,
+                donors=state['donors'] + len(receipts), files=state['files'] + len(files)
+            )
+            save(progress_path, json.dumps(state).encode())
+            summary['batches'] += 1
+            summary['donors'] += len(receipts)
+            summary['files'] += len(files)
+            if progress:
+                elapsed = time.perf_counter() - batch_started
+                progress(number, len(receipts), len(files), elapsed)
+    except BaseException:
+        if pool is not None:
+            pool.terminate()
+        raise
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    state['complete'] = True
+    save(progress_path, json.dumps(state).encode())
+    elapsed = time.perf_counter() - started
+    summary['seconds'] = round(elapsed, 2)
+    summary['donors_per_second'] = round(summary['donors'] / elapsed) if elapsed else summary['donors']
+    return summary
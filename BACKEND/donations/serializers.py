@@ -1,11 +1,25 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Donation, Donor, Campaign
+from .models import ArchivedDonation, Donation, Donor, Campaign
+from .timeseries import GRANULARITIES, DIMENSIONS, MAX_BUCKETS
 
 class DonationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Donation
         fields = '__all__'
-        read_only_fields = ['created_at', 'updated_at']
+        read_only_fields = ['pledge', 'created_at', 'updated_at']
+
+
+class DonationImportSerializer(serializers.ModelSerializer):
+    """One row of a bulk donation import (CSV or NDJSON)."""
+    class Meta:
+        model = Donation
+        fields = [
+            'donor_name', 'donor_email', 'donor_phone', 'amount', 'payment_method',
+            'donation_type', 'is_anonymous', 'status', 'notes'
+        ]
 
 
 class DonorSerializer(serializers.ModelSerializer):
@@ -24,4 +38,47 @@ class CampaignSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at']
     
     def get_progress(self, obj):
-        return obj.progress_percentage()
\ No newline at end of file
+        return obj.progress_percentage()
+    
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if instance.counter_shards:
+            data['current_amount'] = self.fields['current_amount'].to_representation(instance.raised_amount)
+        return data
+
+
+class CampaignDonateSerializer(serializers.Serializer):
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
+
+
+class TimeSeriesQuerySerializer(serializers.Serializer):
+    """Query parameters for GET /api/donations/timeseries/"""
+    DEFAULT_SPAN = {'day': timedelta(days=29), 'week': timedelta(weeks=11), 'month': timedelta(days=365)}
+    
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    granularity = serializers.ChoiceField(choices=GRANULARITIES, default='day')
+    status = serializers.ChoiceField(choices=Donation.STATUS_CHOICES, required=False)
+    payment_method = serializers.ChoiceField(choices=Donation.PAYMENT_METHODS, required=False)
+    group_by = serializers.ChoiceField(choices=DIMENSIONS, required=False)
+    
+    def validate(self, attrs):
+        attrs.setdefault('end', timezone.localdate())
+        attrs.setdefault('start', attrs['end'] - self.DEFAULT_SPAN[attrs['granularity']])
+        if attrs['start'] > attrs['end']:
+            raise serializers.ValidationError("start must be on or before end")
+        if (attrs['end'] - attrs['start']).days > MAX_BUCKETS and attrs['granularity'] == 'day':
+            raise serializers.ValidationError(f"At most {MAX_BUCKETS} daily buckets per request")
+        return attrs
+
+
+class ArchivedDonationSerializer(serializers.ModelSerializer):
+    """Archived donations in the same shape as DonationSerializer."""
+    pledge = serializers.IntegerField(source='pledge_id', read_only=True)
+    
+    class Meta:
+        model = ArchivedDonation
+        fields = [
+            'id', 'donor_name', 'donor_email', 'donor_phone', 'amount', 'payment_method',
+            'donation_type', 'is_anonymous', 'status', 'notes', 'created_at', 'updated_at', 'pledge'
+        ]
@@ -0,0 +1,117 @@
+from decimal import Decimal
+from django.db.models.signals import post_init, pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from crud.versioning import track_versions
+from . import leaderboard
+from .models import Donation, DonationDailyRollup, Donor, Campaign, RecurringPledge
+
+ROLLUP_FIELDS = ('created_at', 'status', 'payment_method', 'amount')
+UNKNOWN = object()
+
+# Campaign list responses are cached by clients against this version (ETag)
+track_versions(Campaign)
+
+
+def rollup_key(donation):
+    """Rollup bucket and amount a donation currently contributes to, or None if unsaved."""
+    if donation.pk is None or donation.created_at is None:
+        return None
+    return (
+        timezone.localdate(donation.created_at),
+        donation.status,
+        donation.payment_method,
+        Decimal(str(donation.amount)),
+    )
+
+
+def completed_amount(state):
+    """Amount a rollup state contributes to its donor's totals."""
+    if state is None or state is UNKNOWN or state[1] != 'completed':
+        return None
+    return state[3]
+
+
+def update_donor_totals(donation, previous, current):
+    was, now = completed_amount(previous), completed_amount(current)
+    if was == now:
+        return
+    if was is None:
+        delta = now
+        created = Donor.record(
+            donation.donor_email, now, donated_at=donation.created_at,
+            name=donation.donor_name, phone=donation.donor_phone
+        )
+    elif now is None:
+        delta = -was
+        created = Donor.record(donation.donor_email, -was, count=-1)
+    else:
+        delta = now - was
+        created = Donor.record(donation.donor_email, now - was, count=0)
+    # A newly created donor was already placed on the all-time board by its post_save
+    leaderboard.record(donation.donor_email, delta, donation.created_at, all_time=not created)
+
+
+@receiver(post_init, sender=Donation)
+def remember_rollup_state(sender, instance, **kwargs):
+    # Don't trigger deferred field loads for .only()/.defer() querysets
+    if any(field not in instance.__dict__ for field in ROLLUP_FIELDS):
+        instance._rollup_state = UNKNOWN
+    else:
+        instance._rollup_state = rollup_key(instance)
+
+
+@receiver(pre_save, sender=Donation)
+def load_rollup_state(sender, instance, raw=False, **kwargs):
+    if instance._rollup_state is UNKNOWN and not raw:
+        stored = Donation.objects.filter(pk=instance.pk).only(*ROLLUP_FIELDS).first()
+        instance._rollup_state = rollup_key(stored) if stored else None
+
+
+@receiver(post_save, sender=Donation)
+def update_daily_rollup(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # Rollup state doubles as donor bookkeeping: status and amount before the save
+    previous = instance._rollup_state
+    current = rollup_key(instance)
+    if previous == current:
+        return
+    if previous is not None:
+        DonationDailyRollup.record(*previous[:3], count=-1, amount=-previous[3])
+    DonationDailyRollup.record(*current[:3], count=1, amount=current[3])
+    update_donor_totals(instance, previous, current)
+    instance._rollup_state = current
+
+
+@receiver(post_save, sender=Donation)
+def activate_pledge(sender, instance, created, raw=False, **kwargs):
+    # A new pledge waits, paused and uncharged, for its first donation to go through
+    if raw or created or instance.status != 'completed' or instance.pledge_id is None:
+        return
+    RecurringPledge.objects.filter(pk=instance.pledge_id, status='paused', charge_count=0).update(
+        status='active', updated_at=timezone.now()
+    )
+
+
+@receiver(post_delete, sender=Donation)
+def remove_from_daily_rollup(sender, instance, **kwargs):
+    previous = instance._rollup_state
+    if previous is UNKNOWN:
+        previous = rollup_key(instance)
+    if previous is not None:
+        DonationDailyRollup.record(*previous[:3], count=-1, amount=-previous[3])
+        update_donor_totals(instance, previous, None)
+
+
+@receiver(post_save, sender=Donor)
+def update_leaderboard_total(sender, instance, raw=False, **kwargs):
+    # Donor.record's UPDATEs skip this; it covers rows created or edited directly
+    if not raw:
+        leaderboard.set_total(instance.email, instance.total_donated)
+
+
+@receiver(post_delete, sender=Donor)
+def remove_from_leaderboard(sender, instance, **kwargs):
+    leaderboard.set_total(instance.email, 0)
+
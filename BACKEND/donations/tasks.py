@@ -1,9 +1,15 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
 from celery import shared_task
 from django.core.mail import send_mail
+from django.db import connection
 from django.template.loader import render_to_string
 from django.conf import settings
 from .models import Donation
 
+logger = logging.getLogger(__name__)
+
 @shared_task
 def send_donation_confirmation_email(donation_id):
     try:
@@ -41,4 +47,65 @@ def send_donation_confirmation_email(donation_id):
             )
             
     except Donation.DoesNotExist:
-        pass
\ No newline at end of file
+        pass
+
+
+@shared_task
+def charge_due_pledges():
+    from .pledges import process_due_pledges
+    
+    summary = process_due_pledges()
+    if summary['pledges']:
+        logger.info(
+            f"Charged {summary['pledges']} pledges ({summary['stk_pushes']} STK pushes queued) "
+            f"in {summary['seconds']}s"
+        )
+    return summary
+
+
+@shared_task
+def archive_old_records():
+    from .archive import archive_records
+    
+    summary = archive_records()
+    if summary['batches']:
+        logger.info(
+            f"Archived {summary['donations']} donations and {summary['payments']} payments "
+            f"older than {summary['cutoff']:%Y-%m-%d} in {summary['seconds']}s"
+        )
+    summary['cutoff'] = summary['cutoff'].isoformat()
+    return summary
+
+
+@shared_task
+def send_pledge_stk_pushes(donation_ids):
+    """STK push for each pending pledge donation, at most PLEDGE_STK_CONCURRENCY at a time."""
+    from payments.serializers import STKPushRequestSerializer
+    from payments.views import initiate_stk_push
+    
+    charges = []
+    for donation in Donation.objects.filter(id__in=donation_ids, status='pending'):
+        request = STKPushRequestSerializer(data={'phone_number': donation.donor_phone, 'amount': donation.amount})
+        if request.is_valid():
+            charges.append((donation, request.validated_data['phone_number']))
+        else:
+            logger.warning(f"Skipping STK push for pledge donation {donation.id}: {request.errors}")
+    
+    def push(charge):
+        donation, phone_number = charge
+        try:
+            return initiate_stk_push(
+                phone_number=phone_number,
+                amount=donation.amount,
+                account_reference=f'Pledge {donation.pledge_id}',
+                transaction_desc='Recurring donation',
+                donation_id=donation.id
+            )
+        finally:
+            # Worker threads each open their own connection
+            connection.close()
+    
+    with ThreadPoolExecutor(max_workers=settings.PLEDGE_STK_CONCURRENCY) as pool:
+        results = list(pool.map(push, charges))
+    return sum(1 for result in results if result.get('success'))
+
@@ -2,10 +2,36 @@ from django.test import TestCase
 
 # Create your tests here.
 # donations/tests.py
-from django.test import TestCase
-from rest_framework.test import APITestCase
+import csv
+import gzip
+import json
+import os
+import tempfile
+import zipfile
+from datetime import datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
 from rest_framework import status
-from .models import Donation
+from crud.pagination import CreatedAtCursorPagination
+from crud.versioning import get_versions
+from crud.testing import FastListParityMixin, QueryBudgetMixin, QueryPlanMixin
+from payments.models import ArchivedMpesaPayment, MpesaPayment
+from . import leaderboard
+from .archive import archive_records
+from .models import ArchivedDonation, Campaign, Donation, DonationDailyRollup, Donor, RecurringPledge
+from .pledges import process_due_pledges
+from .receipts import generate_receipts, receipt_batches
 
 class DonationTestCase(APITestCase):
     def setUp(self):
@@ -21,4 +47,726 @@ class DonationTestCase(APITestCase):
         response = self.client.post('/api/donations/', self.donation_data)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(Donation.objects.count(), 1)
-        self.assertEqual(Donation.objects.get().donor_name, 'Test Donor')
\ No newline at end of file
+        self.assertEqual(Donation.objects.get().donor_name, 'Test Donor')
+
+
+class DonationIdempotencyTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.data = {'donor_name': 'Wanjiru', 'donor_email': 'w@example.com', 'amount': '25.00'}
+
+    def test_retry_replays_first_response(self):
+        first = self.client.post('/api/donations/', self.data, format='json', HTTP_IDEMPOTENCY_KEY='k1')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+
+        with self.assertNumQueries(0):
+            retry = self.client.post('/api/donations/', self.data, format='json', HTTP_IDEMPOTENCY_KEY='k1')
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.content, first.content)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(Donation.objects.count(), 1)
+
+        self.client.post('/api/donations/', self.data, format='json', HTTP_IDEMPOTENCY_KEY='k2')
+        self.assertEqual(Donation.objects.count(), 2)
+
+    def test_key_reused_for_other_payload_is_rejected(self):
+        self.client.post('/api/donations/', self.data, format='json', HTTP_IDEMPOTENCY_KEY='k1')
+        response = self.client.post(
+            '/api/donations/', {**self.data, 'amount': '30.00'}, format='json', HTTP_IDEMPOTENCY_KEY='k1'
+        )
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_failed_request_is_not_stored(self):
+        invalid = {**self.data, 'amount': ''}
+        self.assertEqual(self.client.post(
+            '/api/donations/', invalid, format='json', HTTP_IDEMPOTENCY_KEY='k1'
+        ).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post('/api/donations/', invalid, format='json', HTTP_IDEMPOTENCY_KEY='k1')
+        self.assertNotIn('Idempotent-Replayed', response)
+
+
+class DonationDailyRollupTestCase(APITestCase):
+    def create_donation(self, **kwargs):
+        data = {
+            'donor_name': 'Rollup Donor',
+            'donor_email': 'rollup@example.com',
+            'amount': Decimal('25.00'),
+            'payment_method': 'mpesa',
+        }
+        data.update(kwargs)
+        return Donation.objects.create(**data)
+
+    def bucket(self, donation_status):
+        return DonationDailyRollup.objects.filter(status=donation_status).values_list(
+            'count', 'total_amount'
+        ).first()
+
+    def test_create_and_status_change_move_between_buckets(self):
+        donation = self.create_donation()
+        self.assertEqual(self.bucket('pending'), (1, Decimal('25.00')))
+
+        donation.status = 'completed'
+        donation.save()
+        self.assertEqual(self.bucket('pending'), (0, Decimal('0.00')))
+        self.assertEqual(self.bucket('completed'), (1, Decimal('25.00')))
+
+        donation.delete()
+        self.assertEqual(self.bucket('completed'), (0, Decimal('0.00')))
+
+    def test_mpesa_callback_completes_rollup(self):
+        donation = self.create_donation()
+        MpesaPayment.objects.create(
+            checkout_request_id='ws_CO_1', phone_number='254700000000',
+            amount=donation.amount, donation=donation
+        )
+        response = self.client.post('/api/payments/callback/', {
+            'Body': {'stkCallback': {
+                'MerchantRequestID': 'm-1', 'CheckoutRequestID': 'ws_CO_1',
+                'ResultCode': 0, 'ResultDesc': 'Processed',
+            }}
+        }, format='json')
+        self.assertEqual(response.data['ResultCode'], 0)
+        self.assertEqual(self.bucket('completed'), (1, Decimal('25.00')))
+        self.assertEqual(self.bucket('pending'), (0, Decimal('0.00')))
+
+    def test_rebuild_matches_incremental_rollup(self):
+        self.create_donation(status='completed')
+        self.create_donation(status='completed', payment_method='paypal', amount=Decimal('5.50'))
+        self.create_donation()
+        incremental = set(DonationDailyRollup.objects.filter(count__gt=0).values_list(
+            'date', 'status', 'payment_method', 'count', 'total_amount'
+        ))
+
+        call_command('rebuild_donation_rollup', chunk_size=2, stdout=StringIO())
+        rebuilt = set(DonationDailyRollup.objects.values_list(
+            'date', 'status', 'payment_method', 'count', 'total_amount'
+        ))
+        self.assertEqual(incremental, rebuilt)
+
+    @override_settings(DONATION_ROLLUP_SHARDS=4)
+    def test_sharded_buckets_sum_to_the_same_totals(self):
+        for _ in range(12):
+            self.create_donation(status='completed')
+        self.assertGreater(DonationDailyRollup.objects.filter(status='completed').count(), 1)
+        response = self.client.get('/api/donations/stats/')
+        self.assertEqual((response.data['total_amount'], response.data['total_count']), (Decimal('300.00'), 12))
+
+
+class DonationQueryBudgetTestCase(QueryBudgetMixin, APITestCase):
+    def test_list_budget(self):
+        for i in range(50):
+            Donation.objects.create(
+                donor_name=f'Donor {i}', donor_email=f'donor{i}@example.com', amount=Decimal('1.00')
+            )
+        response = self.assertQueryBudget('/api/donations/', 1)
+        self.assertEqual(len(response.data['results']), 50)
+
+    @override_settings(SERVER_TIMING_HEADER=True)
+    def test_server_timing_header(self):
+        Donation.objects.create(donor_name='Donor', donor_email='d@example.com', amount=Decimal('1.00'))
+        response = self.client.get('/api/donations/')
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('desc="1 queries"', response['Server-Timing'])
+
+
+class DonationTimeSeriesTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        staff = get_user_model().objects.create(username='staff', is_staff=True)
+        self.client.force_authenticate(staff)
+        today = timezone.localdate()
+        self.old_day = today.replace(day=1) - timedelta(days=40)
+        DonationDailyRollup.record(self.old_day, 'completed', 'mpesa', 2, Decimal('30.00'))
+        DonationDailyRollup.record(self.old_day, 'completed', 'paypal', 1, Decimal('5.00'))
+        DonationDailyRollup.record(today, 'completed', 'mpesa', 1, Decimal('7.00'))
+
+    def get_series(self, **params):
+        response = self.client.get('/api/donations/timeseries/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {bucket['period']: bucket for bucket in response.data['buckets']}
+
+    def test_monthly_buckets(self):
+        series = self.get_series(granularity='month', start=self.old_day.isoformat())
+        old = series[self.old_day.replace(day=1)]
+        self.assertEqual((old['total'], old['count']), (35.0, 3))
+        current = series[timezone.localdate().replace(day=1)]
+        self.assertEqual(current['total'], 7.0)
+
+    def test_group_by_payment_method(self):
+        series = self.get_series(granularity='week', start=self.old_day.isoformat(), group_by='payment_method')
+        week = series[self.old_day - timedelta(days=self.old_day.weekday())]
+        self.assertEqual(week['breakdown']['paypal'], {'total': 5.0, 'count': 1})
+
+    def test_closed_buckets_are_cached_until_an_old_day_changes(self):
+        start = self.old_day.isoformat()
+        self.get_series(granularity='month', start=start)
+        with self.assertNumQueries(1):
+            self.get_series(granularity='month', start=start)
+        # A late callback or admin edit on a closed day retires the cached buckets
+        with self.captureOnCommitCallbacks(execute=True):
+            DonationDailyRollup.record(self.old_day, 'completed', 'mpesa', 1, Decimal('100.00'))
+        series = self.get_series(granularity='month', start=start)
+        self.assertEqual(series[self.old_day.replace(day=1)]['total'], 135.0)
+
+    def test_rejects_inverted_range(self):
+        response = self.client.get('/api/donations/timeseries/', {'start': '2024-02-01', 'end': '2024-01-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class DonationImportTestCase(APITestCase):
+    CSV = (
+        'donor_name,donor_email,amount,payment_method,status\n'
+        'Ann,ann@example.com,10.00,mpesa,\n'
+        'Ann,ann@example.com,15.50,mpesa,completed\n'
+        'Ben,ben@example.com,-4,mpesa,completed\n'
+        'Cat,cat@example.com,8,cash,\n'
+        'Dan,dan@example.com,20,paypal,pending\n'
+    )
+
+    def setUp(self):
+        staff = get_user_model().objects.create_user(username='staff', password='pass1234', is_staff=True)
+        self.client.force_authenticate(staff)
+        Donor.objects.create(name='Ann', email='ann@example.com', total_donated=Decimal('5.00'), donation_count=1)
+
+    def upload(self, content, name='donations.csv'):
+        upload = SimpleUploadedFile(name, content.encode())
+        return self.client.post('/api/donations/import/', {'file': upload}, format='multipart')
+
+    def test_csv_import_skips_invalid_rows_and_recomputes_donors(self):
+        response = self.upload(self.CSV)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['imported'], 3)
+        self.assertEqual([error['row'] for error in response.data['errors']], [3, 4])
+
+        ann = Donor.objects.get(email='ann@example.com')
+        self.assertEqual((ann.total_donated, ann.donation_count), (Decimal('25.50'), 2))
+        # Pending donations don't count towards donor totals
+        self.assertFalse(Donor.objects.filter(email='dan@example.com').exists())
+        self.assertEqual(
+            DonationDailyRollup.objects.get(status='completed', payment_method='mpesa').total_amount,
+            Decimal('25.50')
+        )
+
+    def test_import_requires_staff(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.upload(self.CSV).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_ndjson_command_in_small_chunks(self):
+        lines = [
+            json.dumps({'donor_name': f'Donor {i}', 'donor_email': 'crowd@example.com', 'amount': 2})
+            for i in range(5)
+        ] + ['{not json']
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as handle:
+            handle.write('\n'.join(lines))
+        self.addCleanup(os.remove, handle.name)
+
+        out = StringIO()
+        call_command('import_donations', handle.name, chunk_size=2, stdout=out, stderr=StringIO())
+        self.assertIn('Imported 5 of 6 rows', out.getvalue())
+        self.assertIn('rows/s', out.getvalue())
+        self.assertEqual(Donor.objects.get(email='crowd@example.com').donation_count, 5)
+
+
+class DonorTotalsTestCase(APITestCase):
+    def create_donation(self, amount, **kwargs):
+        return Donation.objects.create(
+            donor_name='Grace', donor_email='grace@example.com', amount=Decimal(amount), **kwargs
+        )
+
+    def donor(self):
+        return Donor.objects.get(email='grace@example.com')
+
+    def test_totals_follow_completion(self):
+        first = self.create_donation('10.00', status='completed')
+        pending = self.create_donation('5.00')
+        self.assertEqual((self.donor().total_donated, self.donor().donation_count), (Decimal('10.00'), 1))
+
+        pending.status = 'completed'
+        pending.save()
+        donor = self.donor()
+        self.assertEqual((donor.total_donated, donor.donation_count), (Decimal('15.00'), 2))
+        self.assertEqual(donor.first_donation_date, first.created_at)
+        self.assertEqual(donor.last_donation_date, pending.created_at)
+
+        first.delete()
+        self.assertEqual((self.donor().total_donated, self.donor().donation_count), (Decimal('5.00'), 1))
+
+    def test_mpesa_callback_credits_donor(self):
+        donation = self.create_donation('40.00')
+        MpesaPayment.objects.create(
+            checkout_request_id='ws_CO_donor', phone_number='254700000000',
+            amount=donation.amount, donation=donation
+        )
+        self.client.post('/api/payments/callback/', {
+            'Body': {'stkCallback': {
+                'MerchantRequestID': 'm', 'CheckoutRequestID': 'ws_CO_donor',
+                'ResultCode': 0, 'ResultDesc': 'ok',
+            }}
+        }, format='json')
+        self.assertEqual(self.donor().total_donated, Decimal('40.00'))
+
+    def test_backfill_rebuilds_stale_donors(self):
+        self.create_donation('12.00', status='completed')
+        self.create_donation('8.00', status='completed')
+        Donor.objects.update(total_donated=0, donation_count=0)
+        Donor.objects.create(name='Gone', email='gone@example.com', total_donated=99, donation_count=3)
+
+        call_command('rebuild_donor_totals', chunk_size=1, stdout=StringIO())
+        self.assertEqual((self.donor().total_donated, self.donor().donation_count), (Decimal('20.00'), 2))
+        self.assertEqual(Donor.objects.get(email='gone@example.com').donation_count, 0)
+
+
+class DonorLeaderboardTestCase(APITestCase):
+    def setUp(self):
+        leaderboard.reset()
+
+    def donate(self, email, amount, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Donation.objects.create(
+                donor_name=email, donor_email=email, amount=Decimal(amount), status='completed', **kwargs
+            )
+
+    def test_top_and_rank_follow_donations(self):
+        self.donate('a@example.com', '30.00')
+        self.assertEqual(leaderboard.top(), [('a@example.com', Decimal('30.00'))])
+
+        # Later changes move donors without rereading the Donor table
+        self.donate('b@example.com', '20.00')
+        late = self.donate('b@example.com', '25.00')
+        self.assertEqual([email for email, _ in leaderboard.top()], ['b@example.com', 'a@example.com'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            late.status = 'refunded'
+            late.save()
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/donors/top_donors/?limit=1')
+        self.assertEqual([item['email'] for item in response.data], ['a@example.com'])
+
+        donor = Donor.objects.get(email='b@example.com')
+        response = self.client.get(f'/api/donors/{donor.id}/rank/')
+        self.assertEqual((response.data['rank'], response.data['total']), (2, '20.00'))
+
+    def test_period_boards_only_count_the_period(self):
+        old = self.donate('old@example.com', '500.00')
+        Donation.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=800))
+        leaderboard.reset()
+        self.donate('new@example.com', '5.00')
+
+        response = self.client.get('/api/donors/top_donors/?period=year')
+        self.assertEqual([(item['email'], item['period_total']) for item in response.data], [('new@example.com', '5.00')])
+        self.assertEqual(leaderboard.rank('old@example.com', 'all'), (1, Decimal('500.00')))
+        self.assertEqual(self.client.get('/api/donors/top_donors/?period=week').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_boards_are_rebuilt_only_after_a_reset(self):
+        for amount in ('0.10', '0.20', '0.10'):
+            self.donate('a@example.com', amount)
+        self.assertEqual(leaderboard.top(), [('a@example.com', Decimal('0.40'))])
+        # Bulk writes bypass the signals; the board keeps its scores until reset
+        Donor.objects.filter(email='a@example.com').update(total_donated=Decimal('45.00'))
+        self.assertEqual(leaderboard.top(), [('a@example.com', Decimal('0.40'))])
+        leaderboard.reset()
+        self.assertEqual(leaderboard.top(), [('a@example.com', Decimal('45.00'))])
+
+
+class RecurringPledgeTestCase(APITestCase):
+    def pledge(self, due, **kwargs):
+        fields = {
+            'donor_name': 'Otieno', 'donor_email': 'o@example.com', 'donor_phone': '0712345678',
+            'amount': Decimal('500.00'), 'billing_day': due.day, 'next_due_at': due, **kwargs,
+        }
+        return RecurringPledge.objects.create(**fields)
+
+    def test_monthly_donation_starts_a_pledge(self):
+        response = self.client.post('/api/donations/', {
+            'donor_name': 'Otieno', 'donor_email': 'o@example.com', 'amount': '500.00',
+            'payment_method': 'mpesa', 'donation_type': 'monthly',
+        }, format='json')
+        pledge = RecurringPledge.objects.get()
+        self.assertEqual(response.data['pledge'], pledge.id)
+        self.assertEqual((pledge.frequency, pledge.amount, pledge.status), ('monthly', Decimal('500.00'), 'paused'))
+        self.assertGreater(pledge.next_due_at, timezone.now() + timedelta(days=27))
+
+        # Charging starts only once the first payment succeeds
+        donation = Donation.objects.get(pk=response.data['id'])
+        donation.status = 'completed'
+        donation.save()
+        pledge.refresh_from_db()
+        self.assertEqual(pledge.status, 'active')
+
+    def test_failed_first_payment_leaves_the_pledge_paused(self):
+        response = self.client.post('/api/donations/', {
+            'donor_name': 'Otieno', 'donor_email': 'o@example.com', 'amount': '500.00',
+            'payment_method': 'mpesa', 'donation_type': 'annual',
+        }, format='json')
+        donation = Donation.objects.get(pk=response.data['id'])
+        donation.status = 'failed'
+        donation.save()
+        self.assertEqual(RecurringPledge.objects.get().status, 'paused')
+        self.assertEqual(process_due_pledges(now=timezone.now() + timedelta(days=400))['pledges'], 0)
+
+    @mock.patch('payments.views.initiate_stk_push', return_value={'success': True})
+    def test_due_pledges_are_charged_once(self, initiate):
+        now = timezone.now()
+        mpesa = self.pledge(now - timedelta(hours=1))
+        card = self.pledge(now - timedelta(days=1), payment_method='credit_card', donor_phone=None)
+        self.pledge(now + timedelta(days=3))
+        self.pledge(now - timedelta(days=1), status='paused')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            summary = process_due_pledges(batch_size=1, now=now)
+        self.assertEqual((summary['pledges'], summary['stk_pushes'], summary['batches']), (2, 1, 2))
+        self.assertEqual(process_due_pledges(now=now)['pledges'], 0)
+
+        self.assertEqual(set(Donation.objects.values_list('pledge', 'status')), {(mpesa.id, 'pending'), (card.id, 'pending')})
+        self.assertEqual(DonationDailyRollup.objects.get(payment_method='mpesa', status='pending').count, 1)
+        initiate.assert_called_once()
+        self.assertEqual(initiate.call_args.kwargs['phone_number'], '254712345678')
+
+        mpesa.refresh_from_db()
+        self.assertEqual((mpesa.charge_count, mpesa.last_charged_at, mpesa.claim_token), (1, now, None))
+        self.assertGreater(mpesa.next_due_at, now)
+
+    def test_billing_day_is_clamped_and_missed_periods_are_skipped(self):
+        due = timezone.make_aware(datetime(2025, 1, 31, 9))
+        pledge = self.pledge(due)
+        pledge.advance(due)
+        self.assertEqual(timezone.localtime(pledge.next_due_at).date(), datetime(2025, 2, 28).date())
+
+        pledge.advance(timezone.make_aware(datetime(2025, 6, 15)))
+        self.assertEqual(timezone.localtime(pledge.next_due_at).date(), datetime(2025, 6, 30).date())
+
+
+class ArchiveTestCase(APITestCase):
+    def setUp(self):
+        self.old = timezone.now() - timedelta(days=600)
+        for i in range(3):
+            donation = self.donation(f'old{i}@example.com', 'completed', self.old)
+            MpesaPayment.objects.create(
+                checkout_request_id=f'ws_CO_{i}', phone_number='254712345678',
+                amount=donation.amount, status='completed', donation=donation
+            )
+        self.donation('stale@example.com', 'pending', self.old)
+        self.donation('recent@example.com', 'completed', timezone.now())
+
+    def donation(self, email, status, created_at):
+        donation = Donation.objects.create(
+            donor_name=email, donor_email=email, amount=Decimal('25.00'), status=status, payment_method='mpesa'
+        )
+        Donation.objects.filter(pk=donation.pk).update(created_at=created_at)
+        return donation
+
+    def totals(self):
+        return (
+            self.client.get('/api/donations/stats/').data['total_amount'],
+            sorted(Donor.objects.values_list('email', 'total_donated', 'donation_count')),
+        )
+
+    def test_closed_old_records_move_without_changing_aggregates(self):
+        before = self.totals()
+        summary = archive_records(batch_size=2)
+        self.assertEqual((summary['donations'], summary['payments'], summary['batches']), (3, 3, 2))
+
+        self.assertEqual(set(Donation.objects.values_list('donor_email', flat=True)), {'stale@example.com', 'recent@example.com'})
+        self.assertEqual(ArchivedDonation.objects.count(), 3)
+        self.assertEqual(MpesaPayment.objects.count(), 0)
+        self.assertEqual(
+            set(ArchivedMpesaPayment.objects.values_list('donation_id', flat=True)),
+            set(ArchivedDonation.objects.values_list('id', flat=True))
+        )
+        self.assertEqual(self.totals(), before)
+
+        # Rebuilding the aggregates from both tables gives the same figures
+        call_command('rebuild_donation_rollup', stdout=StringIO())
+        call_command('rebuild_donor_totals', stdout=StringIO())
+        self.assertEqual(self.totals(), before)
+
+    def test_interrupted_run_resumes(self):
+        self.assertEqual(archive_records(batch_size=1, max_batches=1)['donations'], 1)
+        self.assertEqual(archive_records(batch_size=1)['donations'], 2)
+        self.assertEqual(archive_records()['batches'], 0)
+
+    def test_refuses_recent_cutoff(self):
+        with self.assertRaises(ValueError):
+            archive_records(days=30)
+
+    def test_include_archived_lists_and_exports_both_tables(self):
+        archive_records()
+        self.assertEqual(len(self.client.get('/api/donations/').data['results']), 2)
+
+        seen = []
+        url = '/api/donations/?include_archived=1&page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen += [item['donor_email'] for item in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(seen[0], 'recent@example.com')
+
+        staff = get_user_model().objects.create_user(username='staff', password='pass1234', is_staff=True)
+        self.client.force_authenticate(staff)
+        response = self.client.get('/api/payments/export/', {'include_archived': 1})
+        rows = list(csv.DictReader(StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(len(rows), 3)
+
+
+class ReceiptBatchTestCase(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.media_root = media.name
+        settings_override = override_settings(MEDIA_ROOT=media.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        year_start = timezone.make_aware(datetime(2025, 3, 1))
+        for email, amounts in [('a@example.com', ['10.00', '15.50']), ('b@example.com', ['7.00']), ('c@example.com', ['1.00'])]:
+            for amount in amounts:
+                donation = Donation.objects.create(
+                    donor_name=email.split('@')[0], donor_email=email, amount=Decimal(amount), status='completed'
+                )
+                Donation.objects.filter(pk=donation.pk).update(created_at=year_start)
+        # Other years and unfinished donations get no receipt
+        Donation.objects.create(donor_name='d', donor_email='d@example.com', amount=Decimal('3.00'), status='completed')
+        Donation.objects.create(donor_name='e', donor_email='e@example.com', amount=Decimal('3.00'))
+
+    def test_zip_batches_hold_html_and_pdf_receipts(self):
+        summary = generate_receipts(2025, chunk_size=2, processes=1)
+        self.assertEqual((summary['donors'], summary['files'], summary['batches']), (3, 6, 2))
+
+        with zipfile.ZipFile(os.path.join(self.media_root, 'receipts/2025/batch-00001.zip')) as archive:
+            names = sorted(archive.namelist())
+            html = archive.read(names[0]).decode()
+            pdf = archive.read(names[1])
+        self.assertEqual(len(names), 4)
+        self.assertIn('25.50', html)
+        self.assertTrue(pdf.startswith(b'%PDF-1.4') and pdf.rstrip().endswith(b'%%EOF'))
+
+        self.assertTrue(generate_receipts(2025, chunk_size=2, processes=1)['already_complete'])
+
+    def test_interrupted_run_resumes_after_last_batch(self):
+        def interrupt(number, *args):
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            generate_receipts(2025, formats=['pdf'], output='files', chunk_size=1, processes=1, progress=interrupt)
+        summary = generate_receipts(2025, formats=['pdf'], output='files', chunk_size=1, processes=2)
+        self.assertEqual((summary['resumed_after'], summary['donors']), ('a@example.com', 2))
+        self.assertEqual(len(os.listdir(os.path.join(self.media_root, 'receipts/2025'))), 4)
+
+
+class CampaignDonateTestCase(APITestCase):
+    def setUp(self):
+        today = timezone.localdate()
+        self.campaign = Campaign.objects.create(
+            title='Water', description='Wells', goal_amount=Decimal('100.00'),
+            start_date=today, end_date=today
+        )
+        self.url = f'/api/campaigns/{self.campaign.pk}/donate/'
+
+    def donate(self, amount):
+        return self.client.post(self.url, {
+            'amount': amount, 'donor_name': 'Ivy', 'donor_email': 'ivy@example.com'
+        }, format='json')
+
+    def test_increments_are_decimal_exact(self):
+        self.donate('0.10')
+        response = self.donate('0.20')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['campaign']['current_amount'], '0.30')
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.current_amount, Decimal('0.30'))
+
+    def test_only_current_amount_is_written(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.donate('5.00')
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "donations_campaign"')]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn('"title"', updates[0])
+
+    def test_stale_instance_does_not_overwrite_total(self):
+        stale = Campaign.objects.get(pk=self.campaign.pk)
+        self.donate('7.00')
+        stale.add_amount(Decimal('3.00'))
+        self.assertEqual(stale.current_amount, Decimal('10.00'))
+
+    def test_invalid_amount_rejected(self):
+        self.assertEqual(self.donate('-1').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.donate('1.005').status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class CampaignCounterShardTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        today = timezone.localdate()
+        self.campaign = Campaign.objects.create(
+            title='Match hour', description='Matched giving', goal_amount=Decimal('100.00'),
+            current_amount=Decimal('10.00'), start_date=today, end_date=today, counter_shards=4
+        )
+
+    def donate(self, amount):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(f'/api/campaigns/{self.campaign.pk}/donate/', {
+                'amount': amount, 'donor_name': 'Max', 'donor_email': 'max@example.com'
+            }, format='json')
+
+    def test_donations_spread_over_shards_and_reads_sum_them(self):
+        for _ in range(20):
+            self.donate('1.50')
+        self.assertGreater(self.campaign.counter_shard_rows.count(), 1)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.current_amount, Decimal('10.00'))
+        cache.clear()
+        self.assertEqual(self.campaign.progress_percentage(), Decimal('40'))
+
+    def test_cached_total_is_served_until_it_expires(self):
+        self.donate('5.00')
+        self.assertEqual(self.campaign.raised_amount, Decimal('15.00'))
+        # Donations don't retire the cached total or the list ETag
+        version = get_versions(Campaign)
+        self.donate('5.00')
+        self.assertEqual(get_versions(Campaign), version)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.campaign.raised_amount, Decimal('15.00'))
+
+        cache.delete(f'campaign_total:{self.campaign.pk}')
+        self.assertEqual(self.campaign.raised_amount, Decimal('20.00'))
+
+    def test_saving_an_unsharded_campaign_skips_the_fold(self):
+        campaign = Campaign.objects.get(pk=self.campaign.pk)
+        campaign.counter_shards = 0
+        campaign.save()
+        campaign.title = 'Renamed'
+        with CaptureQueriesContext(connection) as queries:
+            campaign.save()
+        self.assertFalse([query for query in queries if 'countershard' in query['sql']])
+
+    def test_disabling_sharding_folds_shards_into_current_amount(self):
+        self.donate('2.25')
+        self.donate('2.25')
+        self.campaign.counter_shards = 0
+        self.campaign.save()
+        self.assertEqual(self.campaign.current_amount, Decimal('14.50'))
+        self.assertFalse(self.campaign.counter_shard_rows.exists())
+
+
+class DonationCursorPaginationTestCase(APITestCase):
+    def setUp(self):
+        for i in range(5):
+            Donation.objects.create(donor_name=f'Donor {i}', donor_email=f'd{i}@example.com', amount=Decimal('1.00'))
+
+    def test_pages_walk_newest_first_without_offsets(self):
+        seen = []
+        url = '/api/donations/?page_size=2'
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('OFFSET', queries[-1]['sql'])
+            seen += [item['donor_name'] for item in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(seen, [f'Donor {i}' for i in range(4, -1, -1)])
+
+    def test_page_size_is_capped(self):
+        response = self.client.get('/api/donations/?page_size=100000')
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertEqual(CreatedAtCursorPagination().get_page_size(
+            Request(APIRequestFactory().get('/', {'page_size': 100000}))
+        ), CreatedAtCursorPagination.max_page_size)
+
+
+class DonationFastListTestCase(FastListParityMixin, APITestCase):
+    def test_fast_list_matches_serializer_across_pages(self):
+        for i in range(5):
+            Donation.objects.create(
+                donor_name=f'Donor {i}', donor_email=f'd{i}@example.com', amount=Decimal('10.50'),
+                donor_phone=None if i % 2 else '0700000000', notes='', status='completed'
+            )
+        url = '/api/donations/?page_size=2'
+        while url:
+            url = self.assertFastListParity(url).data['next']
+
+
+class DonationExportTestCase(APITestCase):
+    def setUp(self):
+        staff = get_user_model().objects.create_user(username='staff', password='pass1234', is_staff=True)
+        self.client.force_authenticate(staff)
+        for amount in ('5.00', '50.00', '500.00'):
+            Donation.objects.create(donor_name='Exporter', donor_email='x@example.com', amount=Decimal(amount))
+
+    def test_csv_export_streams_filtered_rows(self):
+        today = timezone.localdate().isoformat()
+        response = self.client.get('/api/donations/export/', {
+            'min_amount': 10, 'start_date': today, 'end_date': today
+        })
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment;', response['Content-Disposition'])
+        rows = list(csv.DictReader(StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(sorted(row['amount'] for row in rows), ['50.00', '500.00'])
+
+    def test_gzipped_ndjson_export(self):
+        response = self.client.get('/api/donations/export/', {'file_format': 'ndjson', 'gzip': 1})
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        lines = gzip.decompress(b''.join(response.streaming_content)).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[0])['donor_email'], 'x@example.com')
+
+    def test_rejects_unknown_format_and_non_staff(self):
+        self.assertEqual(
+            self.client.get('/api/donations/export/', {'file_format': 'xlsx'}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get('/api/donors/export/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class DonationQueryPlanTestCase(QueryPlanMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        statuses = ['completed', 'pending', 'failed', 'cancelled']
+        Donation.objects.bulk_create([
+            Donation(
+                donor_name=f'Donor {i}', donor_email=f'donor{i % 40}@example.com',
+                amount=Decimal('10.00'), status=statuses[i % 4]
+            )
+            for i in range(400)
+        ])
+        cls.staff = get_user_model().objects.create_superuser(username='staff', password='pass1234')
+
+    def setUp(self):
+        cache.clear()
+        leaderboard.reset()
+
+    def test_recent_completed_donations(self):
+        # The admin index renders the dashboard stats
+        self.client.force_login(self.staff)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/admin/')
+        self.assertQueriesUseIndex(queries, Donation)
+
+    def test_completed_this_month(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/donors/top_donors/?period=month')
+        self.assertQueriesUseIndex(queries, Donation)
+
+    def test_cursor_page(self):
+        first = self.client.get('/api/donations/?page_size=50')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(first.data['next'])
+        self.assertQueriesUseIndex(queries, Donation)
+
+    def test_donor_totals_by_email(self):
+        self.client.force_authenticate(self.staff)
+        upload = SimpleUploadedFile('donations.csv', b'donor_name,donor_email,amount\nAnn,donor1@example.com,5.00\n')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post('/api/donations/import/', {'file': upload}, format='multipart')
+        self.assertQueriesUseIndex(queries, Donation, contains='UPDATE "donations_donor"')
+
+    def test_receipt_batches_seek_donors_by_email(self):
+        Donor.objects.bulk_create([Donor(name=f'Donor {i}', email=f'donor{i}@example.com') for i in range(40)])
+        with CaptureQueriesContext(connection) as queries:
+            list(receipt_batches(timezone.localdate().year, chunk_size=10))
+        self.assertQueriesUseIndex(queries, Donor)
+        # Each chunk probes its donors' donations instead of rescanning the year
+        for plan in self.assertQueriesUseIndex(queries, Donation):
+            self.assertIn('donation_email_status_at_idx', plan)
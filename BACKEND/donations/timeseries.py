@@ -0,0 +1,121 @@
+"""
+Donation totals bucketed by day, week or month, read from DonationDailyRollup.
+
+A bucket that ended before yesterday rarely changes, so it is cached
+without expiry; only buckets still open (or missing from the cache) are
+computed, with a single grouped query. DonationDailyRollup.record and
+rebuild_donation_rollup bump the rollup version whenever such a day does
+change, which retires every cached bucket at once.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+from crud.versioning import get_versions
+from .models import DonationDailyRollup
+
+GRANULARITIES = ('day', 'week', 'month')
+DIMENSIONS = ('payment_method', 'status')
+MAX_BUCKETS = 3660
+
+
+def bucket_start(day, granularity):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(start, granularity):
+    if granularity == 'week':
+        return start + timedelta(days=7)
+    if granularity == 'month':
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def bucket_starts(start, end, granularity):
+    starts = []
+    current = bucket_start(start, granularity)
+    while current <= end:
+        starts.append(current)
+        current = next_bucket(current, granularity)
+    return starts
+
+
+def period_expression(granularity):
+    if granularity == 'week':
+        return TruncWeek('date')
+    if granularity == 'month':
+        return TruncMonth('date')
+    return F('date')
+
+
+def query_buckets(first, last, granularity, filters, group_by):
+    """One grouped rollup query for every bucket from ``first`` up to ``last``."""
+    fields = ['period'] + ([group_by] if group_by else [])
+    rows = DonationDailyRollup.objects.filter(
+        date__gte=first,
+        date__lt=next_bucket(last, granularity),
+        **filters
+    ).annotate(
+        period=period_expression(granularity)
+    ).values(*fields).annotate(
+        total=Sum('total_amount'),
+        count=Sum('count')
+    ).order_by()
+
+    buckets = {}
+    for row in rows:
+        bucket = buckets.setdefault(row['period'], {'total': 0.0, 'count': 0})
+        bucket['total'] += float(row['total'] or 0)
+        bucket['count'] += row['count'] or 0
+        if group_by:
+            bucket.setdefault('breakdown', {})[row[group_by]] = {
+                'total': float(row['total'] or 0),
+                'count': row['count'] or 0,
+            }
+    return buckets
+
+
+def donation_timeseries(start, end, granularity='day', status=None, payment_method=None, group_by=None):
+    """
+    Return ``[{'period': date, 'total': float, 'count': int}, ...]`` for every
+    bucket overlapping ``start``..``end``, optionally filtered by status and
+    payment method and split by a ``group_by`` dimension.
+    """
+    filters = {}
+    if status:
+        filters['status'] = status
+    if payment_method:
+        filters['payment_method'] = payment_method
+
+    starts = bucket_starts(start, end, granularity)
+    # Late M-Pesa callbacks can still move yesterday's donations between statuses
+    closed_before = timezone.localdate() - timedelta(days=1)
+    generation = get_versions(DonationDailyRollup)[0]
+    key_prefix = f'donation_ts:{generation}:{granularity}:{status}:{payment_method}:{group_by}'
+    keys = {bucket: f'{key_prefix}:{bucket.isoformat()}' for bucket in starts}
+
+    closed = {bucket for bucket in starts if next_bucket(bucket, granularity) <= closed_before}
+    cached = cache.get_many([keys[bucket] for bucket in starts if bucket in closed])
+    missing = [bucket for bucket in starts if keys[bucket] not in cached]
+
+    computed = {}
+    if missing:
+        found = query_buckets(missing[0], missing[-1], granularity, filters, group_by)
+        empty = {'total': 0.0, 'count': 0, 'breakdown': {}} if group_by else {'total': 0.0, 'count': 0}
+        computed = {bucket: found.get(bucket, empty) for bucket in missing}
+        cache.set_many(
+            {keys[bucket]: computed[bucket] for bucket in missing if bucket in closed},
+            timeout=None
+        )
+
+    return [
+        {'period': bucket, **cached.get(keys[bucket], computed.get(bucket, {}))}
+        for bucket in starts
+    ]
@@ -1,24 +1,88 @@
 from rest_framework import viewsets, generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from django.db.models import Sum, Count
-from .models import Donation, Donor, Campaign
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from .models import ArchivedDonation, Donation, Donor, Campaign, DonationDailyRollup, RecurringPledge
+from crud.conditional import versioned_etag
+from crud.exports import export_options, export_response, filtered
+from crud.fastread import FastListMixin
+from crud.idempotency import idempotent
+from crud.pagination import CreatedAtCursorPagination, MergedCursorPagination
 from .serializers import (
+    ArchivedDonationSerializer,
     DonationSerializer, 
     DonorSerializer, 
-    CampaignSerializer
+    CampaignSerializer,
+    CampaignDonateSerializer,
+    TimeSeriesQuerySerializer
 )
+from .timeseries import donation_timeseries
+from .archive import include_archived
+from .importer import FORMATS, detect_format, import_donations
+from .filters import DonationFilter
+from . import leaderboard
 
-class DonationViewSet(viewsets.ModelViewSet):
+DONATION_EXPORT_FIELDS = [
+    'id', 'created_at', 'donor_name', 'donor_email', 'donor_phone', 'amount',
+    'payment_method', 'donation_type', 'status', 'is_anonymous', 'notes'
+]
+DONOR_EXPORT_FIELDS = [
+    'id', 'name', 'email', 'phone', 'total_donated', 'donation_count',
+    'first_donation_date', 'last_donation_date', 'created_at'
+]
+
+
+def leaderboard_donors(period='all', limit=10):
+    """Serialized donors in leaderboard order; period boards add the period's total."""
+    entries = leaderboard.top(period, limit)
+    donors = Donor.objects.in_bulk([email for email, _ in entries], field_name='email')
+    ranked = [(donors[email], amount) for email, amount in entries if email in donors]
+    data = DonorSerializer([donor for donor, _ in ranked], many=True).data
+    if period != 'all':
+        for item, (_, amount) in zip(data, ranked):
+            item['period_total'] = str(amount)
+    return data
+
+
+class DonationViewSet(FastListMixin, viewsets.ModelViewSet):
     queryset = Donation.objects.all()
     serializer_class = DonationSerializer
     permission_classes = [permissions.AllowAny]  # Allow public donations
+    pagination_class = CreatedAtCursorPagination
+    
+    def list(self, request, *args, **kwargs):
+        if not include_archived(request):
+            return super().list(request, *args, **kwargs)
+        # ?include_archived=1 merges the archive table into the listing
+        paginator = MergedCursorPagination()
+        page = paginator.paginate_querysets(
+            [self.get_queryset(), ArchivedDonation.objects.all()], request, view=self
+        )
+        data = [
+            (ArchivedDonationSerializer if isinstance(row, ArchivedDonation) else DonationSerializer)(row).data
+            for row in page
+        ]
+        return paginator.get_paginated_response(data)
+    
+    @idempotent('donations')
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+    
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            donation = serializer.save()
+            # Monthly and annual donations commit the donor to later charges
+            if donation.donation_type in ('monthly', 'annual'):
+                RecurringPledge.start_from(donation)
     
     @action(detail=False, methods=['get'])
     def stats(self, request):
-        total_donations = Donation.objects.aggregate(
-            total_amount=Sum('amount'),
-            total_count=Count('id')
+        # Totals come from the daily rollup rather than a scan of every donation
+        total_donations = DonationDailyRollup.objects.aggregate(
+            total_amount=Sum('total_amount'),
+            total_count=Sum('count')
         )
         
         recent_donations = Donation.objects.all()[:10]
@@ -32,47 +96,160 @@ class DonationViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def by_status(self, request):
-        status_stats = Donation.objects.values('status').annotate(
-            count=Count('id'),
-            amount=Sum('amount')
-        )
-        return Response(status_stats)
+        status_stats = DonationDailyRollup.objects.values('status').annotate(
+            count=Sum('count'),
+            amount=Sum('total_amount')
+        ).order_by('status')
+        return Response([item for item in status_stats if item['count']])
+    
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAdminUser])
+    def timeseries(self, request):
+        """
+        Donation totals per day, week or month
+        GET /api/donations/timeseries/?start=&end=&granularity=&status=&payment_method=&group_by=
+        """
+        serializer = TimeSeriesQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        
+        return Response({
+            'start': params['start'],
+            'end': params['end'],
+            'granularity': params['granularity'],
+            'buckets': donation_timeseries(
+                params['start'],
+                params['end'],
+                params['granularity'],
+                status=params.get('status'),
+                payment_method=params.get('payment_method'),
+                group_by=params.get('group_by'),
+            ),
+        })
+    
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAdminUser])
+    def export(self, request):
+        """
+        Stream donations as CSV or NDJSON
+        GET /api/donations/export/?file_format=csv|ndjson&gzip=1&start_date=&end_date=&min_amount=&max_amount=&include_archived=1
+        """
+        file_format, compress = export_options(request)
+        donations = filtered(DonationFilter, request, Donation.objects.all())
+        if include_archived(request):
+            donations = [donations, filtered(DonationFilter, request, ArchivedDonation.objects.all())]
+        return export_response(request, donations, DONATION_EXPORT_FIELDS, 'donations', file_format, compress)
+    
+    @action(detail=False, methods=['post'], url_path='import', permission_classes=[permissions.IsAdminUser])
+    def bulk_import(self, request):
+        """
+        Import donations from an uploaded CSV or NDJSON file
+        POST /api/donations/import/ (multipart: file, optional file_format, default_status)
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'A file upload is required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        file_format = request.data.get('file_format') or detect_format(upload.name)
+        if file_format not in FORMATS:
+            return Response(
+                {'error': f"file_format must be one of: {', '.join(FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        default_status = request.data.get('default_status', 'completed')
+        if default_status not in dict(Donation.STATUS_CHOICES):
+            return Response({'error': 'Invalid default_status'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        summary = import_donations(upload.file, file_format, default_status=default_status)
+        return Response(summary, status=status.HTTP_201_CREATED if summary['imported'] else status.HTTP_400_BAD_REQUEST)
 
 
 class DonorViewSet(viewsets.ModelViewSet):
     queryset = Donor.objects.all()
     serializer_class = DonorSerializer
     permission_classes = [permissions.AllowAny]  # Allow public access
+    pagination_class = CreatedAtCursorPagination
+    
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAdminUser])
+    def export(self, request):
+        """
+        Stream donors as CSV or NDJSON
+        GET /api/donors/export/?file_format=csv|ndjson&gzip=1
+        """
+        file_format, compress = export_options(request)
+        # Primary key order streams straight off the index, no sort before the first row
+        donors = Donor.objects.order_by('id')
+        return export_response(request, donors, DONOR_EXPORT_FIELDS, 'donors', file_format, compress)
     
     @action(detail=False, methods=['get'])
     def top_donors(self, request):
-        top_donors = Donor.objects.order_by('-total_donated')[:10]
-        serializer = DonorSerializer(top_donors, many=True)
-        return Response(serializer.data)
+        """
+        Highest completed totals, read from the leaderboard
+        GET /api/donors/top_donors/?period=all|month|year&limit=10
+        """
+        period = request.query_params.get('period', 'all')
+        if period not in leaderboard.PERIODS:
+            return Response(
+                {'error': f'period must be one of {", ".join(leaderboard.PERIODS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            limit = min(int(request.query_params.get('limit', 10)), 100)
+        except ValueError:
+            limit = 10
+        return Response(leaderboard_donors(period, max(limit, 1)))
+    
+    @action(detail=True, methods=['get'])
+    def rank(self, request, pk=None):
+        """
+        A donor's position on a leaderboard
+        GET /api/donors/{id}/rank/?period=all|month|year
+        """
+        donor = self.get_object()
+        period = request.query_params.get('period', 'all')
+        if period not in leaderboard.PERIODS:
+            return Response(
+                {'error': f'period must be one of {", ".join(leaderboard.PERIODS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        position, total = leaderboard.rank(donor.email, period)
+        return Response({
+            'donor': donor.id,
+            'period': period,
+            'rank': position,
+            'total': str(total) if total is not None else None,
+        })
 
 
 class CampaignViewSet(viewsets.ModelViewSet):
     queryset = Campaign.objects.all()
     serializer_class = CampaignSerializer
     permission_classes = [permissions.AllowAny]  # Allow public access
+    pagination_class = CreatedAtCursorPagination
+    
+    # Sharded totals move without a version bump; let clients refetch as the cache expires
+    @versioned_etag(Campaign, refresh_every=settings.CAMPAIGN_TOTAL_CACHE_SECONDS)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
     
     @action(detail=True, methods=['post'])
     def donate(self, request, pk=None):
         campaign = self.get_object()
-        amount = request.data.get('amount')
         
-        if amount:
-            campaign.current_amount += float(amount)
-            campaign.save()
+        if request.data.get('amount'):
+            serializer = CampaignDonateSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            amount = serializer.validated_data['amount']
             
-            # Create donation record
-            donation = Donation.objects.create(
-                donor_name=request.data.get('donor_name'),
-                donor_email=request.data.get('donor_email'),
-                amount=amount,
-                payment_method=request.data.get('payment_method', 'mpesa'),
-                status='pending'
-            )
+            with transaction.atomic():
+                campaign.add_amount(amount)
+                
+                # Create donation record
+                donation = Donation.objects.create(
+                    donor_name=request.data.get('donor_name'),
+                    donor_email=request.data.get('donor_email'),
+                    amount=amount,
+                    payment_method=request.data.get('payment_method', 'mpesa'),
+                    status='pending'
+                )
             
             return Response({
                 'message': 'Donation initiated successfully',
@@ -89,79 +266,39 @@ class CampaignViewSet(viewsets.ModelViewSet):
 # Dashboard Stats View
 from volunteers.models import Volunteer
 from contact.models import ContactMessage
+from dashboard.activity import recent_activity as activity_feed
 from rest_framework import generics, status
 
 class DashboardStatsView(generics.GenericAPIView):
     def get(self, request):
-        # Total donations
-        total_stats = Donation.objects.aggregate(
-            total_amount=Sum('amount'),
-            total_count=Count('id')
-        )
-        
-        # Recent donations
-        recent_donations = Donation.objects.select_related().order_by('-created_at')[:5]
+        # Status breakdown from the daily rollup; totals are summed from it
+        status_stats = [
+            item for item in DonationDailyRollup.objects.values('status').annotate(
+                count=Sum('count'),
+                amount=Sum('total_amount')
+            ).order_by('status')
+            if item['count']
+        ]
+        total_stats = {
+            'total_amount': sum(item['amount'] or 0 for item in status_stats),
+            'total_count': sum(item['count'] or 0 for item in status_stats),
+        }
         
         # Campaign progress
         campaigns = Campaign.objects.all()
         
-        # Status breakdown
-        status_stats = Donation.objects.values('status').annotate(
-            count=Count('id'),
-            amount=Sum('amount')
-        )
-        
-        # Top donors
-        top_donors = Donor.objects.order_by('-total_donated')[:5]
+        # Top donors come from the leaderboard, not a sort of the Donor table
+        top_donors = leaderboard_donors(limit=5)
 
         # Volunteer Stats
         active_volunteers = Volunteer.objects.filter(status='active').count()
         new_volunteers = Volunteer.objects.filter(status='pending').count()
-        recent_volunteers = Volunteer.objects.order_by('-created_at')[:5]
 
         # Message Stats
         new_messages = ContactMessage.objects.filter(status='new').count()
-        recent_messages = ContactMessage.objects.order_by('-submitted_at')[:5]
 
-        # Combine recent activity (simplistic approach: just return separate lists, easy for frontend)
-        # Or I can conform to the exact structure the frontend expects.
-        # Frontend currently expects:
-        # data.overview { active_volunteers, monthly_donations, new_messages, active_programs }
-        # data.recent_activity: [{type: 'donation', ...}, {type: 'volunteer', ...}, {type: 'message', ...}]
-        
-        # Let's build the recent_activity list manually
-        recent_activity = []
-        
-        for d in recent_donations:
-            recent_activity.append({
-                'type': 'donation',
-                'date': d.created_at.strftime('%Y-%m-%d'),
-                'donor_name': d.donor_name,
-                'amount': float(d.amount),
-                'status': d.status
-            })
-            
-        for v in recent_volunteers:
-            recent_activity.append({
-                'type': 'volunteer',
-                'date': v.created_at.strftime('%Y-%m-%d'),
-                'name': v.name,
-                'email': v.email,
-                'status': v.status
-            })
-            
-        for m in recent_messages:
-            recent_activity.append({
-                'type': 'message',
-                'date': m.submitted_at.strftime('%Y-%m-%d'),
-                'name': m.name,
-                'email': m.email,
-                'subject': m.subject,
-                'status': m.status
-            })
-            
-        # Sort combined activity by date (descending)
-        recent_activity.sort(key=lambda x: x['date'], reverse=True)
+        # Recent activity comes straight from the indexed activity timeline
+        recent_activity, _ = activity_feed(15)
         
         return Response({
             'overview': {
@@ -171,12 +308,12 @@ class DashboardStatsView(generics.GenericAPIView):
                 'active_programs': campaigns.count(), # Using campaigns as programs proxy
                 'pending_volunteers': new_volunteers
             },
-            'recent_activity': recent_activity[:15], # Return top 15 combined
+            'recent_activity': recent_activity,
             'total_donations': {
                 'amount': total_stats['total_amount'] or 0,
                 'count': total_stats['total_count'] or 0
             },
             'campaigns': CampaignSerializer(campaigns, many=True).data,
             'status_breakdown': list(status_stats),
-            'top_donors': DonorSerializer(top_donors, many=True).data
+            'top_donors': top_donors
         })
\ No newline at end of file
@@ -3,3 +3,11 @@ from django.apps import AppConfig
 
 class GalleryConfig(AppConfig):
     name = 'gallery'
+    
+    def ready(self):
+        from crud.versioning import track_versions
+        track_versions(
+            self.get_model('GalleryItem'),
+            self.get_model('GalleryCategory'),
+            self.get_model('GalleryAlbum'),
+        )
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GalleryCategory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('slug', models.SlugField(max_length=100, unique=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Gallery Categories',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='GalleryItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('item_type', models.CharField(choices=[('image', 'Image'), ('video', 'Video')], default='image', max_length=10)),
+                ('image', models.ImageField(blank=True, null=True, upload_to='gallery/images/')),
+                ('video_url', models.URLField(blank=True, help_text='YouTube or Vimeo URL', null=True)),
+                ('video_file', models.FileField(blank=True, null=True, upload_to='gallery/videos/')),
+                ('photographer', models.CharField(blank=True, max_length=255, null=True)),
+                ('date_taken', models.DateField(blank=True, null=True)),
+                ('location', models.CharField(blank=True, max_length=255, null=True)),
+                ('is_featured', models.BooleanField(default=False)),
+                ('is_published', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='items', to='gallery.gallerycategory')),
+            ],
+            options={
+                'verbose_name': 'Gallery Item',
+                'verbose_name_plural': 'Gallery Items',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='GalleryAlbum',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('slug', models.SlugField(max_length=255, unique=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('cover_image', models.ImageField(blank=True, null=True, upload_to='gallery/albums/')),
+                ('is_published', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('items', models.ManyToManyField(blank=True, related_name='albums', to='gallery.galleryitem')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -91,4 +91,6 @@ class GalleryAlbum(models.Model):
     
     @property
     def item_count(self):
+        if 'items' in getattr(self, '_prefetched_objects_cache', {}):
+            return len(self.items.all())
         return self.items.count()
\ No newline at end of file
@@ -1,3 +1,19 @@
 from django.test import TestCase
 
 # Create your tests here.
+from rest_framework.test import APITestCase
+from crud.testing import QueryBudgetMixin
+from .models import GalleryCategory, GalleryItem, GalleryAlbum
+
+
+class GalleryQueryBudgetTestCase(QueryBudgetMixin, APITestCase):
+    def test_album_detail_budget(self):
+        category = GalleryCategory.objects.create(name='Events', slug='events')
+        album = GalleryAlbum.objects.create(title='Open Day', slug='open-day')
+        album.items.set([
+            GalleryItem.objects.create(title=f'Photo {i}', category=category)
+            for i in range(20)
+        ])
+        response = self.assertQueryBudget('/api/gallery/albums/open-day/', 2)
+        self.assertEqual(response.data['item_count'], 20)
+        self.assertEqual(response.data['items'][0]['category_name'], 'Events')
@@ -5,12 +5,18 @@ from rest_framework import generics, permissions, filters
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db.models import Prefetch
 from .models import GalleryCategory, GalleryItem, GalleryAlbum
 from .serializers import (
     GalleryCategorySerializer, GalleryItemSerializer,
     GalleryAlbumSerializer, GallerySummarySerializer
 )
 from .filters import GalleryItemFilter
+from crud.conditional import versioned_etag
+from crud.routing import read_replica
+
+# Album items with their category in one extra query, instead of one per item
+ALBUM_ITEMS = Prefetch('items', queryset=GalleryItem.objects.select_related('category'))
 
 class GalleryCategoryListView(generics.ListCreateAPIView):
     queryset = GalleryCategory.objects.all()
@@ -27,7 +33,7 @@ class GalleryCategoryListView(generics.ListCreateAPIView):
         return queryset
 
 class GalleryItemListView(generics.ListCreateAPIView):
-    queryset = GalleryItem.objects.all()
+    queryset = GalleryItem.objects.select_related('category')
     serializer_class = GalleryItemSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -60,7 +66,7 @@ class GalleryItemDetailView(generics.RetrieveUpdateDestroyAPIView):
         return [permissions.IsAdminUser()]
 
 class GalleryAlbumListView(generics.ListCreateAPIView):
-    queryset = GalleryAlbum.objects.all()
+    queryset = GalleryAlbum.objects.prefetch_related(ALBUM_ITEMS)
     serializer_class = GalleryAlbumSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     filter_backends = [filters.SearchFilter]
@@ -74,7 +80,7 @@ class GalleryAlbumListView(generics.ListCreateAPIView):
         return queryset
 
 class GalleryAlbumDetailView(generics.RetrieveAPIView):
-    queryset = GalleryAlbum.objects.all()
+    queryset = GalleryAlbum.objects.prefetch_related(ALBUM_ITEMS)
     serializer_class = GalleryAlbumSerializer
     lookup_field = 'slug'
     permission_classes = [permissions.AllowAny]
@@ -83,12 +89,20 @@ class FeaturedGalleryItemsView(generics.ListAPIView):
     serializer_class = GalleryItemSerializer
     permission_classes = [permissions.AllowAny]
     
+    @versioned_etag(GalleryItem, GalleryCategory)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+    
     def get_queryset(self):
-        return GalleryItem.objects.filter(is_featured=True, is_published=True).order_by('-created_at')[:12]
+        return GalleryItem.objects.filter(
+            is_featured=True, is_published=True
+        ).select_related('category').order_by('-created_at')[:12]
 
 class GallerySummaryView(APIView):
     permission_classes = [permissions.AllowAny]
     
+    @versioned_etag(GalleryItem, GalleryCategory, GalleryAlbum)
+    @read_replica
     def get(self, request):
         # Total items
         total_items = GalleryItem.objects.filter(is_published=True).count()
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import MpesaPayment
+from .models import ArchivedMpesaPayment, MpesaPayment
 
 @admin.register(MpesaPayment)
 class MpesaPaymentAdmin(admin.ModelAdmin):
@@ -46,3 +46,20 @@ class MpesaPaymentAdmin(admin.ModelAdmin):
     
     def has_add_permission(self, request):
         return False
+
+
+@admin.register(ArchivedMpesaPayment)
+class ArchivedMpesaPaymentAdmin(admin.ModelAdmin):
+    list_display = ['phone_number', 'amount', 'status', 'mpesa_receipt_number', 'checkout_request_id', 'created_at']
+    list_filter = ['status']
+    search_fields = ['phone_number', 'mpesa_receipt_number', 'checkout_request_id']
+    date_hierarchy = 'created_at'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
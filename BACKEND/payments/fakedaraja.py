@@ -0,0 +1,157 @@
+"""
+A local stand-in for the Safaricom Daraja API, for tests and offline
+development (see the fake_daraja command).
+
+It issues OAuth access tokens, accepts STK pushes from holders of a
+current token and answers anything else with Daraja's 401. Given a
+callback_delay it also posts a successful result to each push's
+CallBackURL, as Safaricom does once the customer enters their PIN.
+Request counts are kept so tests can check how often tokens are fetched.
+"""
+import json
+import threading
+import time
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import requests
+
+AUTH_PATH = '/oauth/v1/generate'
+STK_PUSH_PATH = '/mpesa/stkpush/v1/processrequest'
+
+
+class FakeDaraja:
+    def __init__(self, host='127.0.0.1', port=0, token_lifetime=3599, token_delay=0, callback_delay=None):
+        self.token_lifetime = token_lifetime
+        # Seconds each token request takes, to widen races in tests
+        self.token_delay = token_delay
+        self.callback_delay = callback_delay
+        self.tokens = set()
+        self.token_requests = 0
+        self.stk_pushes = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self.handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def auth_url(self):
+        return f'{self.base_url}{AUTH_PATH}?grant_type=client_credentials'
+
+    @property
+    def stk_push_url(self):
+        return f'{self.base_url}{STK_PUSH_PATH}'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def revoke_tokens(self):
+        """Invalidate every issued token, as an early expiry on Safaricom's side would."""
+        with self.lock:
+            self.tokens.clear()
+
+    def issue_token(self):
+        time.sleep(self.token_delay)
+        token = uuid.uuid4().hex
+        with self.lock:
+            self.token_requests += 1
+            self.tokens.add(token)
+        return {'access_token': token, 'expires_in': str(self.token_lifetime)}
+
+    def stk_push(self, token, payload):
+        with self.lock:
+            if token not in self.tokens:
+                return None
+            self.stk_pushes += 1
+        merchant_id = f'fake-{uuid.uuid4().hex[:12]}'
+        checkout_id = f'ws_CO_{uuid.uuid4().hex[:20]}'
+        if self.callback_delay is not None and payload.get('CallBackURL'):
+            timer = threading.Timer(
+                self.callback_delay, self.send_callback, (payload, merchant_id, checkout_id)
+            )
+            timer.daemon = True
+            timer.start()
+        return {
+            'MerchantRequestID': merchant_id,
+            'CheckoutRequestID': checkout_id,
+            'ResponseCode': '0',
+            'ResponseDescription': 'Success. Request accepted for processing',
+            'CustomerMessage': 'Success. Request accepted for processing',
+        }
+
+    def send_callback(self, payload, merchant_id, checkout_id):
+        body = {'Body': {'stkCallback': {
+            'MerchantRequestID': merchant_id,
+            'CheckoutRequestID': checkout_id,
+            'ResultCode': 0,
+            'ResultDesc': 'The service request is processed successfully.',
+            'CallbackMetadata': {'Item': [
+                {'Name': 'Amount', 'Value': payload.get('Amount')},
+                {'Name': 'MpesaReceiptNumber', 'Value': uuid.uuid4().hex[:10].upper()},
+                {'Name': 'TransactionDate', 'Value': int(datetime.now().strftime('%Y%m%d%H%M%S'))},
+                {'Name': 'PhoneNumber', 'Value': payload.get('PhoneNumber')},
+            ]},
+        }}}
+        try:
+            requests.post(payload['CallBackURL'], json=body, timeout=10)
+        except requests.exceptions.RequestException:
+            pass
+
+    def handler_class(self):
+        daraja = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = urlsplit(self.path).path
+                if path == AUTH_PATH and self.headers.get('Authorization', '').startswith('Basic '):
+                    return self.reply(200, daraja.issue_token())
+                return self.invalid_token()
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                if urlsplit(self.path).path != STK_PUSH_PATH:
+                    return self.reply(404, {'errorMessage': 'Resource not found'})
+                token = self.headers.get('Authorization', '').removeprefix('Bearer ')
+                result = daraja.stk_push(token, payload)
+                if result is None:
+                    return self.invalid_token()
+                return self.reply(200, result)
+
+            def invalid_token(self):
+                self.reply(401, {'errorCode': '404.001.03', 'errorMessage': 'Invalid Access Token'})
+
+            def reply(self, status_code, body):
+                content = json.dumps(body).encode()
+                self.send_response(status_code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,13 @@
+import django_filters
+from donations.filters import start_of_day_filter, end_of_day_filter
+from .models import MpesaPayment
+
+class MpesaPaymentFilter(django_filters.FilterSet):
+    min_amount = django_filters.NumberFilter(field_name="amount", lookup_expr='gte')
+    max_amount = django_filters.NumberFilter(field_name="amount", lookup_expr='lte')
+    start_date = django_filters.DateFilter(field_name="created_at", method=start_of_day_filter)
+    end_date = django_filters.DateFilter(field_name="created_at", method=end_of_day_filter)
+    
+    class Meta:
+        model = MpesaPayment
+        fields = ['status']
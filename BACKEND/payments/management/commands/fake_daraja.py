@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from payments.fakedaraja import FakeDaraja
+
+
+class Command(BaseCommand):
+    help = (
+        'Run a local fake of the M-Pesa Daraja API (OAuth tokens and STK push) '
+        'for development without Safaricom credentials. Start the backend with '
+        'MPESA_API_BASE set to the URL this prints.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8001)
+        parser.add_argument('--token-lifetime', type=int, default=3599,
+                            help='Seconds each issued access token is valid for')
+        parser.add_argument('--callback-delay', type=float, default=None,
+                            help='Post a successful payment to the CallBackURL after this many seconds')
+
+    def handle(self, *args, **options):
+        daraja = FakeDaraja(
+            host=options['host'], port=options['port'], token_lifetime=options['token_lifetime'],
+            callback_delay=options['callback_delay'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Fake Daraja listening; set MPESA_API_BASE={daraja.base_url}'))
+        try:
+            daraja.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            daraja.server.server_close()
+            self.stdout.write(
+                f'Issued {daraja.token_requests} access tokens for {daraja.stk_pushes} STK pushes'
+            )
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mpesapayment',
+            index=models.Index(fields=['status', 'created_at'], name='mpesa_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mpesapayment',
+            index=models.Index(fields=['created_at', 'id'], name='mpesa_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0002_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedMpesaPayment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('merchant_request_id', models.CharField(blank=True, max_length=100, null=True)),
+                ('checkout_request_id', models.CharField(db_index=True, max_length=100)),
+                ('phone_number', models.CharField(max_length=15)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('account_reference', models.CharField(max_length=100)),
+                ('transaction_desc', models.CharField(max_length=100)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('completed', 'Completed'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('result_code', models.CharField(blank=True, max_length=10, null=True)),
+                ('result_desc', models.TextField(blank=True, null=True)),
+                ('mpesa_receipt_number', models.CharField(blank=True, max_length=50, null=True)),
+                ('transaction_date', models.DateTimeField(blank=True, null=True)),
+                ('donation_id', models.BigIntegerField(blank=True, db_index=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Archived M-Pesa Payment',
+                'verbose_name_plural': 'Archived M-Pesa Payments',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['created_at', 'id'], name='archived_mpesa_created_idx')],
+            },
+        ),
+    ]
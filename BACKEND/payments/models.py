@@ -47,6 +47,12 @@ class MpesaPayment(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Reconciling payments by status, e.g. pending STK pushes past a cutoff
+            models.Index(fields=['status', 'created_at'], name='mpesa_status_created_idx'),
+            # Date-range exports in timestamp order
+            models.Index(fields=['created_at', 'id'], name='mpesa_created_id_idx'),
+        ]
         verbose_name = "M-Pesa Payment"
         verbose_name_plural = "M-Pesa Payments"
     
@@ -56,3 +62,38 @@ class MpesaPayment(models.Model):
     def is_successful(self):
         """Check if payment was successful"""
         return self.status == 'completed' and self.result_code == '0'
+
+
+class ArchivedMpesaPayment(models.Model):
+    """
+    A closed MpesaPayment moved out of the hot table together with its
+    donation (see donations/archive.py). Rows keep their original id.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    merchant_request_id = models.CharField(max_length=100, null=True, blank=True)
+    checkout_request_id = models.CharField(max_length=100, db_index=True)
+    phone_number = models.CharField(max_length=15)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    account_reference = models.CharField(max_length=100)
+    transaction_desc = models.CharField(max_length=100)
+    status = models.CharField(max_length=20, choices=MpesaPayment.STATUS_CHOICES)
+    result_code = models.CharField(max_length=10, null=True, blank=True)
+    result_desc = models.TextField(null=True, blank=True)
+    mpesa_receipt_number = models.CharField(max_length=50, null=True, blank=True)
+    transaction_date = models.DateTimeField(null=True, blank=True)
+    # Id of the Donation (or ArchivedDonation) the payment was for
+    donation_id = models.BigIntegerField(null=True, blank=True, db_index=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='archived_mpesa_created_idx'),
+        ]
+        verbose_name = "Archived M-Pesa Payment"
+        verbose_name_plural = "Archived M-Pesa Payments"
+    
+    def __str__(self):
+        return f"{self.phone_number} - KES {self.amount} ({self.status}, archived)"
@@ -1,3 +1,113 @@
 from django.test import TestCase
 
 # Create your tests here.
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from crud.testing import QueryPlanMixin
+from .fakedaraja import FakeDaraja
+from .models import MpesaPayment
+from .views import get_mpesa_access_token, initiate_stk_push
+
+
+class MpesaPaymentQueryPlanTestCase(QueryPlanMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        statuses = ['completed', 'pending', 'failed']
+        MpesaPayment.objects.bulk_create([
+            MpesaPayment(
+                checkout_request_id=f'ws_CO_{i}', phone_number='254700000000',
+                amount=Decimal('100.00'), status=statuses[i % 3]
+            )
+            for i in range(300)
+        ])
+        cls.staff = get_user_model().objects.create_user(username='staff', password='pass1234', is_staff=True)
+
+    def get(self, url, **params):
+        self.client.force_authenticate(self.staff)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+            if response.streaming:
+                # Exports stream; their queries run as the body is read
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        return queries
+
+    def test_checkout_lookup(self):
+        queries = self.get('/api/payments/status/ws_CO_7/')
+        self.assertQueriesUseIndex(queries, MpesaPayment)
+
+    def test_stale_pending_payments(self):
+        cutoff = timezone.localdate() - timedelta(days=1)
+        queries = self.get('/api/payments/export/', status='pending', end_date=cutoff.isoformat())
+        self.assertQueriesUseIndex(queries, MpesaPayment)
+
+    def test_date_range_export(self):
+        start = timezone.localdate() - timedelta(days=7)
+        queries = self.get('/api/payments/export/', start_date=start.isoformat())
+        self.assertQueriesUseIndex(queries, MpesaPayment)
+
+
+class STKPushIdempotencyTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    @mock.patch('payments.views.initiate_stk_push')
+    def test_retry_does_not_prompt_the_phone_again(self, initiate):
+        initiate.return_value = {'success': True, 'checkout_request_id': 'ws_CO_1', 'payment_id': 1}
+        data = {'phone_number': '254712345678', 'amount': '10'}
+        responses = [
+            self.client.post('/api/payments/stk-push/', data, format='json', HTTP_IDEMPOTENCY_KEY='retry-me')
+            for _ in range(3)
+        ]
+        self.assertEqual(initiate.call_count, 1)
+        self.assertEqual({response.content for response in responses}, {responses[0].content})
+
+
+
+class MpesaAccessTokenTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.daraja = FakeDaraja(token_delay=0.2).start()
+        cls.addClassCleanup(cls.daraja.stop)
+
+    def setUp(self):
+        cache.clear()
+        self.daraja.token_requests = self.daraja.stk_pushes = 0
+        mpesa = {**settings.MPESA_CONFIG, 'AUTH_URL': self.daraja.auth_url, 'STK_PUSH_URL': self.daraja.stk_push_url}
+        override = override_settings(MPESA_CONFIG=mpesa)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_concurrent_callers_share_one_token_request(self):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            tokens = list(pool.map(lambda _: get_mpesa_access_token(), range(8)))
+        self.assertEqual(len(set(tokens)), 1)
+        self.assertEqual(self.daraja.token_requests, 1)
+        self.assertEqual(get_mpesa_access_token(), tokens[0])
+        self.assertEqual(self.daraja.token_requests, 1)
+
+    def test_token_expires_before_daraja_expires_it(self):
+        with mock.patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            get_mpesa_access_token()
+        self.assertEqual(cache_set.call_args.args[2], 3599 - settings.MPESA_TOKEN_EXPIRY_MARGIN)
+
+    def test_stk_pushes_reuse_the_token_and_replace_a_revoked_one(self):
+        for _ in range(2):
+            self.assertTrue(initiate_stk_push('254712345678', 10)['success'])
+        self.assertEqual((self.daraja.token_requests, self.daraja.stk_pushes), (1, 2))
+
+        self.daraja.revoke_tokens()
+        self.assertTrue(initiate_stk_push('254712345678', 10)['success'])
+        self.assertEqual((self.daraja.token_requests, self.daraja.stk_pushes), (2, 3))
+        self.assertEqual(MpesaPayment.objects.count(), 3)
@@ -1,44 +1,91 @@
 import requests
 import base64
+import time
 from datetime import datetime
 from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import api_view, action, permission_classes
 from rest_framework.response import Response
-from .models import MpesaPayment
+from crud.exports import export_options, export_response, filtered
+from crud.idempotency import idempotent
+from .filters import MpesaPaymentFilter
+from .models import ArchivedMpesaPayment, MpesaPayment
 from .serializers import MpesaPaymentSerializer, STKPushRequestSerializer
+from donations.archive import include_archived
 from donations.models import Donation
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def get_mpesa_access_token():
+ACCESS_TOKEN_KEY = 'mpesa:access_token'
+REFRESH_LOCK_KEY = 'mpesa:access_token:refresh'
+# Longest a refresh may hold the lock, and so how long others wait for it
+REFRESH_TIMEOUT = 10
+REFRESH_POLL_INTERVAL = 0.05
+
+
+def request_mpesa_access_token():
     """
-    Generate M-Pesa access token using OAuth
+    Fetch a new M-Pesa access token using OAuth; returns (token, lifetime in seconds)
     """
-    try:
-        consumer_key = settings.MPESA_CONFIG['CONSUMER_KEY']
-        consumer_secret = settings.MPESA_CONFIG['CONSUMER_SECRET']
-        api_url = settings.MPESA_CONFIG.get('AUTH_URL', 'https://sandbox.safaricom.co.ke/oauth/v1/generate?grant_type=client_credentials')
-        
-        # Create base64 encoded string of consumer_key:consumer_secret
-        credentials = f"{consumer_key}:{consumer_secret}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        
-        headers = {
-            'Authorization': f'Basic {encoded_credentials}'
-        }
-        
-        response = requests.get(api_url, headers=headers)
-        response.raise_for_status()
-        
-        json_response = response.json()
-        return json_response.get('access_token')
+    consumer_key = settings.MPESA_CONFIG['CONSUMER_KEY']
+    consumer_secret = settings.MPESA_CONFIG['CONSUMER_SECRET']
+    api_url = settings.MPESA_CONFIG.get('AUTH_URL', 'https://sandbox.safaricom.co.ke/oauth/v1/generate?grant_type=client_credentials')
+    
+    # Create base64 encoded string of consumer_key:consumer_secret
+    credentials = f"{consumer_key}:{consumer_secret}"
+    encoded_credentials = base64.b64encode(credentials.encode()).decode()
+    
+    headers = {
+        'Authorization': f'Basic {encoded_credentials}'
+    }
+    
+    response = requests.get(api_url, headers=headers, timeout=REFRESH_TIMEOUT)
+    response.raise_for_status()
     
+    json_response = response.json()
+    return json_response['access_token'], int(json_response.get('expires_in', 3599))
+
+
+def refresh_mpesa_access_token():
+    try:
+        token, lifetime = request_mpesa_access_token()
     except Exception as e:
         logger.error(f"Error getting M-Pesa access token: {str(e)}")
         return None
+    cache.set(ACCESS_TOKEN_KEY, token, max(lifetime - settings.MPESA_TOKEN_EXPIRY_MARGIN, 1))
+    return token
+
+
+def get_mpesa_access_token(stale=None):
+    """
+    M-Pesa access token, cached for every worker until shortly before it expires.
+    
+    Refreshes are single-flight: the caller that takes the refresh lock
+    fetches the token and the rest wait for it to appear in the cache.
+    Pass a token Daraja rejected as ``stale`` to replace it early.
+    """
+    deadline = time.monotonic() + REFRESH_TIMEOUT
+    while True:
+        token = cache.get(ACCESS_TOKEN_KEY)
+        if token and token != stale:
+            return token
+        if cache.add(REFRESH_LOCK_KEY, True, REFRESH_TIMEOUT):
+            try:
+                # Another caller may have stored a token since the read above
+                token = cache.get(ACCESS_TOKEN_KEY)
+                if token and token != stale:
+                    return token
+                return refresh_mpesa_access_token()
+            finally:
+                cache.delete(REFRESH_LOCK_KEY)
+        if time.monotonic() >= deadline:
+            # The refresh holding the lock is stuck; don't wait on it any longer
+            return refresh_mpesa_access_token()
+        time.sleep(REFRESH_POLL_INTERVAL)
 
 
 def initiate_stk_push(phone_number, amount, account_reference="Donation", transaction_desc="Charitize Donation", donation_id=None):
@@ -87,6 +134,13 @@ def initiate_stk_push(phone_number, amount, account_reference="Donation", transa
         
         # Make request
         response = requests.post(api_url, json=payload, headers=headers)
+        if response.status_code == 401:
+            # Token revoked or expired early: replace it once and retry
+            access_token = get_mpesa_access_token(stale=access_token)
+            if not access_token:
+                return {'success': False, 'message': 'Failed to get access token'}
+            headers['Authorization'] = f'Bearer {access_token}'
+            response = requests.post(api_url, json=payload, headers=headers)
         response.raise_for_status()
         
         json_response = response.json()
@@ -134,6 +188,12 @@ def initiate_stk_push(phone_number, amount, account_reference="Donation", transa
         return {'success': False, 'message': f'Error: {str(e)}'}
 
 
+PAYMENT_EXPORT_FIELDS = [
+    'id', 'created_at', 'checkout_request_id', 'merchant_request_id', 'phone_number',
+    'amount', 'status', 'result_code', 'mpesa_receipt_number', 'transaction_date', 'donation_id'
+]
+
+
 class PaymentViewSet(viewsets.ViewSet):
     """
     ViewSet for M-Pesa payment operations
@@ -141,10 +201,12 @@ class PaymentViewSet(viewsets.ViewSet):
     permission_classes = [permissions.AllowAny]
     
     @action(detail=False, methods=['post'])
+    @idempotent('stk-push')
     def initiate_stk_push(self, request):
         """
         Initiate STK Push payment
         POST /api/payments/stk-push/
+        Send an Idempotency-Key header so a retry can't prompt the phone twice
         """
         serializer = STKPushRequestSerializer(data=request.data)
         
@@ -169,6 +231,20 @@ class PaymentViewSet(viewsets.ViewSet):
         else:
             return Response(result, status=status.HTTP_400_BAD_REQUEST)
     
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAdminUser])
+    def export(self, request):
+        """
+        Stream M-Pesa payments as CSV or NDJSON
+        GET /api/payments/export/?file_format=csv|ndjson&gzip=1&start_date=&end_date=&min_amount=&max_amount=&status=&include_archived=1
+        """
+        file_format, compress = export_options(request)
+        payments = filtered(MpesaPaymentFilter, request, MpesaPayment.objects.order_by('created_at', 'id'))
+        if include_archived(request):
+            payments = [payments, filtered(
+                MpesaPaymentFilter, request, ArchivedMpesaPayment.objects.order_by('created_at', 'id')
+            )]
+        return export_response(request, payments, PAYMENT_EXPORT_FIELDS, 'payments', file_format, compress)
+    
     @action(detail=False, methods=['get'], url_path='status/(?P<checkout_id>[^/.]+)')
     def check_status(self, request, checkout_id=None):
         """
@@ -220,40 +296,42 @@ def mpesa_callback(request):
             logger.error(f"Payment not found for CheckoutRequestID: {checkout_request_id}")
             return Response({'ResultCode': 0, 'ResultDesc': 'Accepted'})
         
-        # Update payment status
-        payment.result_code = str(result_code)
-        payment.result_desc = result_desc
+        # Payment and linked donation (plus its rollups) change together
+        with transaction.atomic():
+            # Update payment status
+            payment.result_code = str(result_code)
+            payment.result_desc = result_desc
         
-        if result_code == 0:
-            # Payment successful
-            payment.status = 'completed'
+            if result_code == 0:
+                # Payment successful
+                payment.status = 'completed'
             
-            # Extract callback metadata
-            callback_metadata = stk_callback.get('CallbackMetadata', {})
-            items = callback_metadata.get('Item', [])
+                # Extract callback metadata
+                callback_metadata = stk_callback.get('CallbackMetadata', {})
+                items = callback_metadata.get('Item', [])
             
-            for item in items:
-                if item.get('Name') == 'MpesaReceiptNumber':
-                    payment.mpesa_receipt_number = item.get('Value')
-                elif item.get('Name') == 'TransactionDate':
-                    # Convert timestamp to datetime
-                    timestamp = str(item.get('Value'))
-                    payment.transaction_date = datetime.strptime(timestamp, '%Y%m%d%H%M%S')
+                for item in items:
+                    if item.get('Name') == 'MpesaReceiptNumber':
+                        payment.mpesa_receipt_number = item.get('Value')
+                    elif item.get('Name') == 'TransactionDate':
+                        # Convert timestamp to datetime
+                        timestamp = str(item.get('Value'))
+                        payment.transaction_date = datetime.strptime(timestamp, '%Y%m%d%H%M%S')
             
-            # Update linked donation if exists
-            if payment.donation:
-                payment.donation.status = 'completed'
-                payment.donation.save()
-        else:
-            # Payment failed
-            payment.status = 'failed'
+                # Update linked donation if exists
+                if payment.donation:
+                    payment.donation.status = 'completed'
+                    payment.donation.save()
+            else:
+                # Payment failed
+                payment.status = 'failed'
             
-            # Update linked donation if exists
-            if payment.donation:
-                payment.donation.status = 'failed'
-                payment.donation.save()
+                # Update linked donation if exists
+                if payment.donation:
+                    payment.donation.status = 'failed'
+                    payment.donation.save()
         
-        payment.save()
+            payment.save()
         
         logger.info(f"Payment {checkout_request_id} updated: {payment.status}")
         
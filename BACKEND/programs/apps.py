@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class ProgramsConfig(AppConfig):
     name = 'programs'
+    
+    def ready(self):
+        from crud.versioning import track_versions
+        track_versions(self.get_model('Program'))
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:27
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def backfill_progress(apps, schema_editor):
+    Program = apps.get_model('programs', 'Program')
+    programs = list(Program.objects.only('current_amount', 'target_amount'))
+    for program in programs:
+        if program.target_amount and program.target_amount > 0:
+            progress = min(Decimal(100), program.current_amount * 100 / program.target_amount)
+            program.progress = progress.quantize(Decimal('0.01'))
+    Program.objects.bulk_update(programs, ['progress'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('programs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='program',
+            name='progress',
+            field=models.DecimalField(db_index=True, decimal_places=2, default=0, editable=False, max_digits=5),
+        ),
+        migrations.AddIndex(
+            model_name='program',
+            index=models.Index(fields=['status', 'progress'], name='program_status_progress_idx'),
+        ),
+        migrations.RunPython(backfill_progress, migrations.RunPython.noop),
+    ]
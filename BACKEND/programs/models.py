@@ -1,10 +1,20 @@
 from django.db import models
 
 # Create your models here.
+from decimal import Decimal
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from ckeditor.fields import RichTextField
 
+
+def funding_progress(current_amount, target_amount):
+    """Percentage of ``target_amount`` raised, capped at 100."""
+    if target_amount and target_amount > 0:
+        progress = min(Decimal(100), Decimal(current_amount or 0) * 100 / Decimal(target_amount))
+        return progress.quantize(Decimal('0.01'))
+    return Decimal('0.00')
+
+
 class Program(models.Model):
     CATEGORY_CHOICES = (
         ('education', 'Education'),
@@ -42,6 +52,8 @@ class Program(models.Model):
     current_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     beneficiaries_count = models.PositiveIntegerField(default=0)
     volunteers_needed = models.PositiveIntegerField(default=0)
+    # Denormalized funding progress, kept in step with the amounts by save()
+    progress = models.DecimalField(max_digits=5, decimal_places=2, default=0, db_index=True, editable=False)
     
     # Features
     features = models.JSONField(default=list, help_text="List of program features")
@@ -57,6 +69,9 @@ class Program(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'progress'], name='program_status_progress_idx'),
+        ]
         verbose_name = _('Program')
         verbose_name_plural = _('Programs')
     
@@ -67,6 +82,10 @@ class Program(models.Model):
         if not self.slug:
             from django.utils.text import slugify
             self.slug = slugify(self.title)
+        self.progress = funding_progress(self.current_amount, self.target_amount)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'current_amount', 'target_amount'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'progress'}
         super().save(*args, **kwargs)
     
     @property
@@ -75,9 +94,7 @@ class Program(models.Model):
     
     @property
     def progress_percentage(self):
-        if self.target_amount and self.target_amount > 0:
-            return min(100, (self.current_amount / self.target_amount) * 100)
-        return 0
+        return self.progress
     
     @property
     def duration(self):
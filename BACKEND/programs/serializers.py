@@ -2,9 +2,14 @@ from rest_framework import serializers
 from .models import Program, ProgramUpdate, ProgramBeneficiary
 
 class ProgramSerializer(serializers.ModelSerializer):
-    progress_percentage = serializers.ReadOnlyField()
+    progress_percentage = serializers.FloatField(source='progress', read_only=True)
     duration = serializers.ReadOnlyField()
     is_active = serializers.ReadOnlyField()
+    # Columns the model properties above read, for the values() list path
+    fast_read_sources = {
+        'duration': ('start_date', 'end_date'),
+        'is_active': ('status',),
+    }
     
     class Meta:
         model = Program
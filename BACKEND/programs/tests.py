@@ -1,3 +1,141 @@
 from django.test import TestCase
 
 # Create your tests here.
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework import status
+from crud.routing import PIN_COOKIE, pin_key
+from crud.testing import FastListParityMixin
+from .models import Program
+
+
+class ProgramConditionalGetTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.program = Program.objects.create(
+            title='Reading Club', category='education',
+            short_description='Books', description='Books for all'
+        )
+
+    def test_matching_etag_returns_304_without_queries(self):
+        response = self.client.get('/api/programs/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.assertTrue(response.has_header('Last-Modified'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/programs/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_saving_a_program_changes_the_etag(self):
+        etag = self.client.get('/api/programs/summary/')['ETag']
+        self.program.beneficiaries_count = 12
+        self.program.save()
+
+        response = self.client.get('/api/programs/summary/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['total_beneficiaries'], 12)
+
+    def test_query_string_is_part_of_the_etag(self):
+        etag = self.client.get('/api/programs/')['ETag']
+        response = self.client.get('/api/programs/?category=healthcare', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class ProgramProgressTestCase(APITestCase):
+    def create_program(self, title, current, target):
+        return Program.objects.create(
+            title=title, category='education', short_description=title,
+            description=title, current_amount=current, target_amount=target
+        )
+
+    def test_progress_follows_amount_changes(self):
+        program = self.create_program('Meals', 250, 1000)
+        self.assertEqual(program.progress, Decimal('25.00'))
+
+        program.current_amount = 1500
+        program.save(update_fields=['current_amount'])
+        program.refresh_from_db()
+        self.assertEqual(program.progress, Decimal('100.00'))
+
+    def test_list_orders_and_filters_by_progress(self):
+        self.create_program('Underfunded', 10, 1000)
+        self.create_program('Nearly there', 900, 1000)
+        self.create_program('Halfway', 500, 1000)
+
+        response = self.client.get('/api/programs/', {'ordering': '-progress', 'min_progress': 40})
+        self.assertEqual([item['title'] for item in response.data], ['Nearly there', 'Halfway'])
+        self.assertEqual(response.data[0]['progress_percentage'], 90.0)
+
+
+class ProgramFastListTestCase(FastListParityMixin, APITestCase):
+    def test_fast_list_matches_serializer(self):
+        Program.objects.create(
+            title='Clean Water', category='health', short_description='Wells',
+            description='Wells', image='programs/well.jpg', status='active',
+            start_date='2024-01-01', end_date='2024-03-31', target_amount=Decimal('5000.00'),
+            current_amount=Decimal('1250.50'), features=['wells', 'filters']
+        )
+        Program.objects.create(
+            title='Reading Club', category='education', short_description='Books',
+            description='Books for all', status='active'
+        )
+        response = self.assertFastListParity('/api/programs/')
+        durations = {item['title']: item['duration'] for item in response.data}
+        self.assertEqual(durations, {'Clean Water': 90, 'Reading Club': None})
+
+
+@override_settings(REPLICA_DATABASE_ALIAS='replica')
+class ProgramReplicaRoutingTestCase(APITestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        # Nothing replicates between the two test databases, so each row
+        # shows which database answered
+        for title in ('Primary One', 'Primary Two'):
+            Program.objects.create(title=title, category='education', short_description=title, description=title)
+        Program.objects.using('replica').create(
+            title='Replica Only', category='health', short_description='r', description='r'
+        )
+
+    def test_summary_reads_from_replica(self):
+        response = self.client.get('/api/programs/summary/')
+        self.assertEqual(response.data['total_programs'], 1)
+        self.assertEqual(response.data['recent_programs'][0]['title'], 'Replica Only')
+
+    def test_replica_reads_carry_no_etag(self):
+        response = self.client.get('/api/programs/summary/')
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+        with override_settings(REPLICA_DATABASE_ALIAS=None):
+            response = self.client.get('/api/programs/summary/')
+        self.assertIn('ETag', response)
+
+    def test_other_reads_and_writes_use_primary(self):
+        response = self.client.get('/api/programs/')
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(Program.objects.count(), 2)
+
+    def test_write_pins_client_to_primary(self):
+        user = get_user_model().objects.create_user(username='reader', password='pass1234')
+        self.client.force_authenticate(user)
+        response = self.client.post('/api/contact/newsletter/subscribe/', {'email': 'reader@example.com'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertTrue(cache.get(pin_key(user.pk)))
+
+        # The pin holds for the user even without the cookie
+        self.client.cookies.clear()
+        response = self.client.get('/api/programs/summary/')
+        self.assertEqual(response.data['total_programs'], 2)
+
+    def test_without_replica_configured_reads_stay_on_primary(self):
+        with override_settings(REPLICA_DATABASE_ALIAS=None):
+            response = self.client.get('/api/programs/summary/')
+        self.assertEqual(response.data['total_programs'], 2)
@@ -12,15 +12,22 @@ from .serializers import (
     ProgramBeneficiarySerializer, ProgramSummarySerializer
 )
 from .filters import ProgramFilter
+from crud.conditional import versioned_etag
+from crud.fastread import FastListMixin
+from crud.routing import read_replica
 
-class ProgramListView(generics.ListCreateAPIView):
+class ProgramListView(FastListMixin, generics.ListCreateAPIView):
     queryset = Program.objects.all()
     serializer_class = ProgramSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_class = ProgramFilter
     search_fields = ['title', 'short_description', 'description', 'location']
-    ordering_fields = ['created_at', 'title', 'target_amount']
+    ordering_fields = ['created_at', 'title', 'target_amount', 'progress']
+    
+    @versioned_etag(Program)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
     
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -74,6 +81,8 @@ class ProgramBeneficiaryListView(generics.ListCreateAPIView):
 class ProgramSummaryView(APIView):
     permission_classes = [permissions.AllowAny]
     
+    @versioned_etag(Program)
+    @read_replica
     def get(self, request):
         # Total programs
         total_programs = Program.objects.count()
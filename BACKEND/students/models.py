@@ -26,6 +26,9 @@ class Student(models.Model):
 
     class Meta:
         ordering = ['-date_joined']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='student_created_id_idx'),
+        ]
         verbose_name = "Student"
         verbose_name_plural = "Students"
 
@@ -1,4 +1,5 @@
 from rest_framework import viewsets, permissions
+from crud.pagination import CreatedAtCursorPagination
 from .models import Student
 from .serializers import StudentSerializer
 
@@ -6,3 +7,4 @@ class StudentViewSet(viewsets.ModelViewSet):
     queryset = Student.objects.all()
     serializer_class = StudentSerializer
     permission_classes = [permissions.AllowAny] # Allow registration for anyone
+    pagination_class = CreatedAtCursorPagination
@@ -21,6 +21,9 @@ class CustomUser(AbstractUser):
     
     class Meta:
         ordering = ['-date_joined']
+        indexes = [
+            models.Index(fields=['date_joined', 'id'], name='user_joined_id_idx'),
+        ]
         verbose_name = "User"
         verbose_name_plural = "Users"
 
@@ -38,5 +41,10 @@ class Membership(models.Model):
     reason_for_joining = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='membership_created_id_idx'),
+        ]
+
     def __str__(self):
         return f"{self.full_name} - {self.membership_type}"
\ No newline at end of file
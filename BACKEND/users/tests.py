@@ -1,3 +1,23 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+
+class UserListPaginationTestCase(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.staff = User.objects.create_user(username='staff', password='pass1234', is_staff=True)
+        for i in range(4):
+            User.objects.create_user(username=f'user{i}', password='pass1234')
+        self.client.force_authenticate(self.staff)
+
+    def test_users_are_listed_a_page_at_a_time(self):
+        seen = []
+        url = '/api/users/users/?page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 2)
+            seen += [item['username'] for item in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(seen, ['user3', 'user2', 'user1', 'user0', 'staff'])
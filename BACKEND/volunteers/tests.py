@@ -1,3 +1,38 @@
 from django.test import TestCase
 
 # Create your tests here.
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+from crud.testing import FastListParityMixin, QueryBudgetMixin
+from .models import Volunteer
+
+User = get_user_model()
+
+
+class VolunteerQueryBudgetTestCase(QueryBudgetMixin, APITestCase):
+    def test_list_budget(self):
+        for i in range(30):
+            user = User.objects.create(username=f'volunteer{i}')
+            Volunteer.objects.create(
+                user=user, name=f'Volunteer {i}', email=f'v{i}@example.com', phone='0700000000',
+                age=25, skills='Teaching', commitment_level='weekly', motivation='Help',
+                status='approved'
+            )
+        self.client.force_authenticate(User.objects.create(username='staff', is_staff=True))
+        response = self.assertQueryBudget('/api/volunteers/', 1)
+        self.assertEqual(len(response.data), 30)
+
+
+class VolunteerFastListTestCase(FastListParityMixin, APITestCase):
+    def test_fast_list_matches_serializer(self):
+        user = User.objects.create(username='amina', email='amina@example.com', profile_picture='profiles/a.png')
+        for i, owner in enumerate([user, None]):
+            Volunteer.objects.create(
+                user=owner, name=f'Volunteer {i}', email=f'v{i}@example.com', phone='0700000000',
+                age=25, skills='Teaching', interests=['education'], commitment_level='weekly',
+                motivation='Help', status='approved', start_date='2024-05-01'
+            )
+        self.client.force_authenticate(User.objects.create(username='staff', is_staff=True))
+        response = self.assertFastListParity('/api/volunteers/?ordering=name')
+        self.assertEqual(response.data[0]['user_details']['username'], 'amina')
+        self.assertIsNone(response.data[1]['user_details'])
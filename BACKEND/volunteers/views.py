@@ -13,10 +13,12 @@ from .serializers import (
     VolunteerSummarySerializer
 )
 from .filters import VolunteerFilter
+from crud.fastread import FastListMixin
+from crud.routing import read_replica
 from .tasks import send_volunteer_confirmation_email
 
-class VolunteerListView(generics.ListCreateAPIView):
-    queryset = Volunteer.objects.all()
+class VolunteerListView(FastListMixin, generics.ListCreateAPIView):
+    queryset = Volunteer.objects.select_related('user')
     # Allow anyone to submit an application (POST), but only authenticated/read-only for list (GET)
     def get_permissions(self):
         if self.request.method == 'POST':
@@ -109,6 +111,7 @@ class UpdateVolunteerStatusView(generics.UpdateAPIView):
 class VolunteerSummaryView(APIView):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     
+    @read_replica
     def get(self, request):
         # Total volunteers
         total_volunteers = Volunteer.objects.count()